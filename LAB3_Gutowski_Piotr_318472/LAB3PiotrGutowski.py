@@ -1,14 +1,63 @@
 # -*- coding: utf-8 -*-
+import os
+import sys
+
+import click
 from flask import Flask
+from flask.cli import with_appcontext
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event
 from sqlalchemy.orm import validates
-from datetime import datetime, time
-
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///app.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+from datetime import date, datetime, time
+
+# Dziennik wolnych zapytań wspólny z LAB4 (Lab4_Gutowski_Piotr_318472/Kod/wolne_zapytania.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Lab4_Gutowski_Piotr_318472', 'Kod'))
+import wolne_zapytania  # noqa: E402
+
+# Import modułu nie tworzy aplikacji ani bazy - robią to create_app i polecenia:
+#
+#   flask --app LAB3PiotrGutowski seed && flask --app LAB3PiotrGutowski report
+#   python LAB3PiotrGutowski.py      (seed i report)
+
+db = SQLAlchemy()
+
+# Pragmy SQLite ustawiane na każdym nowym połączeniu: WAL (raporty nie blokują się za zapisami),
+# krótsze fsync i oczekiwanie na blokadę zamiast błędu "database is locked"
+PRAGMY = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'wal'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'normal'),
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64 * 1024)),
+}
+
+
+def ustaw_pragmy(polaczenie_dbapi, rekord):
+    kursor = polaczenie_dbapi.cursor()
+    for nazwa, wartosc in PRAGMY.items():
+        kursor.execute(f"PRAGMA {nazwa}={wartosc}")
+    kursor.close()
+
+
+def create_app(config=None):
+    """Tworzy aplikację z bazą z DATABASE_URL (słownik `config` nadpisuje konfigurację).
+    Zapytania raportów wolniejsze niż WOLNE_ZAPYTANIA_MS trafiają z planem do instance/wolne_zapytania.log."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///app.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['WOLNE_ZAPYTANIA_MS'] = wolne_zapytania.PROG_MS
+    app.config.update(config or {})
+    db.init_app(app)
+    with app.app_context():
+        os.makedirs(app.instance_path, exist_ok=True)
+        for silnik in db.engines.values():
+            event.listen(silnik, 'connect', ustaw_pragmy)
+            wolne_zapytania.zainstaluj(
+                silnik, os.path.join(app.instance_path, 'wolne_zapytania.log'), app.config['WOLNE_ZAPYTANIA_MS']
+            )
+    app.cli.add_command(seed)
+    app.cli.add_command(report)
+    return app
 
-db = SQLAlchemy(app)
 
 # Dozwolone przedmioty
 DOZWOLONE_PRZEDMIOTY = ["matematyka", "fizyka", "chemia", "historia", "WoS", "biologia", "geografia"]
@@ -68,12 +117,89 @@ class Lekcja(db.Model):
     id_studenta = db.Column(db.Integer, db.ForeignKey('studenci.id_studenta'), nullable=False)
     id_przedmiotu = db.Column(db.Integer, db.ForeignKey('lista_przedmiotow.id'), nullable=False)
     data_lekcji = db.Column(db.Date, nullable=False)
+    # Kolumna wyliczana przez SQLite przy zapisie (0 = niedziela, jak strftime('%w')) - można ją indeksować.
+    # Lekcje LAB3 mają samą datę, bez godziny - kolumny godziny nie ma.
+    dzien_tygodnia = db.Column(db.Integer, db.Computed("CAST(strftime('%w', data_lekcji) AS INTEGER)", persisted=True))
 
     # Relacje
     nauczyciel = db.relationship('Nauczyciel', back_populates='lekcje')
     student = db.relationship('Student', back_populates='lekcje')
     przedmiot = db.relationship('Przedmiot', back_populates='lekcje')
 
+    __table_args__ = (
+        db.Index('ix_lekcje_dzien_tygodnia', 'dzien_tygodnia', 'id_nauczyciela', 'id_studenta'),
+        db.Index('ix_lekcje_nauczyciel_data', 'id_nauczyciela', 'data_lekcji'),
+    )
+
+
+# Agregaty lekcji aktualizowane przez wyzwalacze na tabeli lekcje (przy INSERT, UPDATE i DELETE),
+# dzięki czemu raporty f2-f6 odczytują gotowe liczby zamiast skanować lekcje.
+class StatystykaDnia(db.Model):
+    __tablename__ = 'statystyki_dni'
+
+    dzien_tygodnia = db.Column(db.Integer, primary_key=True)
+    liczba_lekcji = db.Column(db.Integer, nullable=False, default=0)
+
+
+class StatystykaPrzedmiotu(db.Model):
+    __tablename__ = 'statystyki_przedmiotow'
+
+    id_przedmiotu = db.Column(db.Integer, db.ForeignKey('lista_przedmiotow.id'), primary_key=True)
+    liczba_lekcji = db.Column(db.Integer, nullable=False, default=0, index=True)
+
+
+class StatystykaStudenta(db.Model):
+    __tablename__ = 'statystyki_studentow'
+
+    id_studenta = db.Column(db.Integer, db.ForeignKey('studenci.id_studenta'), primary_key=True)
+    liczba_lekcji = db.Column(db.Integer, nullable=False, default=0, index=True)
+
+
+class StatystykaNauczycielaDnia(db.Model):
+    __tablename__ = 'statystyki_nauczycieli_dni'
+
+    id_nauczyciela = db.Column(db.Integer, db.ForeignKey('nauczyciele.id_nauczyciela'), primary_key=True)
+    dzien_tygodnia = db.Column(db.Integer, primary_key=True)
+    liczba_lekcji = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_statystyki_nauczycieli_dni_dzien', 'dzien_tygodnia', 'id_nauczyciela'),
+    )
+
+
+# (tabela agregatu, kolumny klucza - takie same w tabeli lekcje)
+AGREGATY_LEKCJI = [
+    ('statystyki_dni', ('dzien_tygodnia',)),
+    ('statystyki_przedmiotow', ('id_przedmiotu',)),
+    ('statystyki_studentow', ('id_studenta',)),
+    ('statystyki_nauczycieli_dni', ('id_nauczyciela', 'dzien_tygodnia')),
+]
+
+
+def sql_zmiany_agregatow(wiersz, zmiana):
+    """Instrukcje wyzwalacza dodające `zmiana` (+1/-1) do agregatów dla wiersza NEW lub OLD."""
+    instrukcje = []
+    for tabela, klucz in AGREGATY_LEKCJI:
+        kolumny = ', '.join(klucz)
+        wartosci = ', '.join(f"{wiersz}.{kolumna}" for kolumna in klucz)
+        instrukcje.append(
+            f"INSERT INTO {tabela} ({kolumny}, liczba_lekcji) VALUES ({wartosci}, {zmiana}) "
+            f"ON CONFLICT ({kolumny}) DO UPDATE SET liczba_lekcji = liczba_lekcji + ({zmiana});"
+        )
+    return '\n'.join(instrukcje)
+
+
+WYZWALACZE_AGREGATOW = [
+    f"CREATE TRIGGER lekcje_agregaty_insert AFTER INSERT ON lekcje BEGIN\n{sql_zmiany_agregatow('NEW', 1)}\nEND",
+    f"CREATE TRIGGER lekcje_agregaty_delete AFTER DELETE ON lekcje BEGIN\n{sql_zmiany_agregatow('OLD', -1)}\nEND",
+    f"CREATE TRIGGER lekcje_agregaty_update AFTER UPDATE OF data_lekcji, id_przedmiotu, id_studenta, id_nauczyciela "
+    f"ON lekcje BEGIN\n{sql_zmiany_agregatow('OLD', -1)}\n{sql_zmiany_agregatow('NEW', 1)}\nEND",
+]
+
+# Wyzwalacze tworzone po utworzeniu ostatniej z tabel agregatów
+for wyzwalacz in WYZWALACZE_AGREGATOW:
+    event.listen(StatystykaNauczycielaDnia.__table__, 'after_create', DDL(wyzwalacz))
+
 # Tabela kalendarza nauczycieli
 class KalendarzNauczyciela(db.Model):
     __tablename__ = 'kalendarz_nauczycieli'
@@ -102,179 +228,185 @@ class Przedmiot(db.Model):
             raise ValueError(f"Nieprawidłowy przedmiot: {value}")
         return value
 
-if __name__ == '__main__':
-    with app.app_context():
-        db.create_all()
-        print("Baza danych została zainicjalizowana.")
 def populate_data():
-    with app.app_context():
-        db.drop_all()
-        db.create_all()
-        # Dodawanie przedmiotów
-        przedmioty = ["matematyka", "fizyka", "chemia", "historia", "biologia"]
-        for nazwa in przedmioty:
-            # Sprawdzenie, czy przedmiot już istnieje
-            if not db.session.query(Przedmiot).filter_by(nazwa_przedmiotu=nazwa).first():
-                db.session.add(Przedmiot(nazwa_przedmiotu=nazwa))
-            else:
-                print(f"Przedmiot '{nazwa}' już istnieje.")
-        db.session.commit()
-
-        # Dodawanie nauczycieli
-        nauczyciele = [
-            Nauczyciel(imie="Jan", nazwisko="Kowalski", prowadzone_przedmioty="matematyka,fizyka", opis="Specjalista w naukach ścisłych", ocena_nauczyciela=4.8, numer_telefonu="123456789", stawka=50, waluta="PLN", email="jan.kowalski@example.com"),
-            Nauczyciel(imie="Anna", nazwisko="Nowak", prowadzone_przedmioty="chemia,biologia", opis="Pasja do nauczania", ocena_nauczyciela=4.5, numer_telefonu="987654321", stawka=60, waluta="PLN", email="anna.nowak@example.com"),
-            Nauczyciel(imie="Piotr", nazwisko="Zieliński", prowadzone_przedmioty="historia", opis="Historyk z powołania", ocena_nauczyciela=4.7, numer_telefonu="456789123", stawka=45, waluta="PLN", email="piotr.zielinski@example.com"),
-            Nauczyciel(imie="Katarzyna", nazwisko="Wiśniewska", prowadzone_przedmioty="matematyka,biologia", opis="Entuzjastka matematyki i biologii", ocena_nauczyciela=4.9, numer_telefonu="321654987", stawka=55, waluta="PLN", email="katarzyna.wisniewska@example.com"),
-            Nauczyciel(imie="Michał", nazwisko="Lewandowski", prowadzone_przedmioty="fizyka,chemia", opis="Zrozumienie to klucz", ocena_nauczyciela=4.6, numer_telefonu="789123456", stawka=65, waluta="PLN", email="michal.lewandowski@example.com"),
-        ]
-        db.session.add_all(nauczyciele)
-        db.session.commit()
-
-        # Dodawanie studentów
-        studenci = [
-            Student(imie="Oliwia", nazwisko="Kwiatkowska", email="oliwia.kwiatkowska@example.com"),
-            Student(imie="Jakub", nazwisko="Kamiński", email="jakub.kaminski@example.com"),
-            Student(imie="Zuzanna", nazwisko="Wójcik", email="zuzanna.wojcik@example.com"),
-        ]
-        db.session.add_all(studenci)
-        db.session.commit()
-
-        # Dodawanie kalendarzy nauczycieli
-        grafiki = [
-            (1, time(9, 0), time(17, 0)),
-            (2, time(8, 0), time(16, 0)),
-            (3, time(14, 0), time(20, 0)),
-            (4, time(8, 0), time(13, 0)),
-        ]
-        for id_nauczyciela, od, do in grafiki:
-            db.session.add(KalendarzNauczyciela(id_nauczyciela=id_nauczyciela, dostepny_od=od, dostepny_do=do))
-
-        db.session.commit()
-
-        # Dodawanie lekcji
-        lekcje = [
-            (5, 2, 1, datetime(2024, 12, 4)),
-            (5, 2, 2, datetime(2024, 12, 9)),
-            (1, 1, 1, datetime(2024, 12, 9)),
-            (1, 1, 2, datetime(2024, 12, 9)),
-            (1, 1, 1, datetime(2024, 12, 10)),
-            (3, 2, 2, datetime(2024, 12, 10)),
-            (1, 4, 2, datetime(2024, 12, 10)),
-            (5, 2, 2, datetime(2024, 12, 11)),
-            (3, 2, 2, datetime(2024, 12, 11)),
-            (2, 5, 1, datetime(2024, 12, 12)),
-            (4, 3, 2, datetime(2024, 12, 12)),
-            (1, 1, 2, datetime(2024, 12, 13)),
-            (5, 4, 1, datetime(2024, 12, 14)),
-            (1, 4, 3, datetime(2024, 12, 14)),
-            (1, 4, 2, datetime(2024, 12, 14)),
-            (5, 4, 2, datetime(2024, 12, 16)),
-        ]
-        for id_przedmiotu, id_nauczyciela, id_studenta, data in lekcje:
-            db.session.add(Lekcja(id_przedmiotu=id_przedmiotu, id_nauczyciela=id_nauczyciela, id_studenta=id_studenta, data_lekcji=data))
-
-        db.session.commit()
-
-populate_data()
+    """Tworzy bazę od nowa i wypełnia ją danymi przykładowymi.
+    Wiersze każdej tabeli wstawiane są jednym executemany, całość w jednej transakcji."""
+    db.drop_all()
+    db.create_all()
+
+    # Dodawanie przedmiotów
+    przedmioty = ["matematyka", "fizyka", "chemia", "historia", "biologia"]
+    db.session.execute(db.insert(Przedmiot), [
+        {"id": id_przedmiotu, "nazwa_przedmiotu": nazwa} for id_przedmiotu, nazwa in enumerate(przedmioty, start=1)
+    ])
+
+    # Dodawanie nauczycieli
+    nauczyciele = [
+        dict(imie="Jan", nazwisko="Kowalski", prowadzone_przedmioty="matematyka,fizyka", opis="Specjalista w naukach ścisłych", ocena_nauczyciela=4.8, numer_telefonu="123456789", stawka=50, waluta="PLN", email="jan.kowalski@example.com"),
+        dict(imie="Anna", nazwisko="Nowak", prowadzone_przedmioty="chemia,biologia", opis="Pasja do nauczania", ocena_nauczyciela=4.5, numer_telefonu="987654321", stawka=60, waluta="PLN", email="anna.nowak@example.com"),
+        dict(imie="Piotr", nazwisko="Zieliński", prowadzone_przedmioty="historia", opis="Historyk z powołania", ocena_nauczyciela=4.7, numer_telefonu="456789123", stawka=45, waluta="PLN", email="piotr.zielinski@example.com"),
+        dict(imie="Katarzyna", nazwisko="Wiśniewska", prowadzone_przedmioty="matematyka,biologia", opis="Entuzjastka matematyki i biologii", ocena_nauczyciela=4.9, numer_telefonu="321654987", stawka=55, waluta="PLN", email="katarzyna.wisniewska@example.com"),
+        dict(imie="Michał", nazwisko="Lewandowski", prowadzone_przedmioty="fizyka,chemia", opis="Zrozumienie to klucz", ocena_nauczyciela=4.6, numer_telefonu="789123456", stawka=65, waluta="PLN", email="michal.lewandowski@example.com"),
+    ]
+    db.session.execute(db.insert(Nauczyciel), [
+        dict(nauczyciel, id_nauczyciela=id_nauczyciela) for id_nauczyciela, nauczyciel in enumerate(nauczyciele, start=1)
+    ])
+
+    # Dodawanie studentów
+    studenci = [
+        dict(id_studenta=1, imie="Oliwia", nazwisko="Kwiatkowska", email="oliwia.kwiatkowska@example.com"),
+        dict(id_studenta=2, imie="Jakub", nazwisko="Kamiński", email="jakub.kaminski@example.com"),
+        dict(id_studenta=3, imie="Zuzanna", nazwisko="Wójcik", email="zuzanna.wojcik@example.com"),
+    ]
+    db.session.execute(db.insert(Student), studenci)
+
+    # Dodawanie kalendarzy nauczycieli
+    grafiki = [
+        (1, time(9, 0), time(17, 0)),
+        (2, time(8, 0), time(16, 0)),
+        (3, time(14, 0), time(20, 0)),
+        (4, time(8, 0), time(13, 0)),
+    ]
+    db.session.execute(db.insert(KalendarzNauczyciela), [
+        dict(id_nauczyciela=id_nauczyciela, dostepny_od=od, dostepny_do=do) for id_nauczyciela, od, do in grafiki
+    ])
+
+    # Dodawanie lekcji
+    lekcje = [
+        (5, 2, 1, datetime(2024, 12, 4)),
+        (5, 2, 2, datetime(2024, 12, 9)),
+        (1, 1, 1, datetime(2024, 12, 9)),
+        (1, 1, 2, datetime(2024, 12, 9)),
+        (1, 1, 1, datetime(2024, 12, 10)),
+        (3, 2, 2, datetime(2024, 12, 10)),
+        (1, 4, 2, datetime(2024, 12, 10)),
+        (5, 2, 2, datetime(2024, 12, 11)),
+        (3, 2, 2, datetime(2024, 12, 11)),
+        (2, 5, 1, datetime(2024, 12, 12)),
+        (4, 3, 2, datetime(2024, 12, 12)),
+        (1, 1, 2, datetime(2024, 12, 13)),
+        (5, 4, 1, datetime(2024, 12, 14)),
+        (1, 4, 3, datetime(2024, 12, 14)),
+        (1, 4, 2, datetime(2024, 12, 14)),
+        (5, 4, 2, datetime(2024, 12, 16)),
+    ]
+    db.session.execute(db.insert(Lekcja), [
+        dict(id_przedmiotu=id_przedmiotu, id_nauczyciela=id_nauczyciela, id_studenta=id_studenta, data_lekcji=data.date())
+        for id_przedmiotu, id_nauczyciela, id_studenta, data in lekcje
+    ])
+
+    db.session.commit()
+    print("Baza danych została zainicjalizowana.")
 
 # Funkcje
-from sqlalchemy import func
-
-from sqlalchemy import func
-
 def f1():
-    with app.app_context():
-        query = db.session.query(Lekcja.id_studenta).\
-            join(KalendarzNauczyciela, KalendarzNauczyciela.id_nauczyciela == Lekcja.id_nauczyciela).\
-            filter(KalendarzNauczyciela.dostepny_od <= time(17, 0)).\
-            join(Student, Student.id_studenta == Lekcja.id_studenta).\
-            filter(func.strftime('%w', Lekcja.data_lekcji) <= '4').\
-            distinct()
+    # Dni powszednie: poniedziałek (1) - piątek (5)
+    query = db.session.query(Lekcja.id_studenta).\
+        join(KalendarzNauczyciela, KalendarzNauczyciela.id_nauczyciela == Lekcja.id_nauczyciela).\
+        filter(KalendarzNauczyciela.dostepny_od <= time(17, 0)).\
+        join(Student, Student.id_studenta == Lekcja.id_studenta).\
+        filter(Lekcja.dzien_tygodnia.between(1, 5)).\
+        distinct()
 
-        print(f"Liczba studentów w dni powszednie: {query.count()}")
+    print(f"Liczba studentów w dni powszednie: {query.count()}")
 
 
 
 def f2():
-    with app.app_context():
-        query = db.session.query(Lekcja.id_nauczyciela).\
-            filter(func.strftime('%w', Lekcja.data_lekcji).in_(['6', '7'])).\
-            distinct()
-        print(f"Liczba nauczycieli z lekcjami w weekendy: {query.count()}")
+    # Weekend: sobota (6) i niedziela (0)
+    query = db.session.query(StatystykaNauczycielaDnia.id_nauczyciela).\
+        filter(StatystykaNauczycielaDnia.dzien_tygodnia.in_([0, 6])).\
+        filter(StatystykaNauczycielaDnia.liczba_lekcji > 0).\
+        distinct()
+    print(f"Liczba nauczycieli z lekcjami w weekendy: {query.count()}")
 
 
 def f3():
-    with app.app_context():
-        query = db.session.query(
-            Lekcja.id_studenta,
-            db.func.count(Lekcja.id_lekcji).label('count')
-        ).group_by(Lekcja.id_studenta).order_by(db.desc('count')).first()
-
-        if query:
-            student_id = query[0]
-            liczba_lekcji = query[1]
-
-            student = db.session.get(Student, student_id)
-
-            if student:
-                print(f"Student z największą liczbą lekcji ({liczba_lekcji} lekcji):")
-                print(f"Imię: {student.imie}")
-                print(f"Nazwisko: {student.nazwisko}")
-                print(f"Adres email: {student.email}")
-            else:
-                print("Nie znaleziono studenta.")
+    query = db.session.query(
+        StatystykaStudenta.id_studenta,
+        StatystykaStudenta.liczba_lekcji
+    ).order_by(StatystykaStudenta.liczba_lekcji.desc()).first()
+
+    if query:
+        student_id = query[0]
+        liczba_lekcji = query[1]
+
+        student = db.session.get(Student, student_id)
+
+        if student:
+            print(f"Student z największą liczbą lekcji ({liczba_lekcji} lekcji):")
+            print(f"Imię: {student.imie}")
+            print(f"Nazwisko: {student.nazwisko}")
+            print(f"Adres email: {student.email}")
         else:
-            print("Brak studentów w bazie danych.")
+            print("Nie znaleziono studenta.")
+    else:
+        print("Brak studentów w bazie danych.")
 
 
 
 def f4():
-    with app.app_context():
-        query = db.session.query(Przedmiot.nazwa_przedmiotu, db.func.count(Lekcja.id_lekcji).label('count')).\
-            join(Lekcja).\
-            group_by(Przedmiot.id).\
-            order_by(db.desc('count')).first()
-        print(f"Najczęściej wybierany przedmiot: {query[0]} ({query[1]} lekcji)")
+    query = db.session.query(Przedmiot.nazwa_przedmiotu, StatystykaPrzedmiotu.liczba_lekcji).\
+        join(Przedmiot, Przedmiot.id == StatystykaPrzedmiotu.id_przedmiotu).\
+        order_by(StatystykaPrzedmiotu.liczba_lekcji.desc()).first()
+    print(f"Najczęściej wybierany przedmiot: {query[0]} ({query[1]} lekcji)")
 
 def f5():
-    with app.app_context():
-        query = db.session.query(Lekcja).join(Przedmiot).filter(Przedmiot.nazwa_przedmiotu == "matematyka").count()
-        print(f"Liczba lekcji z matematyki: {query}")
+    query = db.session.query(StatystykaPrzedmiotu.liczba_lekcji).\
+        join(Przedmiot, Przedmiot.id == StatystykaPrzedmiotu.id_przedmiotu).\
+        filter(Przedmiot.nazwa_przedmiotu == "matematyka").scalar() or 0
+    print(f"Liczba lekcji z matematyki: {query}")
 
 def f6():
-    with app.app_context():
-        query = db.session.query(Lekcja).filter(func.strftime('%w', Lekcja.data_lekcji) == '3').count()
-        print(f"Liczba lekcji w środy: {query}")
+    statystyka = db.session.get(StatystykaDnia, 3)
+    query = statystyka.liczba_lekcji if statystyka else 0
+    print(f"Liczba lekcji w środy: {query}")
 
 
-from datetime import datetime
+def f7(id_nauczyciela, dzien):
+    if isinstance(dzien, datetime):
+        dzien = dzien.date()
 
-from datetime import date
+    query = db.session.query(Lekcja).filter(
+        Lekcja.id_nauczyciela == id_nauczyciela,
+        Lekcja.data_lekcji == dzien
+    ).all()
 
-def f7(id_nauczyciela, dzien):
-    with app.app_context():
-        if isinstance(dzien, datetime):
-            dzien = dzien.date()
-
-        query = db.session.query(Lekcja).filter(
-            Lekcja.id_nauczyciela == id_nauczyciela,
-            Lekcja.data_lekcji == dzien
-        ).all()
-
-        if query:
-            print(f"Lekcje dla nauczyciela {id_nauczyciela} w dniu {dzien}:")
-            for lekcja in query:
-                print(f" - Lekcja ID: {lekcja.id_lekcji}, Przedmiot: {lekcja.przedmiot.nazwa_przedmiotu}, Student ID: {lekcja.id_studenta}")
-        else:
-            print(f"Brak lekcji dla nauczyciela {id_nauczyciela} w dniu {dzien}.")
+    if query:
+        print(f"Lekcje dla nauczyciela {id_nauczyciela} w dniu {dzien}:")
+        for lekcja in query:
+            print(f" - Lekcja ID: {lekcja.id_lekcji}, Przedmiot: {lekcja.przedmiot.nazwa_przedmiotu}, Student ID: {lekcja.id_studenta}")
+    else:
+        print(f"Brak lekcji dla nauczyciela {id_nauczyciela} w dniu {dzien}.")
 
 
-with app.app_context():
+def wypisz_raport(id_nauczyciela, dzien):
     f1()
     f2()
     f3()
     f4()
     f5()
     f6()
-    f7(4, date(2024, 12, 14))
+    f7(id_nauczyciela, dzien)
+
+
+@click.command('seed')
+@with_appcontext
+def seed():
+    """Tworzy bazę od nowa z danymi przykładowymi."""
+    populate_data()
+
+
+@click.command('report')
+@click.option('--nauczyciel', type=int, default=4, help="Nauczyciel dla planu dnia (f7)")
+@click.option('--dzien', type=click.DateTime(['%Y-%m-%d']), default='2024-12-14', help="Dzień planu (f7)")
+@with_appcontext
+def report(nauczyciel, dzien):
+    """Wypisuje raport f1-f7."""
+    wypisz_raport(nauczyciel, dzien.date())
+
+
+if __name__ == '__main__':
+    with create_app().app_context():
+        populate_data()
+        wypisz_raport(4, date(2024, 12, 14))
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+import argparse
+import json
+import sys
+from datetime import date, time
+
+import numpy as np
+
+from LAB3PiotrGutowski import KalendarzNauczyciela, Lekcja, Przedmiot, Student, create_app, db
+
+# Raport f1-f7 liczony w jednym przebiegu po tabeli lekcje.
+# Lekcje czytane są paczkami jako tablice kolumnowe NumPy (pamięć ograniczona rozmiarem paczki),
+# a wszystkie miary liczone są wektorowo na każdej paczce. Plan dnia nauczyciela (f7) to zapytanie
+# punktowe - pobierany jest osobno przez indeks (id_nauczyciela, data_lekcji), a nie ze skanu.
+#
+#   python raport.py --nauczyciel 4 --dzien 2024-12-14 > raport.json
+
+ROZMIAR_PACZKI = 1_000_000
+
+# Każda lekcja odczytywana jest jako jedna liczba 64-bitowa - koszt odczytu z sqlite3 zależy
+# głównie od liczby obiektów Pythona, więc jedna kolumna zamiast czterech skraca go kilkukrotnie.
+# Układ bitów: id_nauczyciela (27) | id_studenta (27) | id_przedmiotu (6) | dzien_tygodnia (3)
+BITY_ID = 27
+BITY_PRZEDMIOTU = 6
+ZAPYTANIE_LEKCJI = (
+    f"SELECT (id_nauczyciela << {BITY_ID + BITY_PRZEDMIOTU + 3}) | (id_studenta << {BITY_PRZEDMIOTU + 3}) "
+    f"| (id_przedmiotu << 3) | dzien_tygodnia FROM lekcje"
+)
+
+
+def powieksz(tablica, rozmiar):
+    """Zwraca tablicę powiększoną (zerami / False) do co najmniej `rozmiar` elementów."""
+    if len(tablica) >= rozmiar:
+        return tablica
+    return np.concatenate([tablica, np.zeros(max(rozmiar, 2 * len(tablica)) - len(tablica), dtype=tablica.dtype)])
+
+
+def sprawdz_zakres_id():
+    """Upewnia się, że identyfikatory mieszczą się w polach spakowanej liczby."""
+    with db.engine.connect() as polaczenie:
+        nauczyciel, student, przedmiot = polaczenie.exec_driver_sql(
+            "SELECT MAX(id_nauczyciela), MAX(id_studenta), MAX(id_przedmiotu) FROM lekcje"
+        ).one()
+    if (nauczyciel or 0) >= 2 ** BITY_ID or (student or 0) >= 2 ** BITY_ID or (przedmiot or 0) >= 2 ** BITY_PRZEDMIOTU:
+        raise ValueError("Identyfikatory lekcji są zbyt duże dla raportu kolumnowego")
+
+
+def paczki_lekcji(rozmiar_paczki):
+    """Generator paczek lekcji jako kolumn NumPy: (nauczyciel, student, przedmiot, dzien_tygodnia)."""
+    polaczenie = db.engine.raw_connection()
+    try:
+        kursor = polaczenie.cursor()
+        kursor.execute(ZAPYTANIE_LEKCJI)
+        while True:
+            wiersze = kursor.fetchmany(rozmiar_paczki)
+            if not wiersze:
+                break
+            spakowane = np.fromiter((wartosc for (wartosc,) in wiersze), dtype=np.int64, count=len(wiersze))
+            yield (
+                spakowane >> (BITY_ID + BITY_PRZEDMIOTU + 3),
+                (spakowane >> (BITY_PRZEDMIOTU + 3)) & (2 ** BITY_ID - 1),
+                (spakowane >> 3) & (2 ** BITY_PRZEDMIOTU - 1),
+                spakowane & 7,
+            )
+    finally:
+        polaczenie.close()
+
+
+def raport(id_nauczyciela, dzien, rozmiar_paczki=ROZMIAR_PACZKI):
+    """Liczy wszystkie miary raportu LAB3 w jednym przebiegu i zwraca je jako słownik (w kontekście aplikacji)."""
+    # Nauczyciele z kalendarzem zaczynającym się najpóźniej o 17:00 (warunek f1)
+    kalendarze = db.session.execute(
+        db.select(KalendarzNauczyciela.id_nauczyciela).where(KalendarzNauczyciela.dostepny_od <= time(17, 0))
+    ).scalars().all()
+    nauczyciele_f1 = np.zeros(max(kalendarze, default=0) + 1, dtype=bool)
+    nauczyciele_f1[kalendarze] = True
+    id_przedmiotow = dict(db.session.execute(db.select(Przedmiot.nazwa_przedmiotu, Przedmiot.id)).all())
+    id_matematyki = id_przedmiotow.get("matematyka", -1)
+    sprawdz_zakres_id()
+
+    studenci_powszednie = np.zeros(1, dtype=bool)
+    nauczyciele_weekend = np.zeros(1, dtype=bool)
+    lekcje_studentow = np.zeros(1, dtype=np.int64)
+    lekcje_przedmiotow = np.zeros(1, dtype=np.int64)
+    lekcje_matematyki = 0
+    lekcje_srody = 0
+    liczba_lekcji = 0
+
+    for nauczyciel, student, przedmiot, dzien_tygodnia in paczki_lekcji(rozmiar_paczki):
+        liczba_lekcji += len(nauczyciel)
+
+        # f1: studenci z lekcjami w dni powszednie u nauczycieli spełniających warunek kalendarza
+        nauczyciele_f1 = powieksz(nauczyciele_f1, nauczyciel.max() + 1)
+        maska = nauczyciele_f1[nauczyciel] & (dzien_tygodnia >= 1) & (dzien_tygodnia <= 5)
+        studenci_powszednie = powieksz(studenci_powszednie, student.max() + 1)
+        studenci_powszednie[student[maska]] = True
+
+        # f2: nauczyciele z lekcjami w weekendy
+        nauczyciele_weekend = powieksz(nauczyciele_weekend, nauczyciel.max() + 1)
+        nauczyciele_weekend[nauczyciel[(dzien_tygodnia == 0) | (dzien_tygodnia == 6)]] = True
+
+        # f3, f4: liczba lekcji studentów i przedmiotów
+        zliczenia = np.bincount(student)
+        lekcje_studentow = powieksz(lekcje_studentow, len(zliczenia))
+        lekcje_studentow[:len(zliczenia)] += zliczenia
+        zliczenia = np.bincount(przedmiot)
+        lekcje_przedmiotow = powieksz(lekcje_przedmiotow, len(zliczenia))
+        lekcje_przedmiotow[:len(zliczenia)] += zliczenia
+
+        # f5, f6
+        lekcje_matematyki += int(np.count_nonzero(przedmiot == id_matematyki))
+        lekcje_srody += int(np.count_nonzero(dzien_tygodnia == 3))
+
+    # f7: plan nauczyciela w danym dniu (wyszukiwanie w indeksie)
+    plan = db.session.execute(
+        db.select(Lekcja.id_lekcji, Przedmiot.nazwa_przedmiotu, Lekcja.id_studenta)
+        .join(Przedmiot, Przedmiot.id == Lekcja.id_przedmiotu)
+        .where(Lekcja.id_nauczyciela == id_nauczyciela, Lekcja.data_lekcji == dzien)
+        .order_by(Lekcja.id_lekcji)
+    ).all()
+
+    # Join ze studentami w f1 - liczymy tylko istniejących studentów
+    id_studentow = np.array(db.session.execute(db.select(Student.id_studenta)).scalars().all(), dtype=np.int64)
+    id_studentow = id_studentow[id_studentow < len(studenci_powszednie)]
+
+    najaktywniejszy = None
+    if lekcje_studentow.any():
+        id_studenta = int(lekcje_studentow.argmax())
+        student = db.session.get(Student, id_studenta)
+        najaktywniejszy = {
+            "id_studenta": id_studenta,
+            "imie": student.imie if student else None,
+            "nazwisko": student.nazwisko if student else None,
+            "email": student.email if student else None,
+            "liczba_lekcji": int(lekcje_studentow[id_studenta]),
+        }
+
+    nazwy_przedmiotow = {id_przedmiotu: nazwa for nazwa, id_przedmiotu in id_przedmiotow.items()}
+    najpopularniejszy = None
+    if lekcje_przedmiotow.any():
+        id_przedmiotu = int(lekcje_przedmiotow.argmax())
+        najpopularniejszy = {
+            "nazwa_przedmiotu": nazwy_przedmiotow.get(id_przedmiotu),
+            "liczba_lekcji": int(lekcje_przedmiotow[id_przedmiotu]),
+        }
+
+    return {
+        "liczba_lekcji": liczba_lekcji,
+        "studenci_w_dni_powszednie": int(np.count_nonzero(studenci_powszednie[id_studentow])),
+        "nauczyciele_z_lekcjami_w_weekendy": int(np.count_nonzero(nauczyciele_weekend)),
+        "student_z_najwieksza_liczba_lekcji": najaktywniejszy,
+        "najczesciej_wybierany_przedmiot": najpopularniejszy,
+        "lekcje_z_matematyki": lekcje_matematyki,
+        "lekcje_w_srody": lekcje_srody,
+        "plan_nauczyciela": {
+            "id_nauczyciela": id_nauczyciela,
+            "dzien": dzien.isoformat(),
+            "lekcje": [
+                {"id_lekcji": id_lekcji, "przedmiot": przedmiot, "id_studenta": id_studenta}
+                for id_lekcji, przedmiot, id_studenta in plan
+            ],
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Raport lekcji (f1-f7) w jednym przebiegu")
+    parser.add_argument("--nauczyciel", type=int, default=4, help="Nauczyciel dla planu dnia (f7)")
+    parser.add_argument("--dzien", type=date.fromisoformat, default=date(2024, 12, 14), help="Dzień planu (f7)")
+    parser.add_argument("--paczka", type=int, default=ROZMIAR_PACZKI, help="Liczba lekcji czytanych naraz")
+    args = parser.parse_args()
+    with create_app().app_context():
+        wynik = raport(args.nauczyciel, args.dzien, args.paczka)
+    json.dump(wynik, sys.stdout, ensure_ascii=False, indent=2)
+    print()
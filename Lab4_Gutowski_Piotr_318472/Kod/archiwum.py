@@ -0,0 +1,131 @@
+import os
+from datetime import datetime
+
+from sqlalchemy import Column, Index, MetaData, Table, delete, func, insert, select, union_all
+from sqlalchemy.dialects.sqlite import insert as insert_sqlite
+from sqlalchemy.orm import aliased
+
+from modele import Lekcja, PartycjaLekcji, lekcje_autoincrement, ustaw_sekwencje_lekcji
+
+# Archiwum lekcji: lekcje starsze niż horyzont (pełne miesiące) przenoszone są z tabeli `lekcje` do tabel
+# miesięcznych `lekcje_RRRR_MM` zapisanych w rejestrze `partycje_lekcji` z zakresem dat. Tabela lekcje
+# (i jej indeksy) obejmuje wtedy tylko bieżące lekcje. Zapytania po zakresie dat (get-lessons, free-slots)
+# pobierają z rejestru partycje nachodzące na zakres i czytają UNION ALL lekcje + te partycje - zakres bez
+# archiwum to dokładnie dotychczasowe zapytanie. Partycje są tylko do odczytu: rezerwacje terminów sprzed
+# końca archiwum są odrzucane, więc unikalny indeks terminu nauczyciela na `lekcje` nadal wystarcza.
+#
+#   flask --app lab4serwer archive --miesiace 12
+
+# Domyślny horyzont: lekcje z bieżącego miesiąca i tylu poprzednich zostają w tabeli lekcje
+HORYZONT_MIESIECY = int(os.environ.get('ARCHIWUM_MIESIACE', 12))
+
+LEKCJE = Lekcja.__table__
+PARTYCJE = MetaData()
+
+# Koniec archiwum - lekcje wcześniejsze są tylko w partycjach (NULL, gdy archiwum jest puste)
+GRANICA = select(func.max(PartycjaLekcji.do))
+
+
+def kolumny_lekcji():
+    # Kolumny jak w tabeli lekcje (w tej samej kolejności), bez kluczy obcych
+    return [Column(kolumna.name, kolumna.type, primary_key=kolumna.primary_key, nullable=kolumna.nullable)
+            for kolumna in LEKCJE.c]
+
+
+# Lekcje przenoszone w bieżącym przebiegu archiwizacji (tabela tymczasowa połączenia)
+DO_ARCHIWUM = Table(
+    'lekcje_do_archiwum', PARTYCJE, *kolumny_lekcji(),
+    Index('ix_lekcje_do_archiwum_data', 'data_lekcji'),
+    prefixes=['TEMPORARY'],
+)
+
+
+def poczatek_miesiaca(data, przesuniecie=0):
+    """Pierwszy dzień miesiąca daty `data` przesuniętego o `przesuniecie` miesięcy."""
+    numer = data.year * 12 + data.month - 1 + przesuniecie
+    return datetime(numer // 12, numer % 12 + 1, 1)
+
+
+def tabela_partycji(nazwa):
+    """Tabela partycji `lekcje_RRRR_MM` z indeksami jak w tabeli lekcje (termin nauczyciela, lekcje studenta)."""
+    if nazwa not in PARTYCJE.tables:
+        # keep_existing - równoległe żądanie mogło właśnie dodać tę tabelę do metadanych
+        Table(
+            nazwa, PARTYCJE, *kolumny_lekcji(),
+            Index(f'ix_{nazwa}_nauczyciel_data', 'id_nauczyciela', 'data_lekcji'),
+            Index(f'ix_{nazwa}_student_data', 'id_studenta', 'data_lekcji'),
+            keep_existing=True,
+        )
+    return PARTYCJE.tables[nazwa]
+
+
+def zapytanie_partycji(od, do):
+    """Nazwy partycji z lekcjami z przedziału [od, do] (zapytanie do wykonania na sesji lub połączeniu)."""
+    return (
+        select(PartycjaLekcji.tabela)
+        .where(PartycjaLekcji.od <= do, PartycjaLekcji.do > od)
+        .order_by(PartycjaLekcji.od)
+    )
+
+
+def lekcje(partycje, warunki):
+    """Encja lekcji do zapytania po zakresie dat. Bez partycji to Lekcja, w przeciwnym razie Lekcja aliasowana
+    na UNION ALL tabeli lekcje i partycji. `warunki(kolumny)` zwraca warunki zapytania dla kolumn jednej
+    tabeli - trafiają do każdej gałęzi, więc każda czyta tylko zakres swojego indeksu."""
+    if not partycje:
+        return Lekcja
+    galezie = [
+        select(*tabela.c).where(*warunki(tabela.c))
+        for tabela in (LEKCJE, *map(tabela_partycji, partycje))
+    ]
+    return aliased(Lekcja, union_all(*galezie).subquery('lekcje'))
+
+
+def archiwizuj(polaczenie, granica):
+    """Przenosi lekcje sprzed początku miesiąca daty `granica` do partycji miesięcznych i dopisuje je
+    do rejestru. Wywoływane w transakcji zapisu (BEGIN IMMEDIATE) - czytelnicy widzą stan sprzed albo
+    po archiwizacji. Zwraca {nazwa partycji: liczba przeniesionych lekcji}."""
+    # Bez AUTOINCREMENT SQLite nadałby id przeniesionych lekcji ponownie nowym rezerwacjom
+    if not lekcje_autoincrement(polaczenie):
+        raise RuntimeError("Tabela lekcje bez AUTOINCREMENT - uruchom najpierw flask --app lab4serwer init-db")
+    granica = poczatek_miesiaca(granica)
+    # Jeden przebieg po tabeli lekcje - miesiące wybierane są już z tabeli tymczasowej po indeksie daty
+    DO_ARCHIWUM.create(polaczenie)
+    polaczenie.execute(insert(DO_ARCHIWUM).from_select(
+        [kolumna.name for kolumna in LEKCJE.c], select(*LEKCJE.c).where(LEKCJE.c.data_lekcji < granica)
+    ))
+    miesiace = polaczenie.execute(
+        select(func.min(DO_ARCHIWUM.c.data_lekcji))
+        .group_by(func.strftime('%Y-%m', DO_ARCHIWUM.c.data_lekcji))
+    ).scalars().all()
+
+    przeniesione = {}
+    for data in miesiace:
+        od, do = poczatek_miesiaca(data), poczatek_miesiaca(data, 1)
+        tabela = tabela_partycji(f'lekcje_{od:%Y_%m}')
+        tabela.create(polaczenie, checkfirst=True)
+        liczba = polaczenie.execute(insert(tabela).from_select(
+            [kolumna.name for kolumna in DO_ARCHIWUM.c],
+            select(*DO_ARCHIWUM.c).where(DO_ARCHIWUM.c.data_lekcji >= od, DO_ARCHIWUM.c.data_lekcji < do)
+        )).rowcount
+        rejestr = PartycjaLekcji.__table__
+        polaczenie.execute(
+            insert_sqlite(rejestr).values(tabela=tabela.name, od=od, do=do, liczba_lekcji=liczba)
+            .on_conflict_do_update(index_elements=[rejestr.c.tabela],
+                                   set_={'liczba_lekcji': rejestr.c.liczba_lekcji + liczba})
+        )
+        przeniesione[tabela.name] = liczba
+
+    # Po zapisaniu partycji w rejestrze - dla dziennika zmian (zmiany.py) to nie jest usunięcie lekcji
+    polaczenie.execute(delete(LEKCJE).where(LEKCJE.c.data_lekcji < granica))
+    DO_ARCHIWUM.drop(polaczenie)
+    ustaw_sekwencje_lekcji(polaczenie)
+    return przeniesione
+
+
+def usun_partycje(polaczenie):
+    """Usuwa wszystkie tabele partycji (także te, których nie ma już w rejestrze)."""
+    for (nazwa,) in polaczenie.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB 'lekcje_[0-9][0-9][0-9][0-9]_[0-9][0-9]'"
+    ).all():
+        polaczenie.exec_driver_sql(f"DROP TABLE {nazwa}")
@@ -0,0 +1,108 @@
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+# Porównanie serwera synchronicznego (lab4serwer.py, Flask z wątkiem na żądanie) z trybem ASGI
+# (lab4asgi.py pod uvicorn) przy wielu równoczesnych, wolnych klientach. Każdy klient otwiera
+# połączenie, wysyła połowę żądania, czeka --opoznienie sekund i dopiero wtedy je kończy.
+# Serwery używają bazy z DATABASE_URL (np. python generator_danych.py syntetyczne).
+#
+#   python benchmark_asgi.py --klienci 2000 --opoznienie 2
+
+KATALOG = os.path.dirname(os.path.abspath(__file__))
+
+SERWERY = {
+    "flask": [sys.executable, "-c", "import sys, lab4serwer; lab4serwer.create_app().run(port=int(sys.argv[1]), threaded=True)"],
+    "asgi": [sys.executable, "-m", "uvicorn", "lab4asgi:aplikacja", "--log-level", "warning", "--backlog", "4096", "--port"],
+}
+
+
+def pamiec_i_watki(pid):
+    """Szczytowe zużycie pamięci (MiB) i liczba wątków procesu (Linux)."""
+    stan = {}
+    with open(f"/proc/{pid}/status") as plik:
+        for linia in plik:
+            klucz, _, wartosc = linia.partition(":")
+            stan[klucz] = wartosc.strip()
+    return int(stan["VmHWM"].split()[0]) / 1024, int(stan["Threads"])
+
+
+async def wolny_klient(port, sciezka, opoznienie):
+    poczatek = time.perf_counter()
+    try:
+        czytnik, pisarz = await asyncio.open_connection("127.0.0.1", port)
+        pisarz.write(f"GET {sciezka} HTTP/1.1\r\n".encode())
+        await pisarz.drain()
+        await asyncio.sleep(opoznienie)
+        pisarz.write(b"Host: 127.0.0.1\r\nAuthorization: Piotr Gutowski\r\nConnection: close\r\n\r\n")
+        await pisarz.drain()
+        odpowiedz = await czytnik.read()
+        pisarz.close()
+        status = int(odpowiedz.split(b" ", 2)[1]) if odpowiedz else None
+    except (OSError, ValueError, IndexError):
+        status = None
+    return status, time.perf_counter() - poczatek
+
+
+async def uruchom_klientow(args, port, pid):
+    """Zwraca wyniki klientów i największą liczbę wątków serwera zaobserwowaną w trakcie pomiaru."""
+    los = random.Random(318472)
+    sciezki = [f"/teacher-details/{los.randint(1, args.nauczyciele)}" if los.random() < 0.5
+               else f"/teacher-list?kursor={los.randint(0, args.nauczyciele)}&limit=20"
+               for _ in range(args.klienci)]
+    klienci = asyncio.gather(*(wolny_klient(port, sciezka, args.opoznienie) for sciezka in sciezki))
+    watki = 0
+    while not klienci.done():
+        watki = max(watki, pamiec_i_watki(pid)[1])
+        await asyncio.wait([klienci], timeout=0.1)
+    return klienci.result(), watki
+
+
+def percentyl(posortowane, p):
+    return posortowane[min(len(posortowane) - 1, int(round(p / 100 * (len(posortowane) - 1))))]
+
+
+def zmierz(nazwa, args, port):
+    serwer = subprocess.Popen(SERWERY[nazwa] + [str(port)], cwd=KATALOG, stderr=subprocess.DEVNULL)
+    try:
+        time.sleep(args.start)
+        poczatek = time.perf_counter()
+        wyniki, watki = asyncio.run(uruchom_klientow(args, port, serwer.pid))
+        czas = time.perf_counter() - poczatek
+        pamiec = pamiec_i_watki(serwer.pid)[0]
+    finally:
+        serwer.terminate()
+        serwer.wait()
+
+    udane = sorted(czas_klienta for status, czas_klienta in wyniki if status == 200 or status == 404)
+    return {
+        "udane": len(udane),
+        "bledy": len(wyniki) - len(udane),
+        "czas_s": czas,
+        "p50_s": percentyl(udane, 50) if udane else None,
+        "p99_s": percentyl(udane, 99) if udane else None,
+        "pamiec_mib": pamiec,
+        "watki_max": watki,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Wolni klienci: serwer synchroniczny vs ASGI")
+    parser.add_argument("--serwery", nargs="+", choices=list(SERWERY), default=list(SERWERY))
+    parser.add_argument("--klienci", type=int, default=1000, help="Liczba równoczesnych połączeń")
+    parser.add_argument("--opoznienie", type=float, default=2.0, help="Czas wysyłania żądania przez klienta (s)")
+    parser.add_argument("--nauczyciele", type=int, default=5, help="Zakres id nauczycieli w bazie")
+    parser.add_argument("--port", type=int, default=5200)
+    parser.add_argument("--start", type=float, default=3.0, help="Czas na uruchomienie serwera (s)")
+    args = parser.parse_args()
+
+    print(f"{'serwer':<8}{'udane':>8}{'błędy':>8}{'czas s':>9}{'p50 s':>8}{'p99 s':>8}{'RSS MiB':>9}{'wątki':>7}")
+    for nr, nazwa in enumerate(args.serwery):
+        w = zmierz(nazwa, args, args.port + nr)
+        p50 = f"{w['p50_s']:>8.2f}" if w["p50_s"] is not None else f"{'-':>8}"
+        p99 = f"{w['p99_s']:>8.2f}" if w["p99_s"] is not None else f"{'-':>8}"
+        print(f"{nazwa:<8}{w['udane']:>8}{w['bledy']:>8}{w['czas_s']:>9.2f}{p50}{p99}{w['pamiec_mib']:>9.1f}{w['watki_max']:>7}")
@@ -0,0 +1,107 @@
+import argparse
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+# Benchmark indeksów tabeli lekcji: plan zapytania i czas odpowiedzi przed i po
+# dodaniu indeksów (id_nauczyciela, data_lekcji) oraz (id_studenta, data_lekcji).
+
+SCHEMAT = """
+CREATE TABLE lekcje (
+    id_lekcji INTEGER PRIMARY KEY,
+    id_nauczyciela INTEGER NOT NULL,
+    id_studenta INTEGER NOT NULL,
+    id_przedmiotu INTEGER NOT NULL,
+    data_lekcji DATETIME NOT NULL
+)
+"""
+
+INDEKSY = [
+    "CREATE UNIQUE INDEX ix_lekcje_nauczyciel_data ON lekcje (id_nauczyciela, data_lekcji)",
+    "CREATE INDEX ix_lekcje_student_data ON lekcje (id_studenta, data_lekcji)",
+]
+
+# Zapytania odpowiadające book_lesson i get_lessons
+ZAPYTANIE_TERMIN = "SELECT id_lekcji FROM lekcje WHERE id_nauczyciela = ? AND data_lekcji = ? LIMIT 1"
+ZAPYTANIE_ZAKRES = ("SELECT id_lekcji, data_lekcji FROM lekcje "
+                    "WHERE id_studenta = ? AND data_lekcji >= ? AND data_lekcji <= ?")
+
+START = datetime(2024, 1, 1, 8, 0)
+
+
+def format_daty(data):
+    # Format zapisu DateTime używany przez SQLAlchemy dla SQLite
+    return data.strftime("%Y-%m-%d %H:%M:%S.000000")
+
+
+def wypelnij(polaczenie, liczba_lekcji, liczba_nauczycieli, liczba_studentow):
+    def wiersze():
+        for nr in range(liczba_lekcji):
+            # Kolejne godziny danego nauczyciela - terminy się nie powtarzają
+            id_nauczyciela = nr % liczba_nauczycieli + 1
+            data = START + timedelta(hours=nr // liczba_nauczycieli)
+            yield (id_nauczyciela, random.randint(1, liczba_studentow), 1, format_daty(data))
+
+    polaczenie.executemany(
+        "INSERT INTO lekcje (id_nauczyciela, id_studenta, id_przedmiotu, data_lekcji) VALUES (?, ?, ?, ?)",
+        wiersze()
+    )
+    polaczenie.commit()
+
+
+def zmierz(polaczenie, zapytanie, parametry, powtorzenia):
+    plan = [wiersz[3] for wiersz in polaczenie.execute("EXPLAIN QUERY PLAN " + zapytanie, parametry[0])]
+    poczatek = time.perf_counter()
+    for nr in range(powtorzenia):
+        polaczenie.execute(zapytanie, parametry[nr % len(parametry)]).fetchall()
+    sredni_czas_ms = (time.perf_counter() - poczatek) / powtorzenia * 1000
+    return plan, sredni_czas_ms
+
+
+def uruchom(args):
+    polaczenie = sqlite3.connect(args.baza)
+    polaczenie.execute("DROP TABLE IF EXISTS lekcje")
+    polaczenie.execute(SCHEMAT)
+    print(f"Wypełnianie tabeli lekcje ({args.lekcje} wierszy)...")
+    wypelnij(polaczenie, args.lekcje, args.nauczyciele, args.studenci)
+
+    godziny = args.lekcje // args.nauczyciele
+    parametry_termin = [
+        (random.randint(1, args.nauczyciele), format_daty(START + timedelta(hours=random.randint(0, godziny))))
+        for _ in range(100)
+    ]
+    parametry_zakres = []
+    for _ in range(100):
+        od = START + timedelta(hours=random.randint(0, godziny))
+        parametry_zakres.append((random.randint(1, args.studenci), format_daty(od), format_daty(od + timedelta(days=7))))
+
+    for etap, naglowek in (("przed", "PRZED DODANIEM INDEKSÓW"), ("po", "PO DODANIU INDEKSÓW")):
+        if etap == "po":
+            poczatek = time.perf_counter()
+            for ddl in INDEKSY:
+                polaczenie.execute(ddl)
+            polaczenie.commit()
+            print(f"\nTworzenie indeksów: {time.perf_counter() - poczatek:.2f} s")
+
+        print(f"\n### {naglowek} ###")
+        for nazwa, zapytanie, parametry in (
+            ("book_lesson (termin nauczyciela)", ZAPYTANIE_TERMIN, parametry_termin),
+            ("get_lessons (zakres dat studenta)", ZAPYTANIE_ZAKRES, parametry_zakres),
+        ):
+            plan, czas_ms = zmierz(polaczenie, zapytanie, parametry, args.powtorzenia)
+            print(f"{nazwa}: {czas_ms:.3f} ms/zapytanie")
+            for krok in plan:
+                print(f"    plan: {krok}")
+
+    polaczenie.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark indeksów tabeli lekcji")
+    parser.add_argument("--baza", default="benchmark_indeksy.db", help="Plik bazy SQLite (zostanie nadpisany)")
+    parser.add_argument("--lekcje", type=int, default=1_000_000)
+    parser.add_argument("--nauczyciele", type=int, default=1_000)
+    parser.add_argument("--studenci", type=int, default=20_000)
+    parser.add_argument("--powtorzenia", type=int, default=50)
+    uruchom(parser.parse_args())
@@ -0,0 +1,97 @@
+import argparse
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+# Koszt serializacji i rozmiar odpowiedzi: czas CPU na żądanie i bajty wysłane dla dużych odpowiedzi
+# (/teacher-list z limitem 1000, /get-lessons za cały rok, /free-slots dla wielu nauczycieli)
+# w konfiguracjach: json z biblioteki standardowej / orjson, bez kompresji / gzip / brotli.
+# Każda konfiguracja działa w osobnym procesie (ustawienia serializacji i kompresji czytane są przy imporcie).
+#
+#   python benchmark_json.py --nauczyciele 1000 --studenci 1000 --lekcje 200000 --powtorzenia 200
+
+KATALOG = os.path.dirname(os.path.abspath(__file__))
+
+KONFIGURACJE = {
+    "json": ({"JSON_ORJSON": "0", "KOMPRESJA": "0"}, None),
+    "orjson": ({"JSON_ORJSON": "1", "KOMPRESJA": "0"}, None),
+    "orjson+gzip": ({"JSON_ORJSON": "1", "KOMPRESJA": "1"}, "gzip"),
+    "orjson+br": ({"JSON_ORJSON": "1", "KOMPRESJA": "1"}, "br"),
+}
+
+
+def zadania(args):
+    los = random.Random(318472)
+    for _ in range(args.powtorzenia):
+        yield "teacher-list", "/teacher-list", {"kursor": los.randint(0, args.nauczyciele // 2), "limit": 1000}
+        yield "get-lessons", "/get-lessons", {
+            "id_studenta": los.randint(1, args.studenci),
+            "data_początkowa": "2024-01-01 00:00",
+            "data_końcowa": "2024-12-31 23:59",
+        }
+        yield "free-slots", "/free-slots", {
+            "id_nauczyciela": ",".join(str(los.randint(1, args.nauczyciele)) for _ in range(50)),
+            "data_początkowa": "2024-03-04 00:00",
+            "data_końcowa": "2024-03-18 00:00",
+        }
+
+
+def pomiar(nazwa, args, wyniki):
+    ustawienia, kodowanie = KONFIGURACJE[nazwa]
+    os.environ.update(ustawienia)
+    from lab4serwer import create_app
+
+    klient = create_app({"METRYKI": False, "WOLNE_ZAPYTANIA_MS": -1}).test_client()
+    naglowki = {"Accept-Encoding": kodowanie} if kodowanie else {}
+    suma = {}
+    for endpoint, sciezka, parametry in zadania(args):
+        cpu = time.process_time()
+        response = klient.get(sciezka, query_string=parametry, headers=naglowki)
+        bajty = len(response.get_data())
+        cpu = time.process_time() - cpu
+        if kodowanie and kodowanie not in response.headers.get("Content-Encoding", kodowanie):
+            raise RuntimeError(f"{nazwa}: oczekiwano {kodowanie}, otrzymano {response.headers.get('Content-Encoding')}")
+        stan = suma.setdefault(endpoint, [0, 0.0, 0])
+        stan[0] += 1
+        stan[1] += cpu
+        stan[2] += bajty
+    wyniki.put((nazwa, suma))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Czas CPU i bajty odpowiedzi: json vs orjson, bez kompresji vs gzip/brotli")
+    parser.add_argument("--konfiguracje", nargs="+", choices=list(KONFIGURACJE), default=list(KONFIGURACJE))
+    parser.add_argument("--powtorzenia", type=int, default=100, help="Liczba żądań do każdego endpointu")
+    parser.add_argument("--nauczyciele", type=int, default=1_000)
+    parser.add_argument("--studenci", type=int, default=1_000)
+    parser.add_argument("--lekcje", type=int, default=200_000)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    subprocess.run(
+        [sys.executable, os.path.join(KATALOG, "generator_danych.py"), "syntetyczne",
+         "--nauczyciele", str(args.nauczyciele), "--studenci", str(args.studenci), "--lekcje", str(args.lekcje)],
+        check=True, stdout=subprocess.DEVNULL,
+    )
+
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        if "orjson+br" in args.konfiguracje:
+            print("brotli nie jest zainstalowany - pomijam orjson+br")
+            args.konfiguracje.remove("orjson+br")
+
+    kontekst = multiprocessing.get_context("fork")
+    print(f"{'konfiguracja':<14}{'endpoint':<14}{'CPU ms/żądanie':>16}{'KiB/odpowiedź':>15}")
+    for nazwa in args.konfiguracje:
+        wyniki = kontekst.Queue()
+        proces = kontekst.Process(target=pomiar, args=(nazwa, args, wyniki))
+        proces.start()
+        _, suma = wyniki.get()
+        proces.join()
+        for endpoint, (liczba, cpu, bajty) in suma.items():
+            print(f"{nazwa:<14}{endpoint:<14}{cpu / liczba * 1000:>16.2f}{bajty / liczba / 1024:>15.1f}")
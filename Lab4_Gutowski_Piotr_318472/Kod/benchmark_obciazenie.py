@@ -0,0 +1,215 @@
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+# Test obciążeniowy pięciu endpointów serwera lab4serwer.py.
+# Tryb "proces" używa klienta testowego Flaska (baza z DATABASE_URL), tryb "http" - działającego serwera.
+# Wynik (przepustowość, p50/p95/p99 dla każdego endpointu) zapisywany jest do pliku JSON,
+# a opcja --porownaj wypisuje różnice względem wcześniejszego wyniku.
+#
+#   python generator_danych.py syntetyczne --nauczyciele 1000 --lekcje 100000
+#   python benchmark_obciazenie.py --tryb proces --zadania 5000 --wspolbieznosc 8 --wynik wynik.json
+
+HEADERS = {"Authorization": "Piotr Gutowski"}
+DOMYSLNY_MIX = "teacher-list=30,teacher-details=30,get-lessons=25,book-lesson=10,add-teacher=5"
+
+
+def parsuj_mix(tekst):
+    mix = {}
+    for czesc in tekst.split(","):
+        endpoint, waga = czesc.split("=")
+        if endpoint not in ZADANIA:
+            raise argparse.ArgumentTypeError(f"Nieznany endpoint: {endpoint}")
+        mix[endpoint] = float(waga)
+    return mix
+
+
+# Każde zadanie zwraca (metoda, ścieżka, parametry, json)
+def zadanie_teacher_list(los, args):
+    return "GET", "/teacher-list", {"kursor": los.randint(0, args.nauczyciele), "limit": 100}, None
+
+
+def zadanie_teacher_details(los, args):
+    return "GET", f"/teacher-details/{los.randint(1, args.nauczyciele)}", None, None
+
+
+def zadanie_get_lessons(los, args):
+    od = args.od + timedelta(days=los.randint(0, args.dni))
+    return "GET", "/get-lessons", {
+        "id_studenta": los.randint(1, args.studenci),
+        "data_początkowa": od.strftime("%Y-%m-%d %H:%M"),
+        "data_końcowa": (od + timedelta(days=30)).strftime("%Y-%m-%d %H:%M"),
+    }, None
+
+
+def zadanie_book_lesson(los, args):
+    data = datetime(2030, 1, 1) + timedelta(days=los.randint(0, 3650), hours=los.randint(8, 16))
+    return "POST", "/book-lesson", None, {
+        "id_studenta": los.randint(1, args.studenci),
+        "id_nauczyciela": los.randint(1, args.nauczyciele),
+        "data_lekcji": data.strftime("%Y-%m-%d %H:%M"),
+    }
+
+
+def zadanie_add_teacher(los, args):
+    return "POST", "/add-teacher", None, {
+        "imie": "Adam",
+        "nazwisko": "Nowakowski",
+        "prowadzone_przedmioty": "matematyka, fizyka",
+        "opis": "Nauczyciel z benchmarku.",
+        "ocena_nauczyciela": round(los.uniform(3.0, 5.0), 1),
+        "numer_telefonu": "123456788",
+        "stawka": los.randint(40, 120),
+        "waluta": "PLN",
+        "email": f"benchmark.{uuid.uuid4().hex}@example.com",
+        "id": los.randint(1, args.nauczyciele),
+    }
+
+
+ZADANIA = {
+    "teacher-list": zadanie_teacher_list,
+    "teacher-details": zadanie_teacher_details,
+    "get-lessons": zadanie_get_lessons,
+    "book-lesson": zadanie_book_lesson,
+    "add-teacher": zadanie_add_teacher,
+}
+
+
+def klient_procesu(app):
+    klient = app.test_client()
+
+    def wyslij(metoda, sciezka, parametry, dane):
+        return klient.open(sciezka, method=metoda, query_string=parametry, json=dane, headers=HEADERS).status_code
+
+    return wyslij
+
+
+def klient_http(url):
+    import requests
+
+    sesja = requests.Session()
+
+    def wyslij(metoda, sciezka, parametry, dane):
+        return sesja.request(metoda, url + sciezka, params=parametry, json=dane, headers=HEADERS).status_code
+
+    return wyslij
+
+
+def percentyl(posortowane, p):
+    if not posortowane:
+        return None
+    return posortowane[min(len(posortowane) - 1, int(round(p / 100 * (len(posortowane) - 1))))]
+
+
+def podsumuj(pomiary):
+    czasy = sorted(czas for _, czas in pomiary)
+    statusy = {}
+    for status, _ in pomiary:
+        statusy[str(status)] = statusy.get(str(status), 0) + 1
+    return {
+        "liczba": len(pomiary),
+        "statusy": statusy,
+        "srednia_ms": sum(czasy) / len(czasy) if czasy else None,
+        "p50_ms": percentyl(czasy, 50),
+        "p95_ms": percentyl(czasy, 95),
+        "p99_ms": percentyl(czasy, 99),
+        "max_ms": czasy[-1] if czasy else None,
+    }
+
+
+def uruchom(args):
+    endpointy = list(args.mix)
+    wagi = [args.mix[endpoint] for endpoint in endpointy]
+    pomiary = {endpoint: [] for endpoint in endpointy}
+    blokada = threading.Lock()
+    if args.tryb == "proces":
+        # Jedna aplikacja (i pula połączeń) dla wszystkich wątków
+        from lab4serwer import create_app
+
+        app = create_app()
+
+    def pracownik(nr):
+        los = random.Random(args.ziarno + nr)
+        wyslij = klient_procesu(app) if args.tryb == "proces" else klient_http(args.url)
+        lokalne = []
+        for _ in range(args.zadania // args.wspolbieznosc):
+            endpoint = los.choices(endpointy, wagi)[0]
+            zadanie = ZADANIA[endpoint](los, args)
+            poczatek = time.perf_counter()
+            status = wyslij(*zadanie)
+            lokalne.append((endpoint, status, (time.perf_counter() - poczatek) * 1000))
+        with blokada:
+            for endpoint, status, czas_ms in lokalne:
+                pomiary[endpoint].append((status, czas_ms))
+
+    poczatek = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.wspolbieznosc) as pula:
+        list(pula.map(pracownik, range(args.wspolbieznosc)))
+    czas_calkowity = time.perf_counter() - poczatek
+
+    wszystkie = [pomiar for lista in pomiary.values() for pomiar in lista]
+    return {
+        "konfiguracja": {
+            "tryb": args.tryb,
+            "url": args.url if args.tryb == "http" else None,
+            "zadania": len(wszystkie),
+            "wspolbieznosc": args.wspolbieznosc,
+            "mix": args.mix,
+            "data": datetime.now().isoformat(timespec="seconds"),
+        },
+        "calosc": dict(podsumuj(wszystkie), czas_s=czas_calkowity, przepustowosc_rps=len(wszystkie) / czas_calkowity),
+        "endpointy": {endpoint: podsumuj(lista) for endpoint, lista in pomiary.items()},
+    }
+
+
+def wypisz(wynik, poprzedni=None):
+    def zmiana(nowa, stara):
+        if poprzedni is None or not stara or nowa is None:
+            return ""
+        return f" ({(nowa - stara) / stara * 100:+.1f}%)"
+
+    calosc = wynik["calosc"]
+    stara_calosc = (poprzedni or {}).get("calosc", {})
+    print(f"Żądania: {calosc['liczba']} w {calosc['czas_s']:.2f} s, "
+          f"przepustowość {calosc['przepustowosc_rps']:.1f} req/s"
+          f"{zmiana(calosc['przepustowosc_rps'], stara_calosc.get('przepustowosc_rps'))}")
+    print(f"{'endpoint':<18}{'liczba':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}  statusy")
+    for endpoint, dane in wynik["endpointy"].items():
+        if not dane["liczba"]:
+            continue
+        stare = (poprzedni or {}).get("endpointy", {}).get(endpoint, {})
+        print(f"{endpoint:<18}{dane['liczba']:>8}{dane['p50_ms']:>10.2f}{dane['p95_ms']:>10.2f}{dane['p99_ms']:>10.2f}  "
+              f"{dane['statusy']}{zmiana(dane['p95_ms'], stare.get('p95_ms'))}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Test obciążeniowy API lekcji")
+    parser.add_argument("--tryb", choices=["proces", "http"], default="proces")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--zadania", type=int, default=2000, help="Łączna liczba żądań")
+    parser.add_argument("--wspolbieznosc", type=int, default=4, help="Liczba równoległych klientów")
+    parser.add_argument("--mix", type=parsuj_mix, default=parsuj_mix(DOMYSLNY_MIX),
+                        help=f"Udział endpointów, np. {DOMYSLNY_MIX}")
+    parser.add_argument("--nauczyciele", type=int, default=5, help="Zakres id nauczycieli w bazie")
+    parser.add_argument("--studenci", type=int, default=3, help="Zakres id studentów w bazie")
+    parser.add_argument("--od", type=datetime.fromisoformat, default=datetime(2024, 12, 1), help="Początek danych lekcji")
+    parser.add_argument("--dni", type=int, default=30, help="Zakres dni danych lekcji")
+    parser.add_argument("--ziarno", type=int, default=318472)
+    parser.add_argument("--wynik", default="wynik_obciazenia.json", help="Plik JSON z wynikiem")
+    parser.add_argument("--porownaj", help="Wcześniejszy plik JSON do porównania")
+    args = parser.parse_args()
+
+    wynik = uruchom(args)
+    poprzedni = None
+    if args.porownaj:
+        with open(args.porownaj, encoding="utf-8") as plik:
+            poprzedni = json.load(plik)
+    wypisz(wynik, poprzedni)
+    with open(args.wynik, "w", encoding="utf-8") as plik:
+        json.dump(wynik, plik, ensure_ascii=False, indent=2)
+    print(f"Zapisano wynik do {args.wynik}")
@@ -0,0 +1,57 @@
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+import requests
+
+# Porównanie rezerwacji lekcja po lekcji (/book-lesson) z rezerwacją zbiorczą (/book-lessons)
+# na działającym serwerze (jak w skrypt.py).
+
+BASE_URL = "http://127.0.0.1:5000"
+HEADERS = {"Authorization": "Piotr Gutowski"}
+
+
+def losowe_terminy(liczba, id_nauczyciela, id_studenta):
+    # Cotygodniowe lekcje w losowo wybranym przyszłym tygodniu - kolejne uruchomienia nie kolidują ze sobą
+    poczatek = datetime(2030, 1, 7, 10, 0) + timedelta(weeks=random.randint(0, 300_000))
+    return [
+        {
+            "id_studenta": id_studenta,
+            "id_nauczyciela": id_nauczyciela,
+            "data_lekcji": (poczatek + timedelta(weeks=nr)).strftime("%Y-%m-%d %H:%M"),
+        }
+        for nr in range(liczba)
+    ]
+
+
+def pojedynczo(sesja, base_url, rezerwacje):
+    poczatek = time.perf_counter()
+    for rezerwacja in rezerwacje:
+        response = sesja.post(f"{base_url}/book-lesson", headers=HEADERS, json=rezerwacja)
+        assert response.status_code == 201, response.text
+    return time.perf_counter() - poczatek
+
+
+def zbiorczo(sesja, base_url, rezerwacje):
+    poczatek = time.perf_counter()
+    response = sesja.post(f"{base_url}/book-lessons", headers=HEADERS, json=rezerwacje)
+    assert response.status_code == 201, response.text
+    return time.perf_counter() - poczatek
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark rezerwacji zbiorczej")
+    parser.add_argument("--url", default=BASE_URL)
+    parser.add_argument("--lekcje", type=int, default=300, help="Liczba lekcji (np. semestr zajęć)")
+    parser.add_argument("--id-nauczyciela", type=int, default=1)
+    parser.add_argument("--id-studenta", type=int, default=1)
+    args = parser.parse_args()
+
+    with requests.Session() as sesja:
+        czas_pojedynczo = pojedynczo(sesja, args.url, losowe_terminy(args.lekcje, args.id_nauczyciela, args.id_studenta))
+        czas_zbiorczo = zbiorczo(sesja, args.url, losowe_terminy(args.lekcje, args.id_nauczyciela, args.id_studenta))
+
+    print(f"/book-lesson  x{args.lekcje}: {czas_pojedynczo:.3f} s ({args.lekcje / czas_pojedynczo:.0f} lekcji/s)")
+    print(f"/book-lessons x1:   {czas_zbiorczo:.3f} s ({args.lekcje / czas_zbiorczo:.0f} lekcji/s)")
+    print(f"Przyspieszenie: {czas_pojedynczo / czas_zbiorczo:.1f}x")
@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Czas uruchomienia aplikacji: każdy pomiar to nowy proces Pythona, w którym mierzone są import lab4serwer,
+# create_app() i pierwsza odpowiedź (/teacher-list przez klienta testowego) - tyle płaci każdy worker
+# przy starcie i każdy test tworzący aplikację. Dodatkowo sprawdzane jest, że import i create_app
+# nie tworzą pliku bazy. Z --limit-ms skrypt kończy się kodem 1, gdy mediana czasu do pierwszej
+# odpowiedzi (od uruchomienia procesu) przekracza limit.
+#
+#   python benchmark_start.py --powtorzenia 20 --limit-ms 1500
+
+KATALOG = os.path.dirname(os.path.abspath(__file__))
+
+POMIAR = """
+import json, sys, time
+start = time.perf_counter()
+import lab4serwer
+po_imporcie = time.perf_counter()
+app = lab4serwer.create_app()
+po_create_app = time.perf_counter()
+response = app.test_client().get('/teacher-list', query_string={'limit': 1})
+koniec = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(json.dumps({
+    'import_ms': (po_imporcie - start) * 1000,
+    'create_app_ms': (po_create_app - po_imporcie) * 1000,
+    'pierwsza_odpowiedz_ms': (koniec - po_create_app) * 1000,
+}))
+"""
+
+BEZ_ZAPISU = """
+import lab4serwer
+lab4serwer.create_app()
+"""
+
+
+def uruchom(kod, srodowisko):
+    """(wynik procesu, czas od uruchomienia interpretera do zakończenia w ms)."""
+    poczatek = time.perf_counter()
+    wynik = subprocess.run([sys.executable, "-c", kod], cwd=KATALOG, env=srodowisko, check=True,
+                           capture_output=True, text=True)
+    return wynik, (time.perf_counter() - poczatek) * 1000
+
+
+def percentyl(wartosci, p):
+    posortowane = sorted(wartosci)
+    return posortowane[min(len(posortowane) - 1, int(round(p / 100 * (len(posortowane) - 1))))]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Czas od uruchomienia procesu do pierwszej odpowiedzi aplikacji")
+    parser.add_argument("--powtorzenia", type=int, default=10)
+    parser.add_argument("--limit-ms", type=float, help="Maksymalna mediana czasu do pierwszej odpowiedzi")
+    args = parser.parse_args()
+
+    katalog = tempfile.mkdtemp()
+    srodowisko = dict(os.environ, DATABASE_URL="sqlite:///" + os.path.join(katalog, "start.db"))
+    subprocess.run([sys.executable, os.path.join(KATALOG, "generator_danych.py"), "demo"],
+                   env=srodowisko, check=True, stdout=subprocess.DEVNULL)
+
+    fazy = {"import_ms": [], "create_app_ms": [], "pierwsza_odpowiedz_ms": [], "proces_ms": []}
+    for _ in range(args.powtorzenia):
+        wynik, czas_procesu = uruchom(POMIAR, srodowisko)
+        for faza, czas in json.loads(wynik.stdout).items():
+            fazy[faza].append(czas)
+        fazy["proces_ms"].append(czas_procesu)
+
+    print(f"{'faza':<24}{'mediana ms':>12}{'p95 ms':>10}{'max ms':>10}")
+    for faza, czasy in fazy.items():
+        print(f"{faza:<24}{statistics.median(czasy):>12.1f}{percentyl(czasy, 95):>10.1f}{max(czasy):>10.1f}")
+
+    nowa_baza = os.path.join(katalog, "nowa.db")
+    uruchom(BEZ_ZAPISU, dict(srodowisko, DATABASE_URL="sqlite:///" + nowa_baza))
+    bledy = []
+    if os.path.exists(nowa_baza):
+        bledy.append("import i create_app utworzyły plik bazy")
+    mediana = statistics.median(fazy["proces_ms"])
+    if args.limit_ms is not None and mediana > args.limit_ms:
+        bledy.append(f"mediana {mediana:.1f} ms przekracza limit {args.limit_ms:.1f} ms")
+    for blad in bledy:
+        print(f"BŁĄD: {blad}")
+    sys.exit(1 if bledy else 0)
@@ -0,0 +1,124 @@
+import argparse
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Przepustowość odczytów przy równoległych zapisach dla różnych konfiguracji magazynu SQLite.
+# Dla każdej konfiguracji tworzona jest nowa baza syntetyczna, po czym osobne procesy (jak workery
+# serwera) przez --czas sekund wysyłają odczyty (teacher-list, get-lessons, free-slots) i rezerwacje
+# (book-lesson). Błędy 500 po stronie czytelników to zwykle "database is locked".
+#
+#   python benchmark_wal.py --czytelnicy 4 --piszacy 2 --czas 10
+
+KATALOG = os.path.dirname(os.path.abspath(__file__))
+
+KONFIGURACJE = {
+    "delete": {"SQLITE_JOURNAL_MODE": "delete", "SQLITE_SYNCHRONOUS": "full", "DB_ODCZYT_OSOBNO": "0"},
+    "wal": {"SQLITE_JOURNAL_MODE": "wal", "SQLITE_SYNCHRONOUS": "normal", "DB_ODCZYT_OSOBNO": "0"},
+    "wal+odczyt": {"SQLITE_JOURNAL_MODE": "wal", "SQLITE_SYNCHRONOUS": "normal", "DB_ODCZYT_OSOBNO": "1"},
+}
+
+
+def czytelnik(nr, args, koniec, wyniki):
+    from lab4serwer import create_app
+
+    klient = create_app().test_client()
+    los = random.Random(nr)
+    statusy = {}
+    while time.time() < koniec:
+        wybor = los.random()
+        if wybor < 0.4:
+            response = klient.get("/teacher-list", query_string={"kursor": los.randint(0, args.nauczyciele), "limit": 50})
+        elif wybor < 0.8:
+            od = datetime(2024, 1, 1) + timedelta(days=los.randint(0, 330))
+            response = klient.get("/get-lessons", query_string={
+                "id_studenta": los.randint(1, args.studenci),
+                "data_początkowa": od.strftime("%Y-%m-%d %H:%M"),
+                "data_końcowa": (od + timedelta(days=30)).strftime("%Y-%m-%d %H:%M"),
+            })
+        else:
+            od = datetime(2024, 1, 1) + timedelta(days=los.randint(0, 358))
+            response = klient.get("/free-slots", query_string={
+                "id_nauczyciela": ",".join(str(los.randint(1, args.nauczyciele)) for _ in range(5)),
+                "data_początkowa": od.strftime("%Y-%m-%d %H:%M"),
+                "data_końcowa": (od + timedelta(days=7)).strftime("%Y-%m-%d %H:%M"),
+            })
+        statusy[response.status_code] = statusy.get(response.status_code, 0) + 1
+    wyniki.put(("odczyt", statusy))
+
+
+def piszacy(nr, args, koniec, wyniki):
+    from lab4serwer import create_app
+    from modele import KalendarzNauczyciela, db
+
+    app = create_app()
+    with app.app_context():
+        kalendarze = db.session.execute(
+            db.select(KalendarzNauczyciela.id_nauczyciela, KalendarzNauczyciela.dostepny_od, KalendarzNauczyciela.dostepny_do)
+        ).all()
+    klient = app.test_client()
+    los = random.Random(1000 + nr)
+    statusy = {}
+    while time.time() < koniec:
+        # Termin w godzinach kalendarza nauczyciela, daleko w przyszłości - konflikty są rzadkie
+        id_nauczyciela, od, do = los.choice(kalendarze)
+        data = datetime(2030, 1, 1) + timedelta(days=los.randint(0, 36500), hours=los.randint(od.hour, do.hour - 1))
+        response = klient.post("/book-lesson", json={
+            "id_studenta": los.randint(1, args.studenci),
+            "id_nauczyciela": id_nauczyciela,
+            "data_lekcji": data.strftime("%Y-%m-%d %H:%M"),
+        })
+        statusy[response.status_code] = statusy.get(response.status_code, 0) + 1
+    wyniki.put(("zapis", statusy))
+
+
+def zmierz(nazwa, args):
+    plik = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    os.environ.update(KONFIGURACJE[nazwa], DATABASE_URL="sqlite:///" + plik)
+    subprocess.run(
+        [sys.executable, os.path.join(KATALOG, "generator_danych.py"), "syntetyczne",
+         "--nauczyciele", str(args.nauczyciele), "--studenci", str(args.studenci), "--lekcje", str(args.lekcje)],
+        check=True, stdout=subprocess.DEVNULL,
+    )
+
+    # Procesy dziedziczą zmienne środowiskowe - każdy tworzy własne połączenia z tą konfiguracją
+    kontekst = multiprocessing.get_context("fork")
+    wyniki = kontekst.Queue()
+    koniec = time.time() + args.czas
+    procesy = [kontekst.Process(target=czytelnik, args=(nr, args, koniec, wyniki)) for nr in range(args.czytelnicy)]
+    procesy += [kontekst.Process(target=piszacy, args=(nr, args, koniec, wyniki)) for nr in range(args.piszacy)]
+    for proces in procesy:
+        proces.start()
+    zebrane = [wyniki.get() for _ in procesy]
+    for proces in procesy:
+        proces.join()
+
+    suma = {"odczyt": {}, "zapis": {}}
+    for rodzaj, statusy in zebrane:
+        for status, liczba in statusy.items():
+            suma[rodzaj][status] = suma[rodzaj].get(status, 0) + liczba
+    return suma
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Odczyty przy równoległych zapisach: journal_mode DELETE vs WAL")
+    parser.add_argument("--konfiguracje", nargs="+", choices=list(KONFIGURACJE), default=list(KONFIGURACJE))
+    parser.add_argument("--czytelnicy", type=int, default=4, help="Liczba procesów wysyłających odczyty")
+    parser.add_argument("--piszacy", type=int, default=2, help="Liczba procesów rezerwujących lekcje")
+    parser.add_argument("--czas", type=float, default=10, help="Czas pomiaru w sekundach")
+    parser.add_argument("--nauczyciele", type=int, default=1_000)
+    parser.add_argument("--studenci", type=int, default=10_000)
+    parser.add_argument("--lekcje", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'konfiguracja':<14}{'odczyty/s':>12}{'zapisy/s':>12}  statusy odczytów / zapisów")
+    for nazwa in args.konfiguracje:
+        suma = zmierz(nazwa, args)
+        odczyty = sum(liczba for status, liczba in suma["odczyt"].items() if status < 500)
+        zapisy = suma["zapis"].get(201, 0)
+        print(f"{nazwa:<14}{odczyty / args.czas:>12.1f}{zapisy / args.czas:>12.1f}  {suma['odczyt']} / {suma['zapis']}")
@@ -0,0 +1,18 @@
+import pytest
+
+import generator_danych
+from lab4serwer import create_app
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Aplikacja z nową bazą w katalogu tymczasowym, zasiloną zestawem demonstracyjnym."""
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}", 'METRYKI': False})
+    with app.app_context():
+        generator_danych.uruchom('demo')
+    return app
+
+
+@pytest.fixture
+def klient(app):
+    return app.test_client()
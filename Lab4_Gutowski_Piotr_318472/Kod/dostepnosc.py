@@ -0,0 +1,91 @@
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+
+# Silnik dostępności nauczycieli: wolne przedziały czasu to okna z kalendarza
+# (dostepny_od - dostepny_do, codziennie) pomniejszone o zarezerwowane lekcje.
+# Wszystkie przedziały są półotwarte [od, do) i posortowane po początku.
+
+CZAS_LEKCJI = timedelta(hours=1)
+# Najdłuższa dopuszczalna lekcja - ogranicza zakres dat przeszukiwany przy wykrywaniu kolizji
+MAKSYMALNY_CZAS_LEKCJI = timedelta(hours=3)
+
+
+def scal_przedzialy(przedzialy):
+    """Scala nachodzące na siebie lub stykające się przedziały (lista musi być posortowana)."""
+    wynik = []
+    for od, do in przedzialy:
+        if wynik and od <= wynik[-1][1]:
+            if do > wynik[-1][1]:
+                wynik[-1] = (wynik[-1][0], do)
+        else:
+            wynik.append((od, do))
+    return wynik
+
+
+def okna_kalendarza(godziny, od, do):
+    """Okna dostępności w zakresie [od, do) dla codziennych godzin [(dostepny_od, dostepny_do), ...]."""
+    okna = []
+    dzien = od.date()
+    while dzien <= do.date():
+        for godzina_od, godzina_do in godziny:
+            if godzina_od >= godzina_do:
+                continue
+            poczatek = max(datetime.combine(dzien, godzina_od), od)
+            koniec = min(datetime.combine(dzien, godzina_do), do)
+            if poczatek < koniec:
+                okna.append((poczatek, koniec))
+        dzien += timedelta(days=1)
+    okna.sort()
+    return scal_przedzialy(okna)
+
+
+def odejmij_przedzialy(okna, zajete):
+    """Odejmuje posortowane przedziały `zajete` od posortowanych, rozłącznych `okna` (scalanie liniowe)."""
+    wolne = []
+    nr = 0
+    for od, do in okna:
+        # Pomijamy zajęte przedziały kończące się przed początkiem okna
+        while nr < len(zajete) and zajete[nr][1] <= od:
+            nr += 1
+        poczatek = od
+        kolejny = nr
+        while kolejny < len(zajete) and zajete[kolejny][0] < do:
+            zajete_od, zajete_do = zajete[kolejny]
+            if zajete_od > poczatek:
+                wolne.append((poczatek, zajete_od))
+            poczatek = max(poczatek, zajete_do)
+            kolejny += 1
+        if poczatek < do:
+            wolne.append((poczatek, do))
+    return wolne
+
+
+def wolne_przedzialy(godziny, lekcje, od, do, czas_lekcji=CZAS_LEKCJI):
+    """Wolne przedziały nauczyciela w zakresie [od, do), w których zmieści się lekcja długości `czas_lekcji`.
+    `lekcje` to zarezerwowane lekcje jako przedziały (poczatek, koniec) posortowane po początku."""
+    zajete = scal_przedzialy(lekcje)
+    return [
+        (poczatek, koniec)
+        for poczatek, koniec in odejmij_przedzialy(okna_kalendarza(godziny, od, do), zajete)
+        if koniec - poczatek >= czas_lekcji
+    ]
+
+
+def w_godzinach_dostepnosci(godziny, poczatek, czas_lekcji=CZAS_LEKCJI):
+    """Czy lekcja [poczatek, poczatek + czas_lekcji) mieści się w całości w jednym oknie kalendarza."""
+    koniec = poczatek + czas_lekcji
+    okna = okna_kalendarza(godziny, datetime.combine(poczatek.date(), datetime.min.time()), koniec)
+    nr = bisect_left(okna, (poczatek, datetime.max))
+    return nr > 0 and okna[nr - 1][0] <= poczatek and koniec <= okna[nr - 1][1]
+
+
+def koliduje(zajete, poczatek, koniec):
+    """Czy [poczatek, koniec) nachodzi na któryś z posortowanych, rozłącznych przedziałów `zajete`.
+    Wystarczy sprawdzić ostatni przedział zaczynający się przed `koniec` - końce też są posortowane."""
+    nr = bisect_left(zajete, (koniec,))
+    return nr > 0 and zajete[nr - 1][1] > poczatek
+
+
+def zajmij(zajete, poczatek, koniec):
+    """Dodaje niekolidujący przedział do posortowanej listy `zajete`."""
+    insort(zajete, (poczatek, koniec))
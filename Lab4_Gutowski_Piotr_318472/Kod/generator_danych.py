@@ -0,0 +1,278 @@
+import argparse
+import random
+import time as czas
+import unicodedata
+from datetime import date, datetime, time, timedelta
+
+import archiwum
+import ranking
+import wyszukiwanie
+import zmiany
+from konfiguracja_bazy import PRAGMY
+from modele import (
+    DOZWOLONE_PRZEDMIOTY, KalendarzNauczyciela, Lekcja, Nauczyciel, Przedmiot, Student, db, nauczyciele_przedmioty,
+)
+
+# Zasilanie bazy danymi: zestaw demonstracyjny (dawne populate_data) albo syntetyczny
+# zbiór w skali produkcyjnej. Wiersze wstawiane są przez executemany w paczkach,
+# w jednej transakcji. Baza jest za każdym razem tworzona od nowa (DATABASE_URL).
+# To samo robi polecenie `flask --app lab4serwer seed`.
+#
+#   python generator_danych.py demo
+#   python generator_danych.py syntetyczne --nauczyciele 100000 --studenci 200000 --lekcje 10000000
+
+ROZMIAR_PACZKI = 50_000
+
+
+def format_daty(data):
+    # Format zapisu kolumn DateTime przez SQLAlchemy w SQLite
+    return data.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def format_godziny(godzina):
+    # Format zapisu kolumn Time przez SQLAlchemy w SQLite
+    return godzina.strftime("%H:%M:%S.%f")
+
+
+def wstaw(polaczenie, tabela, kolumny, wiersze):
+    """Wstawia krotki z iteratora `wiersze` paczkami po ROZMIAR_PACZKI (executemany). Zwraca liczbę wierszy."""
+    sql = f"INSERT INTO {tabela.name} ({', '.join(kolumny)}) VALUES ({', '.join('?' * len(kolumny))})"
+    liczba = 0
+    paczka = []
+    for wiersz in wiersze:
+        paczka.append(wiersz)
+        if len(paczka) == ROZMIAR_PACZKI:
+            polaczenie.exec_driver_sql(sql, paczka)
+            liczba += len(paczka)
+            paczka = []
+    if paczka:
+        polaczenie.exec_driver_sql(sql, paczka)
+        liczba += len(paczka)
+    return liczba
+
+
+KOLUMNY_NAUCZYCIELI = ('id_nauczyciela', 'imie', 'nazwisko', 'opis', 'ocena_nauczyciela',
+                       'numer_telefonu', 'stawka', 'waluta', 'email')
+KOLUMNY_LEKCJI = ('id_nauczyciela', 'id_studenta', 'id_przedmiotu', 'data_lekcji')
+
+
+def dane_demo(polaczenie):
+    """Mały zestaw danych używany w sprawozdaniu i w skrypt.py."""
+    przedmioty = ["matematyka", "fizyka", "chemia", "historia", "biologia"]
+    wstaw(polaczenie, Przedmiot.__table__, ('id', 'nazwa_przedmiotu'), enumerate(przedmioty, start=1))
+
+    nauczyciele = [
+        (1, "Jan", "Kowalski", "Specjalista w naukach ścisłych", 4.8, "123456789", 50, "PLN", "jan.kowalski@example.com"),
+        (2, "Anna", "Nowak", "Pasja do nauczania", 4.5, "987654321", 60, "PLN", "anna.nowak@example.com"),
+        (3, "Piotr", "Zielinski", "Historyk z powołania", 4.7, "456789123", 45, "PLN", "piotr.zielinski@example.com"),
+        (4, "Katarzyna", "Wisniewska", "Entuzjastka matematyki i biologii", 4.9, "321654987", 55, "PLN", "katarzyna.wisniewska@example.com"),
+        (5, "Tadeusz", "Lewandowski", "Zrozumienie to klucz", 4.6, "789123456", 65, "PLN", "michal.lewandowski@example.com"),
+    ]
+    wstaw(polaczenie, Nauczyciel.__table__, KOLUMNY_NAUCZYCIELI, nauczyciele)
+
+    # (id_nauczyciela, id_przedmiotu, pozycja)
+    prowadzone = [(1, 1, 0), (1, 2, 1), (2, 3, 0), (2, 5, 1), (3, 4, 0), (4, 1, 0), (4, 5, 1), (5, 2, 0), (5, 3, 1)]
+    wstaw(polaczenie, nauczyciele_przedmioty, ('id_nauczyciela', 'id_przedmiotu', 'pozycja'), prowadzone)
+
+    studenci = [
+        (1, "Oliwia", "Kwiatkowska", "oliwia.kwiatkowska@example.com"),
+        (2, "Jakub", "Kaminski", "jakub.kaminski@example.com"),
+        (3, "Zuzanna", "Wójcik", "zuzanna.wojcik@example.com"),
+    ]
+    wstaw(polaczenie, Student.__table__, ('id_studenta', 'imie', 'nazwisko', 'email'), studenci)
+
+    grafiki = [
+        (1, time(9, 0), time(17, 0)),
+        (2, time(8, 0), time(16, 0)),
+        (3, time(14, 0), time(20, 0)),
+        (4, time(8, 0), time(13, 0)),
+    ]
+    wstaw(polaczenie, KalendarzNauczyciela.__table__, ('id_nauczyciela', 'dostepny_od', 'dostepny_do'),
+          ((id_nauczyciela, format_godziny(od), format_godziny(do)) for id_nauczyciela, od, do in grafiki))
+
+    # (id_przedmiotu, id_nauczyciela, id_studenta, data)
+    lekcje = [
+        (5, 2, 1, datetime(2024, 12, 4, 10, 0)),
+        (5, 2, 2, datetime(2024, 12, 9, 11, 0)),
+        (1, 1, 1, datetime(2024, 12, 9, 12, 0)),
+        (1, 1, 2, datetime(2024, 12, 9, 13, 0)),
+        (1, 1, 1, datetime(2024, 12, 10, 14, 0)),
+        (3, 2, 2, datetime(2024, 12, 10, 15, 0)),
+        (1, 4, 2, datetime(2024, 12, 10, 16, 0)),
+        (5, 2, 2, datetime(2024, 12, 11, 10, 0)),
+        (3, 2, 2, datetime(2024, 12, 11, 11, 0)),
+        (2, 5, 1, datetime(2024, 12, 12, 12, 0)),
+        (4, 3, 2, datetime(2024, 12, 12, 13, 0)),
+        (1, 1, 2, datetime(2024, 12, 13, 14, 0)),
+        (5, 4, 1, datetime(2024, 12, 14, 15, 0)),
+        (1, 4, 3, datetime(2024, 12, 14, 16, 0)),
+        (1, 4, 2, datetime(2024, 12, 14, 17, 0)),
+        (5, 4, 2, datetime(2024, 12, 16, 18, 0)),
+    ]
+    wstaw(polaczenie, Lekcja.__table__, KOLUMNY_LEKCJI,
+          ((id_nauczyciela, id_studenta, id_przedmiotu, format_daty(data))
+           for id_przedmiotu, id_nauczyciela, id_studenta, data in lekcje))
+
+
+# Rozkłady danych syntetycznych
+IMIONA_MESKIE = ["Jan", "Piotr", "Tadeusz", "Michał", "Jakub", "Krzysztof", "Andrzej", "Tomasz", "Paweł", "Łukasz",
+                 "Marcin", "Adam", "Mateusz", "Wojciech", "Kamil", "Grzegorz", "Marek", "Szymon", "Bartosz", "Filip"]
+IMIONA_ZENSKIE = ["Anna", "Katarzyna", "Maria", "Małgorzata", "Agnieszka", "Barbara", "Ewa", "Magdalena", "Joanna",
+                  "Zuzanna", "Oliwia", "Aleksandra", "Monika", "Natalia", "Julia", "Karolina", "Marta", "Alicja"]
+NAZWISKA = ["Kowalski", "Nowak", "Zieliński", "Wiśniewski", "Lewandowski", "Wójcik", "Kamiński", "Kwiatkowski",
+            "Szymański", "Woźniak", "Dąbrowski", "Kozłowski", "Jankowski", "Mazur", "Krawczyk", "Piotrowski",
+            "Grabowski", "Nowakowski", "Pawłowski", "Michalski", "Król", "Wieczorek", "Jabłoński", "Majewski"]
+OPISY = ["Specjalista w naukach ścisłych", "Pasja do nauczania", "Przygotowanie do matury",
+         "Cierpliwość i dobre przykłady", "Zrozumienie to klucz", "Wieloletnie doświadczenie w szkole"]
+# Względna popularność przedmiotów wśród nauczycieli
+POPULARNOSC_PRZEDMIOTOW = {"matematyka": 30, "fizyka": 14, "chemia": 12, "historia": 10, "WoS": 5,
+                           "biologia": 15, "geografia": 8}
+WALUTY = (["PLN", "EUR", "USD"], [95, 4, 1])
+
+
+def forma_nazwiska(nazwisko, kobieta):
+    if kobieta and nazwisko.endswith(("ski", "cki", "dzki")):
+        return nazwisko[:-1] + "a"
+    return nazwisko
+
+
+def bez_polskich_znakow(tekst):
+    tekst = tekst.replace("ł", "l").replace("Ł", "L")
+    return unicodedata.normalize("NFKD", tekst).encode("ascii", "ignore").decode()
+
+
+def osoba(los, numer):
+    kobieta = los.random() < 0.5
+    imie = los.choice(IMIONA_ZENSKIE if kobieta else IMIONA_MESKIE)
+    nazwisko = forma_nazwiska(los.choice(NAZWISKA), kobieta)
+    email = f"{bez_polskich_znakow(imie).lower()}.{bez_polskich_znakow(nazwisko).lower()}.{numer}@example.com"
+    return imie, nazwisko, email
+
+
+def dane_syntetyczne(polaczenie, liczba_nauczycieli, liczba_studentow, liczba_lekcji, poczatek, dni, los):
+    """Syntetyczny zbiór danych: popularność nauczycieli zbliżona do rozkładu Zipfa, lekcje w godzinach
+    z kalendarza nauczyciela, w weekendy rzadziej. Terminy nauczyciela się nie powtarzają."""
+    id_przedmiotow = {nazwa: nr for nr, nazwa in enumerate(DOZWOLONE_PRZEDMIOTY, start=1)}
+    wstaw(polaczenie, Przedmiot.__table__, ('id', 'nazwa_przedmiotu'),
+          ((nr, nazwa) for nazwa, nr in id_przedmiotow.items()))
+
+    nazwy = list(POPULARNOSC_PRZEDMIOTOW)
+    wagi = list(POPULARNOSC_PRZEDMIOTOW.values())
+    przedmioty_nauczycieli = []
+    okna = []
+    nauczyciele = []
+    for id_nauczyciela in range(1, liczba_nauczycieli + 1):
+        imie, nazwisko, email = osoba(los, id_nauczyciela)
+        ocena = round(min(5.0, max(0.0, los.gauss(4.3, 0.45))), 1)
+        stawka = int(min(400, max(20, los.lognormvariate(4.1, 0.3))))
+        waluta = los.choices(*WALUTY)[0]
+        nauczyciele.append((id_nauczyciela, imie, nazwisko, los.choice(OPISY), ocena,
+                            f"{los.randint(500_000_000, 899_999_999)}", stawka, waluta, email))
+        przedmioty_nauczycieli.append(sorted({id_przedmiotow[nazwa] for nazwa in los.choices(nazwy, wagi, k=los.randint(1, 3))}))
+        od = los.randint(7, 14)
+        okna.append((od, min(22, od + los.randint(4, 10))))
+    wstaw(polaczenie, Nauczyciel.__table__, KOLUMNY_NAUCZYCIELI, nauczyciele)
+    del nauczyciele
+
+    wstaw(polaczenie, nauczyciele_przedmioty, ('id_nauczyciela', 'id_przedmiotu', 'pozycja'),
+          ((nr + 1, id_przedmiotu, pozycja) for nr, przedmioty in enumerate(przedmioty_nauczycieli)
+           for pozycja, id_przedmiotu in enumerate(przedmioty)))
+    wstaw(polaczenie, KalendarzNauczyciela.__table__, ('id_nauczyciela', 'dostepny_od', 'dostepny_do'),
+          ((nr + 1, format_godziny(time(od)), format_godziny(time(do))) for nr, (od, do) in enumerate(okna)))
+    wstaw(polaczenie, Student.__table__, ('id_studenta', 'imie', 'nazwisko', 'email'),
+          ((id_studenta, *osoba(los, id_studenta)) for id_studenta in range(1, liczba_studentow + 1)))
+
+    # Terminy nauczyciela: w dni powszednie cały kalendarz, w weekendy tylko pierwsza trzecia część okna
+    def terminy(nr):
+        od, do = okna[nr]
+        weekend = od + max(1, (do - od) // 3)
+        wynik = []
+        for dzien in range(dni):
+            data = poczatek + timedelta(days=dzien)
+            koniec = weekend if data.weekday() >= 5 else do
+            wynik.extend(datetime.combine(data, time(godzina)) for godzina in range(od, koniec))
+        return wynik
+
+    # Liczba lekcji nauczyciela proporcjonalna do 1 / ranga^0.8 (ranga losowa), ograniczona liczbą terminów
+    rangi = list(range(1, liczba_nauczycieli + 1))
+    los.shuffle(rangi)
+    popularnosc = [1 / ranga ** 0.8 for ranga in rangi]
+    suma = sum(popularnosc)
+    dni_robocze = sum(1 for dzien in range(dni) if (poczatek + timedelta(days=dzien)).weekday() < 5)
+    pojemnosc = [(do - od) * dni_robocze + max(1, (do - od) // 3) * (dni - dni_robocze) for od, do in okna]
+    liczby = [min(pojemnosc[nr], int(liczba_lekcji * popularnosc[nr] / suma)) for nr in range(liczba_nauczycieli)]
+    brakuje = liczba_lekcji - sum(liczby)
+    for nr in sorted(range(liczba_nauczycieli), key=lambda nr: -popularnosc[nr]):
+        if brakuje <= 0:
+            break
+        dodatkowe = min(brakuje, pojemnosc[nr] - liczby[nr])
+        liczby[nr] += dodatkowe
+        brakuje -= dodatkowe
+
+    def lekcje():
+        for nr, liczba in enumerate(liczby):
+            if not liczba:
+                continue
+            wolne = terminy(nr)
+            przedmioty = przedmioty_nauczycieli[nr]
+            for data in sorted(los.sample(wolne, min(liczba, len(wolne)))):
+                yield (nr + 1, los.randint(1, liczba_studentow), los.choice(przedmioty), format_daty(data))
+
+    # Indeksy lekcji budowane po załadowaniu danych - szybciej niż aktualizacja przy każdym wierszu
+    for indeks in Lekcja.__table__.indexes:
+        indeks.drop(polaczenie)
+    wstaw(polaczenie, Lekcja.__table__, KOLUMNY_LEKCJI, lekcje())
+    for indeks in Lekcja.__table__.indexes:
+        indeks.create(polaczenie)
+
+
+def uruchom(tryb, nauczyciele=1_000, studenci=10_000, lekcje=100_000, od=date(2024, 1, 1), dni=365, ziarno=318472):
+    """Tworzy bazę aplikacji z bieżącego kontekstu od nowa i ładuje dane ('demo' albo 'syntetyczne')."""
+    start = czas.perf_counter()
+    # Partycje archiwum nie należą do metadanych modeli - drop_all ich nie usuwa
+    with db.engine.begin() as polaczenie:
+        archiwum.usun_partycje(polaczenie)
+    db.drop_all()
+    db.create_all()
+    with db.engine.connect() as polaczenie:
+        # Ładowanie jednorazowe - bez fsync po każdej stronie. Pragmy synchronous nie można
+        # zmienić w transakcji, więc ustawiana jest bezpośrednio na połączeniu sqlite3.
+        sqlite = polaczenie.connection.driver_connection
+        sqlite.execute("PRAGMA synchronous=OFF")
+        try:
+            with polaczenie.begin():
+                if tryb == "demo":
+                    dane_demo(polaczenie)
+                else:
+                    dane_syntetyczne(polaczenie, nauczyciele, studenci, lekcje, od, dni, random.Random(ziarno))
+                # Indeks pełnotekstowy i ranking budowane raz po załadowaniu nauczycieli, potem wyzwalacze.
+                # Dziennik zmian lekcji zaczyna się pusty - załadowane dane to stan początkowy, nie zmiany.
+                wyszukiwanie.odbuduj_indeks(polaczenie)
+                ranking.odbuduj_ranking(polaczenie)
+                zmiany.odbuduj_dziennik(polaczenie)
+        finally:
+            sqlite.execute(f"PRAGMA synchronous={PRAGMY['synchronous']}")
+
+    with db.engine.connect() as polaczenie:
+        for tabela in ("nauczyciele", "studenci", "kalendarz_nauczycieli", "lekcje"):
+            liczba = polaczenie.exec_driver_sql(f"SELECT COUNT(*) FROM {tabela}").scalar()
+            print(f"{tabela}: {liczba}")
+    print(f"Baza danych została zainicjalizowana ({czas.perf_counter() - start:.1f} s).")
+
+
+if __name__ == "__main__":
+    from lab4serwer import create_app
+
+    parser = argparse.ArgumentParser(description="Zasilanie bazy danymi demonstracyjnymi lub syntetycznymi")
+    podpolecenia = parser.add_subparsers(dest="tryb", required=True)
+    podpolecenia.add_parser("demo", help="Mały zestaw danych ze sprawozdania")
+    syntetyczne = podpolecenia.add_parser("syntetyczne", help="Duży zbiór danych o realistycznych rozkładach")
+    syntetyczne.add_argument("--nauczyciele", type=int, default=1_000)
+    syntetyczne.add_argument("--studenci", type=int, default=10_000)
+    syntetyczne.add_argument("--lekcje", type=int, default=100_000)
+    syntetyczne.add_argument("--od", type=date.fromisoformat, default=date(2024, 1, 1), help="Pierwszy dzień lekcji")
+    syntetyczne.add_argument("--dni", type=int, default=365)
+    syntetyczne.add_argument("--ziarno", type=int, default=318472)
+    args = parser.parse_args()
+    with create_app({"METRYKI": False}).app_context():
+        uruchom(**vars(args))
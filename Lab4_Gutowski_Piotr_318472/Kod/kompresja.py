@@ -0,0 +1,81 @@
+import gzip
+import os
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Kompresja odpowiedzi negocjowana nagłówkiem Accept-Encoding: brotli (jeśli zainstalowany), potem gzip.
+# Kompresowane są tylko odpowiedzi tekstowe (JSON, text/*) od KOMPRESJA_PROG bajtów - mniejsze mieszczą
+# się w jednym pakiecie, a kompresja kosztowałaby więcej niż zysk. Odpowiedzi strumieniowe (NDJSON)
+# wysyłane są bez zmian. KOMPRESJA=0 wyłącza kompresję.
+
+WLACZONA = os.environ.get('KOMPRESJA', '1') != '0'
+PROG = int(os.environ.get('KOMPRESJA_PROG', 1024))
+POZIOM_GZIP = int(os.environ.get('KOMPRESJA_POZIOM_GZIP', 6))
+POZIOM_BROTLI = int(os.environ.get('KOMPRESJA_POZIOM_BROTLI', 4))
+
+TYPY = ('application/json', 'text/')
+
+
+def kodowanie(accept_encoding):
+    """Najlepsze dostępne kodowanie z nagłówka Accept-Encoding albo None."""
+    jakosci = {}
+    for element in (accept_encoding or '').split(','):
+        nazwa, _, parametry = element.strip().partition(';')
+        jakosc = 1.0
+        parametry = parametry.strip()
+        if parametry.startswith('q='):
+            try:
+                jakosc = float(parametry[2:])
+            except ValueError:
+                jakosc = 0.0
+        jakosci[nazwa.strip().lower()] = jakosc
+
+    obslugiwane = ('br', 'gzip') if brotli else ('gzip',)
+    najlepsze = max(obslugiwane, key=lambda nazwa: jakosci.get(nazwa, jakosci.get('*', 0.0)))
+    return najlepsze if jakosci.get(najlepsze, jakosci.get('*', 0.0)) > 0 else None
+
+
+def kompresuj(tresc, nazwa):
+    if nazwa == 'br':
+        return brotli.compress(tresc, quality=POZIOM_BROTLI)
+    return gzip.compress(tresc, compresslevel=POZIOM_GZIP, mtime=0)
+
+
+def do_kompresji(typ, rozmiar, status):
+    """Czy odpowiedź warto kompresować (bez względu na to, co akceptuje klient)."""
+    return 200 <= status < 300 and status != 204 and rozmiar >= PROG and typ.startswith(TYPY)
+
+
+def oslab_etag(etag):
+    """Skompresowana treść to inna reprezentacja - silny ETag staje się słaby (If-None-Match porównuje słabo)."""
+    return etag if etag.startswith('W/') else 'W/' + etag
+
+
+def zainstaluj(app):
+    """Rejestruje kompresję odpowiedzi aplikacji Flask. Hook uruchamiany jest przed hookami dodanymi
+    wcześniej (np. metrykami), więc te widzą już rozmiar skompresowanej treści."""
+    if not WLACZONA:
+        return
+
+    @app.after_request
+    def kompresuj_odpowiedz(response):
+        if response.is_streamed or response.direct_passthrough or 'Content-Encoding' in response.headers:
+            return response
+        tresc = response.get_data()
+        if not do_kompresji(response.mimetype or '', len(tresc), response.status_code):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        nazwa = kodowanie(request.headers.get('Accept-Encoding'))
+        if nazwa is None:
+            return response
+        response.set_data(kompresuj(tresc, nazwa))
+        response.headers['Content-Encoding'] = nazwa
+        if 'ETag' in response.headers:
+            response.headers['ETag'] = oslab_etag(response.headers['ETag'])
+        return response
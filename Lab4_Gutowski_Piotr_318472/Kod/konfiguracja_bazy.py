@@ -0,0 +1,102 @@
+import os
+
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Konfiguracja magazynu SQLite: pragmy ustawiane przy każdym nowym połączeniu, rozmiar puli
+# oraz osobna pula połączeń tylko do odczytu (bind 'odczyt'), do której trafiają zapytania SELECT.
+# W trybie WAL czytelnicy nie czekają na zapisujących, więc odczyty nie blokują się za rezerwacjami.
+# Wartości można nadpisać zmiennymi środowiskowymi, np. SQLITE_JOURNAL_MODE=delete, DB_POOL_SIZE=20.
+
+PRAGMY = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'wal'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'normal'),
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),  # ms
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),  # bajty
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64 * 1024)),  # ujemna wartość to KiB
+}
+
+PULA = {
+    'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+    'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+    'pool_timeout': float(os.environ.get('DB_POOL_TIMEOUT', 30)),
+    'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 3600)),
+}
+
+# Osobne połączenia do odczytu (DB_ODCZYT_OSOBNO=0 wyłącza)
+ODCZYT_OSOBNO = os.environ.get('DB_ODCZYT_OSOBNO', '1') != '0'
+BIND_ODCZYTU = 'odczyt'
+
+
+def baza_w_pamieci(uri):
+    return make_url(uri).database in (None, '', ':memory:')
+
+
+def konfiguruj(app):
+    """Uzupełnia konfigurację aplikacji o opcje silnika i bind do odczytu.
+    Wywoływane przed utworzeniem obiektu SQLAlchemy(app)."""
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    if baza_w_pamieci(uri):
+        # Baza w pamięci istnieje tylko w jednym połączeniu - bez puli i bez osobnych odczytów
+        return
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', dict(PULA))
+    if ODCZYT_OSOBNO:
+        app.config.setdefault('SQLALCHEMY_BINDS', {})[BIND_ODCZYTU] = dict(PULA, url=uri)
+
+
+def ustaw_pragmy(silnik, tylko_odczyt=False):
+    """Rejestruje ustawienie pragm na każdym nowym połączeniu silnika.
+    Transakcje rozpoczyna jawnie zdarzenie 'begin' - połączenie z opcją wykonania
+    natychmiastowa=True zaczyna od BEGIN IMMEDIATE, czyli od razu zajmuje blokadę zapisu."""
+    @event.listens_for(silnik, 'connect')
+    def przy_polaczeniu(polaczenie_dbapi, rekord):
+        kursor = polaczenie_dbapi.cursor()
+        for nazwa, wartosc in PRAGMY.items():
+            kursor.execute(f"PRAGMA {nazwa}={wartosc}")
+        if tylko_odczyt:
+            kursor.execute("PRAGMA query_only=ON")
+        kursor.close()
+        # Sterownik sqlite3 nie rozpoczyna już transakcji sam
+        polaczenie_dbapi.isolation_level = None
+
+    @event.listens_for(silnik, 'begin')
+    def poczatek_transakcji(polaczenie):
+        natychmiastowa = polaczenie.get_execution_options().get('natychmiastowa')
+        polaczenie.exec_driver_sql("BEGIN IMMEDIATE" if natychmiastowa else "BEGIN")
+
+
+def podlacz(db):
+    """Ustawia pragmy na silnikach aplikacji (wywoływane w kontekście aplikacji)."""
+    for klucz, silnik in db.engines.items():
+        if silnik.dialect.name == 'sqlite':
+            ustaw_pragmy(silnik, tylko_odczyt=klucz == BIND_ODCZYTU)
+
+
+def transakcja_zapisu(session):
+    """Rozpoczyna transakcję sesji od BEGIN IMMEDIATE na połączeniu zapisującym.
+    Wywoływane przed pierwszym zapytaniem transakcji, która sprawdza dane i na ich podstawie zapisuje
+    (np. wykrywanie kolizji terminów) - równoległe transakcje zapisu czekają (busy_timeout),
+    zamiast widzieć nieaktualny stan albo kończyć się błędem "database is locked"."""
+    session.info['zapis'] = True
+    return session.connection(execution_options={'natychmiastowa': True})
+
+
+class SesjaRozdzielajaca(Session):
+    """Sesja kierująca zapytania SELECT do puli tylko do odczytu.
+    Od pierwszego zapisu (flush, INSERT/UPDATE/DELETE) do końca transakcji wszystkie zapytania
+    idą przez połączenie zapisujące, żeby widziały niezatwierdzone zmiany. Kod, który czyta dane
+    pod przyszły zapis, może wymusić to wcześniej przez session.info['zapis'] = True."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self.info.get('zapis'):
+            if getattr(clause, 'is_select', False) and BIND_ODCZYTU in self._db.engines:
+                return self._db.engines[BIND_ODCZYTU]
+            self.info['zapis'] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(SesjaRozdzielajaca, 'after_transaction_end')
+def koniec_zapisu(session, transakcja):
+    if transakcja.parent is None:
+        session.info.pop('zapis', None)
@@ -0,0 +1,339 @@
+import hashlib
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+import archiwum
+import kompresja
+import konfiguracja_bazy
+from dostepnosc import koliduje, scal_przedzialy, w_godzinach_dostepnosci
+from lab4serwer import (
+    DOMYSLNY_LIMIT_LISTY, FORMAT_DATY, KOLUMNY_LISTY_NAUCZYCIELI, KOLUMNY_SZCZEGOLOW_NAUCZYCIELA,
+    MAKSYMALNY_LIMIT_LISTY, create_app, parsuj_rezerwacje, w_archiwum, wiersz_do_dict, zapytanie_kolizji,
+    zapytanie_lekcji_studenta,
+)
+from modele import (
+    KalendarzNauczyciela, Lekcja, Nauczyciel, Przedmiot, db, nauczyciele_przedmioty, parsuj_przedmioty,
+)
+
+# Tryb asynchroniczny API lekcji: aplikacja ASGI z tymi samymi pięcioma endpointami co lab4serwer.py
+# (te same projekcje kolumn, walidacja i format JSON), z dostępem do bazy przez aiosqlite.
+# Oczekujące żądanie nie zajmuje wątku, więc jeden proces obsługuje tysiące wolnych klientów.
+#
+#   uvicorn lab4asgi:aplikacja --port 8000
+
+# Aplikacja Flask tej samej konfiguracji: dostawca JSON, pamięć podręczna szczegółów nauczycieli
+# i ten sam plik bazy (ścieżka względna rozwiązywana względem katalogu instance)
+app = create_app({'METRYKI': False})
+pamiec_nauczycieli = app.extensions['pamiec_nauczycieli']
+with app.app_context():
+    URL_BAZY = db.engine.url.set(drivername='sqlite+aiosqlite')
+
+silnik = create_async_engine(URL_BAZY, **konfiguracja_bazy.PULA)
+konfiguracja_bazy.ustaw_pragmy(silnik.sync_engine)
+# Transakcje zapisu od BEGIN IMMEDIATE (jak konfiguracja_bazy.transakcja_zapisu) - ta sama pula połączeń
+silnik_zapisu = silnik.execution_options(natychmiastowa=True)
+
+
+class Odpowiedz:
+    """Odpowiedź HTTP: status, treść (bajty) i nagłówki."""
+
+    def __init__(self, tresc=b"", status=200, typ="text/html; charset=utf-8", naglowki=None):
+        self.tresc = tresc
+        self.status = status
+        self.naglowki = {"content-type": typ, **(naglowki or {})}
+
+
+def odpowiedz_json(obiekt, status=200, naglowki=None):
+    # Serializacja dostawcą JSON aplikacji Flask - treść identyczna jak z jsonify
+    tresc = app.json.response(obiekt).get_data()
+    return Odpowiedz(tresc, status, "application/json", naglowki)
+
+
+# 1. Lista nauczycieli
+async def get_teacher_list(zadanie):
+    try:
+        kursor = int(zadanie.parametr('kursor', 0))
+        limit = int(zadanie.parametr('limit', DOMYSLNY_LIMIT_LISTY))
+    except ValueError:
+        kursor, limit = 0, DOMYSLNY_LIMIT_LISTY
+    if limit < 1 or limit > MAKSYMALNY_LIMIT_LISTY:
+        return odpowiedz_json({'error': f"Limit musi być z przedziału 1-{MAKSYMALNY_LIMIT_LISTY}"}, 400)
+
+    async with silnik.connect() as polaczenie:
+        wiersze = (await polaczenie.execute(
+            db.select(*KOLUMNY_LISTY_NAUCZYCIELI)
+            .where(Nauczyciel.id_nauczyciela > kursor)
+            .order_by(Nauczyciel.id_nauczyciela)
+            .limit(limit)
+        )).all()
+
+    naglowki = {}
+    if len(wiersze) == limit:
+        naglowki['x-nastepny-kursor'] = str(wiersze[-1].id_nauczyciela)
+    return odpowiedz_json([wiersz_do_dict(wiersz) for wiersz in wiersze], 200, naglowki)
+
+
+# 2. Szczegóły nauczyciela
+async def get_teacher_details(zadanie, id_nauczyciela):
+    wpis = pamiec_nauczycieli.pobierz(id_nauczyciela)
+    if wpis is None:
+        async with silnik.connect() as polaczenie:
+            nauczyciel = (await polaczenie.execute(
+                db.select(*KOLUMNY_SZCZEGOLOW_NAUCZYCIELA).where(Nauczyciel.id_nauczyciela == id_nauczyciela)
+            )).first()
+        if not nauczyciel:
+            return odpowiedz_json({'error': 'Nie znaleziono nauczyciela'}, 404)
+
+        tresc = odpowiedz_json(wiersz_do_dict(nauczyciel)).tresc
+        wpis = (tresc, hashlib.sha256(tresc).hexdigest())
+        pamiec_nauczycieli.zapisz(id_nauczyciela, wpis)
+
+    tresc, etag = wpis
+    naglowki = {'etag': f'"{etag}"'}
+    if zadanie.pasuje_etag(etag):
+        return Odpowiedz(b"", 304, "application/json", naglowki)
+    return Odpowiedz(tresc, 200, "application/json", naglowki)
+
+
+# 3. Zarezerwowanie lekcji
+async def book_lesson(zadanie):
+    rezerwacja, blad = parsuj_rezerwacje(zadanie.json())
+    if blad:
+        return odpowiedz_json({"error": blad}, 400)
+    id_studenta, id_nauczyciela, data_lekcji, czas_trwania = rezerwacja
+    koniec = data_lekcji + czas_trwania
+
+    try:
+        # Sprawdzenie i zapis w jednej transakcji BEGIN IMMEDIATE, jak w lab4serwer.book_lesson
+        async with silnik_zapisu.begin() as polaczenie:
+            if w_archiwum(data_lekcji, await polaczenie.scalar(archiwum.GRANICA)):
+                return odpowiedz_json({"error": "Termin w zarchiwizowanym okresie"}, 409)
+
+            godziny = (await polaczenie.execute(
+                db.select(KalendarzNauczyciela.dostepny_od, KalendarzNauczyciela.dostepny_do)
+                .where(KalendarzNauczyciela.id_nauczyciela == id_nauczyciela)
+            )).all()
+            if not w_godzinach_dostepnosci([tuple(wiersz) for wiersz in godziny], data_lekcji, czas_trwania):
+                return odpowiedz_json({"error": "Termin poza godzinami dostępności nauczyciela"}, 409)
+
+            lekcje = (await polaczenie.execute(zapytanie_kolizji([(id_nauczyciela, (data_lekcji, koniec))]))).all()
+            zajete = scal_przedzialy([(poczatek, poczatek + timedelta(minutes=czas)) for _, poczatek, czas in lekcje])
+            if koliduje(zajete, data_lekcji, koniec):
+                return odpowiedz_json({"error": "Termin jest już zajęty"}, 409)
+
+            await polaczenie.execute(db.insert(Lekcja).values(
+                id_nauczyciela=id_nauczyciela,
+                id_studenta=id_studenta,
+                id_przedmiotu=1,
+                data_lekcji=data_lekcji,
+                czas_trwania=czas_trwania // timedelta(minutes=1),
+            ))
+    except IntegrityError:
+        return odpowiedz_json({"error": "Termin jest już zajęty"}, 409)
+
+    return odpowiedz_json({"message": "Lekcja została zarezerwowana"}, 201)
+
+
+# 4. Dodawanie nauczyciela
+async def add_teacher(zadanie):
+    data = zadanie.json() or {}
+    required_fields = ['imie', 'nazwisko', 'prowadzone_przedmioty', 'opis', 'ocena_nauczyciela', 'numer_telefonu', 'stawka', 'waluta', 'email', 'id']
+    for field in required_fields:
+        if field not in data:
+            return odpowiedz_json({'error': f"Brak wymaganego pola: {field}"}, 400)
+
+    # Walidacja jak w modelu Nauczyciel (przedmioty i zakres oceny)
+    try:
+        przedmioty = list(dict.fromkeys(parsuj_przedmioty(data['prowadzone_przedmioty'])))
+        if data['ocena_nauczyciela'] < 0.0 or data['ocena_nauczyciela'] > 5.0:
+            raise ValueError("Ocena nauczyciela musi być liczbą rzeczywistą z przedziału 0.0-5.0.")
+    except (TypeError, ValueError) as e:
+        return odpowiedz_json({'error': str(e)}, 400)
+
+    try:
+        async with silnik_zapisu.begin() as polaczenie:
+            kalendarz = (await polaczenie.execute(
+                db.select(KalendarzNauczyciela.id).where(KalendarzNauczyciela.id == data['id'])
+            )).first()
+            if not kalendarz:
+                return odpowiedz_json({'error': 'Nie znaleziono kalendarza o podanym id'}, 404)
+            # Zajęty adres email - transakcja BEGIN IMMEDIATE, nikt inny nie doda go do czasu zatwierdzenia
+            if (await polaczenie.execute(
+                db.select(Nauczyciel.id_nauczyciela).where(Nauczyciel.email == data['email'])
+            )).first():
+                return odpowiedz_json({'error': 'Nauczyciel o podanym adresie email już istnieje'}, 409)
+
+            id_nauczyciela = (await polaczenie.execute(db.insert(Nauczyciel).values(
+                imie=data['imie'],
+                nazwisko=data['nazwisko'],
+                opis=data['opis'],
+                ocena_nauczyciela=data['ocena_nauczyciela'],
+                numer_telefonu=data['numer_telefonu'],
+                stawka=data['stawka'],
+                waluta=data['waluta'],
+                email=data['email'],
+            ))).inserted_primary_key[0]
+
+            id_przedmiotow = dict((await polaczenie.execute(
+                db.select(Przedmiot.nazwa_przedmiotu, Przedmiot.id).where(Przedmiot.nazwa_przedmiotu.in_(przedmioty))
+            )).all())
+            for nazwa in przedmioty:
+                if nazwa not in id_przedmiotow:
+                    id_przedmiotow[nazwa] = (await polaczenie.execute(
+                        db.insert(Przedmiot).values(nazwa_przedmiotu=nazwa)
+                    )).inserted_primary_key[0]
+            await polaczenie.execute(nauczyciele_przedmioty.insert(), [
+                {'id_nauczyciela': id_nauczyciela, 'id_przedmiotu': id_przedmiotow[nazwa], 'pozycja': pozycja}
+                for pozycja, nazwa in enumerate(przedmioty)
+            ])
+
+            # Powiązanie nauczyciela z kalendarzem
+            await polaczenie.execute(
+                db.update(KalendarzNauczyciela).where(KalendarzNauczyciela.id == data['id']).values(id_nauczyciela=id_nauczyciela)
+            )
+    except IntegrityError:
+        # Pozostałe ograniczenia tabel (np. brak wartości wymaganego pola)
+        return odpowiedz_json({'error': 'Nieprawidłowe dane nauczyciela'}, 400)
+
+    pamiec_nauczycieli.uniewaznij(id_nauczyciela)
+    return odpowiedz_json({
+        'message': 'Nauczyciel został dodany',
+        'id_nauczyciela': id_nauczyciela
+    }, 201)
+
+
+# 5. Pobranie informacji o lekcjach studenta w danym przedziale
+async def get_lessons(zadanie):
+    try:
+        id_studenta = int(zadanie.parametr("id_studenta", 0))
+    except ValueError:
+        id_studenta = None
+    data_poczatkowa = zadanie.parametr("data_początkowa")
+    data_koncowa = zadanie.parametr("data_końcowa")
+
+    if not id_studenta or not data_poczatkowa or not data_koncowa:
+        return Odpowiedz(status=400)
+
+    try:
+        data_poczatkowa = datetime.strptime(data_poczatkowa, FORMAT_DATY)
+        data_koncowa = datetime.strptime(data_koncowa, FORMAT_DATY)
+    except ValueError:
+        return Odpowiedz(status=400)
+
+    async with silnik.connect() as polaczenie:
+        partycje = tuple((await polaczenie.execute(archiwum.zapytanie_partycji(data_poczatkowa, data_koncowa))).scalars())
+        wiersze = (await polaczenie.execute(zapytanie_lekcji_studenta(partycje), {
+            "id_studenta": id_studenta, "data_poczatkowa": data_poczatkowa, "data_koncowa": data_koncowa,
+        })).all()
+
+    if not wiersze:
+        return Odpowiedz(status=404)
+    if wiersze[0].id_lekcji is None:
+        return Odpowiedz(status=200)
+    return odpowiedz_json([wiersz_do_dict(wiersz) for wiersz in wiersze], 200)
+
+
+# Routing: (metoda, pierwszy segment ścieżki) -> (widok, czy przyjmuje id z drugiego segmentu)
+TRASY = {
+    ('GET', 'teacher-list'): (get_teacher_list, False),
+    ('GET', 'teacher-details'): (get_teacher_details, True),
+    ('POST', 'book-lesson'): (book_lesson, False),
+    ('POST', 'add-teacher'): (add_teacher, False),
+    ('GET', 'get-lessons'): (get_lessons, False),
+}
+
+
+class Zadanie:
+    """Żądanie HTTP odczytane z zakresu ASGI."""
+
+    def __init__(self, scope, tresc):
+        self.metoda = scope['method']
+        self.sciezka = scope['path']
+        self.parametry = parse_qs(scope['query_string'].decode(), keep_blank_values=True)
+        self.naglowki = {nazwa.decode('latin-1').lower(): wartosc.decode('latin-1') for nazwa, wartosc in scope['headers']}
+        self.tresc = tresc
+
+    def parametr(self, nazwa, domyslna=None):
+        wartosci = self.parametry.get(nazwa)
+        return wartosci[0] if wartosci else domyslna
+
+    def json(self):
+        try:
+            return app.json.loads(self.tresc) if self.tresc else None
+        except ValueError:
+            return None
+
+    def pasuje_etag(self, etag):
+        naglowek = self.naglowki.get('if-none-match')
+        if not naglowek:
+            return False
+        znaczniki = {znacznik.strip().removeprefix('W/').strip('"') for znacznik in naglowek.split(',')}
+        return '*' in znaczniki or etag in znaczniki
+
+
+def skompresuj(zadanie, odpowiedz):
+    """Kompresja treści jak w kompresja.zainstaluj dla aplikacji Flask."""
+    if not kompresja.WLACZONA or not kompresja.do_kompresji(odpowiedz.naglowki['content-type'], len(odpowiedz.tresc), odpowiedz.status):
+        return odpowiedz
+    odpowiedz.naglowki['vary'] = 'Accept-Encoding'
+    nazwa = kompresja.kodowanie(zadanie.naglowki.get('accept-encoding'))
+    if nazwa:
+        odpowiedz.tresc = kompresja.kompresuj(odpowiedz.tresc, nazwa)
+        odpowiedz.naglowki['content-encoding'] = nazwa
+        if 'etag' in odpowiedz.naglowki:
+            odpowiedz.naglowki['etag'] = kompresja.oslab_etag(odpowiedz.naglowki['etag'])
+    return odpowiedz
+
+
+async def obsluz(zadanie):
+    segmenty = zadanie.sciezka.strip('/').split('/')
+    trasa = TRASY.get((zadanie.metoda, segmenty[0]))
+    if trasa is None or len(segmenty) != (2 if trasa[1] else 1):
+        if any(klucz[1] == segmenty[0] for klucz in TRASY):
+            return Odpowiedz(b"Method Not Allowed", 405)
+        return Odpowiedz(b"Not Found", 404)
+    widok, z_id = trasa
+    if z_id:
+        try:
+            return await widok(zadanie, int(segmenty[1]))
+        except ValueError:
+            return Odpowiedz(b"Not Found", 404)
+    return await widok(zadanie)
+
+
+async def aplikacja(scope, receive, send):
+    """Punkt wejścia ASGI."""
+    if scope['type'] == 'lifespan':
+        while True:
+            komunikat = await receive()
+            if komunikat['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif komunikat['type'] == 'lifespan.shutdown':
+                await silnik.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    if scope['type'] != 'http':
+        return
+
+    tresc = b""
+    while True:
+        komunikat = await receive()
+        tresc += komunikat.get('body', b"")
+        if not komunikat.get('more_body'):
+            break
+
+    zadanie = Zadanie(scope, tresc)
+    odpowiedz = skompresuj(zadanie, await obsluz(zadanie))
+    naglowki = [(nazwa.encode(), wartosc.encode()) for nazwa, wartosc in odpowiedz.naglowki.items()]
+    naglowki.append((b'content-length', str(len(odpowiedz.tresc)).encode()))
+    await send({'type': 'http.response.start', 'status': odpowiedz.status, 'headers': naglowki})
+    await send({'type': 'http.response.body', 'body': odpowiedz.tresc})
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(aplikacja, port=8000)
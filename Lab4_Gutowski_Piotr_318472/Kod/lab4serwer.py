@@ -1,250 +1,509 @@
-from flask import Flask, jsonify, request
-from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.orm import validates
-from datetime import datetime, time
-
-app = Flask(__name__)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///app.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-db = SQLAlchemy(app)
-
-# Dozwolone przedmioty
-DOZWOLONE_PRZEDMIOTY = ["matematyka", "fizyka", "chemia", "historia", "WoS", "biologia", "geografia"]
-
-# Tabela nauczycieli
-class Nauczyciel(db.Model):
-    __tablename__ = 'nauczyciele'
-
-    id_nauczyciela = db.Column(db.Integer, primary_key=True)
-    imie = db.Column(db.String(50), nullable=False)
-    nazwisko = db.Column(db.String(50), nullable=False)
-    prowadzone_przedmioty = db.Column(db.String(255), nullable=False)
-    opis = db.Column(db.Text)
-    ocena_nauczyciela = db.Column(db.Float, nullable=False)
-    numer_telefonu = db.Column(db.String(15), nullable=False)
-    stawka = db.Column(db.Integer, nullable=False)
-    waluta = db.Column(db.String(10), nullable=False)
-    email = db.Column(db.String(100), unique=True, nullable=False)
-
-    # Relacje
-    lekcje = db.relationship('Lekcja', back_populates='nauczyciel', cascade='all, delete-orphan')
-    kalendarz = db.relationship('KalendarzNauczyciela', back_populates='nauczyciel', cascade='all, delete-orphan')
-
-    @validates('ocena_nauczyciela')
-    def validate_ocena(self, key, value):
-        """Walidacja wartości oceny nauczyciela (od 0.0 do 5.0)."""
-        if value < 0.0 or value > 5.0:
-            raise ValueError("Ocena nauczyciela musi być liczbą rzeczywistą z przedziału 0.0-5.0.")
-        return value
-
-    @validates('prowadzone_przedmioty')
-    def validate_prowadzone_przedmioty(self, key, value):
-        przedmioty = [p.strip() for p in value.split(',')]
-        for przedmiot in przedmioty:
-            if przedmiot not in DOZWOLONE_PRZEDMIOTY:
-                raise ValueError(f"Nieprawidłowy przedmiot: {przedmiot}")
-        return value
-
-# Tabela studentów
-class Student(db.Model):
-    __tablename__ = 'studenci'
-
-    id_studenta = db.Column(db.Integer, primary_key=True)
-    imie = db.Column(db.String(50), nullable=False)
-    nazwisko = db.Column(db.String(50), nullable=False)
-    email = db.Column(db.String(100), unique=True, nullable=False)
-
-
-    lekcje = db.relationship('Lekcja', back_populates='student', cascade='all, delete-orphan')
-
-class Lekcja(db.Model):
-    __tablename__ = 'lekcje'
-
-    id_lekcji = db.Column(db.Integer, primary_key=True)
-    id_nauczyciela = db.Column(db.Integer, db.ForeignKey('nauczyciele.id_nauczyciela'), nullable=False)
-    id_studenta = db.Column(db.Integer, db.ForeignKey('studenci.id_studenta'), nullable=False)
-    id_przedmiotu = db.Column(db.Integer, db.ForeignKey('lista_przedmiotow.id'), nullable=False)
-    data_lekcji = db.Column(db.DateTime, nullable=False)
-
-    # Relacje
-    nauczyciel = db.relationship('Nauczyciel', back_populates='lekcje')
-    student = db.relationship('Student', back_populates='lekcje')
-    przedmiot = db.relationship('Przedmiot', back_populates='lekcje')
-
-
-# Tabela kalendarza nauczycieli
-class KalendarzNauczyciela(db.Model):
-    __tablename__ = 'kalendarz_nauczycieli'
-
-    id = db.Column(db.Integer, primary_key=True)
-    id_nauczyciela = db.Column(db.Integer, db.ForeignKey('nauczyciele.id_nauczyciela'), nullable=False)
-    dostepny_od = db.Column(db.Time, nullable=False)
-    dostepny_do = db.Column(db.Time, nullable=False)
-
-    # Relacje
-    nauczyciel = db.relationship('Nauczyciel', back_populates='kalendarz')
-
-# Tabela listy przedmiotów
-class Przedmiot(db.Model):
-    __tablename__ = 'lista_przedmiotow'
-
-    id = db.Column(db.Integer, primary_key=True)
-    nazwa_przedmiotu = db.Column(db.String(50), nullable=False, unique=True)
-
-    # Relacje
-    lekcje = db.relationship('Lekcja', back_populates='przedmiot', cascade='all, delete-orphan')
-
-    @validates('nazwa_przedmiotu')
-    def validate_nazwa_przedmiotu(self, key, value):
-        if value not in DOZWOLONE_PRZEDMIOTY:
-            raise ValueError(f"Nieprawidłowy przedmiot: {value}")
-        return value
-
-if __name__ == '__main__':
-    with app.app_context():
-        db.drop_all()
-        db.create_all()
-        print("Baza danych została zainicjalizowana.")
-def populate_data():
-    with app.app_context():
-        # Dodawanie przedmiotów
-        przedmioty = ["matematyka", "fizyka", "chemia", "historia", "biologia"]
-        for nazwa in przedmioty:
-            # Sprawdzenie, czy przedmiot już istnieje
-            if not db.session.query(Przedmiot).filter_by(nazwa_przedmiotu=nazwa).first():
-                db.session.add(Przedmiot(nazwa_przedmiotu=nazwa))
-            else:
-                print(f"Przedmiot '{nazwa}' już istnieje.")
-        db.session.commit()
-
-        # Dodawanie nauczycieli
-        nauczyciele = [
-            Nauczyciel(imie="Jan", nazwisko="Kowalski", prowadzone_przedmioty="matematyka,fizyka", opis="Specjalista w naukach ścisłych", ocena_nauczyciela=4.8, numer_telefonu="123456789", stawka=50, waluta="PLN", email="jan.kowalski@example.com"),
-            Nauczyciel(imie="Anna", nazwisko="Nowak", prowadzone_przedmioty="chemia,biologia", opis="Pasja do nauczania", ocena_nauczyciela=4.5, numer_telefonu="987654321", stawka=60, waluta="PLN", email="anna.nowak@example.com"),
-            Nauczyciel(imie="Piotr", nazwisko="Zielinski", prowadzone_przedmioty="historia", opis="Historyk z powołania", ocena_nauczyciela=4.7, numer_telefonu="456789123", stawka=45, waluta="PLN", email="piotr.zielinski@example.com"),
-            Nauczyciel(imie="Katarzyna", nazwisko="Wisniewska", prowadzone_przedmioty="matematyka,biologia", opis="Entuzjastka matematyki i biologii", ocena_nauczyciela=4.9, numer_telefonu="321654987", stawka=55, waluta="PLN", email="katarzyna.wisniewska@example.com"),
-            Nauczyciel(imie="Tadeusz", nazwisko="Lewandowski", prowadzone_przedmioty="fizyka,chemia", opis="Zrozumienie to klucz", ocena_nauczyciela=4.6, numer_telefonu="789123456", stawka=65, waluta="PLN", email="michal.lewandowski@example.com"),
-        ]
-        db.session.add_all(nauczyciele)
-        db.session.commit()
-
-        # Dodawanie studentów
-        studenci = [
-            Student(imie="Oliwia", nazwisko="Kwiatkowska", email="oliwia.kwiatkowska@example.com"),
-            Student(imie="Jakub", nazwisko="Kaminski", email="jakub.kaminski@example.com"),
-            Student(imie="Zuzanna", nazwisko="Wójcik", email="zuzanna.wojcik@example.com"),
-        ]
-        db.session.add_all(studenci)
-        db.session.commit()
-
-        # Dodawanie kalendarzy nauczycieli
-        grafiki = [
-            (1, time(9, 0), time(17, 0)),
-            (2, time(8, 0), time(16, 0)),
-            (3, time(14, 0), time(20, 0)),
-            (4, time(8, 0), time(13, 0)),
-        ]
-        for id_nauczyciela, od, do in grafiki:
-            db.session.add(KalendarzNauczyciela(id_nauczyciela=id_nauczyciela, dostepny_od=od, dostepny_do=do))
-
-        db.session.commit()
-
-        # Dodawanie lekcji
-        lekcje = [
-            (5, 2, 1, datetime(2024, 12, 4, 10, 0)),  
-            (5, 2, 2, datetime(2024, 12, 9, 11, 0)),
-            (1, 1, 1, datetime(2024, 12, 9, 12, 0)),
-            (1, 1, 2, datetime(2024, 12, 9, 13, 0)),
-            (1, 1, 1, datetime(2024, 12, 10, 14, 0)),
-            (3, 2, 2, datetime(2024, 12, 10, 15, 0)),
-            (1, 4, 2, datetime(2024, 12, 10, 16, 0)),
-            (5, 2, 2, datetime(2024, 12, 11, 10, 0)),
-            (3, 2, 2, datetime(2024, 12, 11, 11, 0)),
-            (2, 5, 1, datetime(2024, 12, 12, 12, 0)),
-            (4, 3, 2, datetime(2024, 12, 12, 13, 0)),
-            (1, 1, 2, datetime(2024, 12, 13, 14, 0)),
-            (5, 4, 1, datetime(2024, 12, 14, 15, 0)),
-            (1, 4, 3, datetime(2024, 12, 14, 16, 0)),
-            (1, 4, 2, datetime(2024, 12, 14, 17, 0)),
-            (5, 4, 2, datetime(2024, 12, 16, 18, 0)),
-        ]
-        for id_przedmiotu, id_nauczyciela, id_studenta, data in lekcje:
-            db.session.add(Lekcja(id_przedmiotu=id_przedmiotu, id_nauczyciela=id_nauczyciela, id_studenta=id_studenta, data_lekcji=data))
-
-        db.session.commit()
-
+import csv
+import functools
+import hashlib
+import io
+import itertools
+import os
+
+import click
+from flask import Blueprint, Flask, Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timedelta
+
+import archiwum
+import kompresja
+import konfiguracja_bazy
+import metryki
+import ranking
+import serializacja
+import wolne_zapytania
+import wyszukiwanie
+import zmiany
+from dostepnosc import (
+    CZAS_LEKCJI, MAKSYMALNY_CZAS_LEKCJI, koliduje, scal_przedzialy, w_godzinach_dostepnosci, wolne_przedzialy, zajmij,
+)
+from modele import (
+    KalendarzNauczyciela, Lekcja, Nauczyciel, Przedmiot, Student, db, migruj_baze, nauczyciele_przedmioty,
+    parsuj_przedmioty,
+)
+from pamiec_podreczna import PamiecPodreczna
+
+# API lekcji jako blueprint rejestrowany przez create_app - import modułu nie tworzy aplikacji
+# ani silnika bazy i nic nie zapisuje. Uruchomienie:
+#
+#   flask --app lab4serwer init-db && flask --app lab4serwer seed demo && flask --app lab4serwer run
+#   python lab4serwer.py
+
+api = Blueprint('api', __name__, cli_group=None)
+
+
+def create_app(config=None):
+    """Tworzy aplikację API lekcji. Konfiguracja domyślna pochodzi ze zmiennych środowiskowych
+    (DATABASE_URL, METRYKI, WOLNE_ZAPYTANIA_MS, ARCHIWUM_MIESIACE, ZMIANY_DNI), słownik `config` ją nadpisuje, np.
+    create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:///test.db', 'METRYKI': False}).
+    Silniki bazy nie otwierają połączeń - pula łączy się przy pierwszym zapytaniu."""
+    app = Flask(__name__)
+    app.json = serializacja.DostawcaJSON(app)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=os.environ.get('DATABASE_URL', 'sqlite:///app.db'),
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        METRYKI=os.environ.get('METRYKI', '1') != '0',
+        WOLNE_ZAPYTANIA_MS=wolne_zapytania.PROG_MS,
+        ARCHIWUM_MIESIACE=archiwum.HORYZONT_MIESIECY,
+        ZMIANY_DNI=zmiany.PRZECHOWYWANIE_DNI,
+    )
+    app.config.update(config or {})
+    konfiguracja_bazy.konfiguruj(app)
+    db.init_app(app)
+    app.register_blueprint(api)
 
-populate_data()
+    # Pamięć podręczna szczegółów nauczycieli: id_nauczyciela -> (treść JSON, ETag)
+    pamiec = app.extensions['pamiec_nauczycieli'] = PamiecPodreczna(pojemnosc=10_000, ttl=300)
 
+    with app.app_context():
+        konfiguracja_bazy.podlacz(db)
+        # Dziennik wolnych zapytań w katalogu instance (plik tworzony przy pierwszym wpisie)
+        os.makedirs(app.instance_path, exist_ok=True)
+        for silnik in db.engines.values():
+            wolne_zapytania.zainstaluj(
+                silnik, os.path.join(app.instance_path, 'wolne_zapytania.log'), app.config['WOLNE_ZAPYTANIA_MS']
+            )
+        # Metryki żądań i zapytań SQL pod /metrics
+        if app.config['METRYKI']:
+            rejestr_metryk = metryki.zainstaluj(app, db)
+            rejestr_metryk.dodatkowe.append(lambda: metryki.linie_pamieci('teacher_details_cache', pamiec))
+
+    # Kompresja gzip/brotli (po metrykach - metryki widzą rozmiar skompresowanej odpowiedzi)
+    kompresja.zainstaluj(app)
+    return app
+
+
+def pamiec_nauczycieli():
+    """Pamięć podręczna szczegółów nauczycieli bieżącej aplikacji."""
+    return current_app.extensions['pamiec_nauczycieli']
+
+
+@event.listens_for(db.session, 'after_flush')
+def zapamietaj_zmienionych_nauczycieli(session, flush_context):
+    """Zbiera id nauczycieli zmienionych w transakcji - wpisy unieważniane są dopiero po commit."""
+    zmienieni = session.info.setdefault('zmienieni_nauczyciele', set())
+    for obiekt in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obiekt, Nauczyciel):
+            zmienieni.add(obiekt.id_nauczyciela)
+
+
+@event.listens_for(db.session, 'after_commit')
+def uniewaznij_nauczycieli(session):
+    for id_nauczyciela in session.info.pop('zmienieni_nauczyciele', ()):
+        pamiec_nauczycieli().uniewaznij(id_nauczyciela)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def porzuc_zmienionych_nauczycieli(session):
+    session.info.pop('zmienieni_nauczyciele', None)
+
+
+# Polecenia CLI (flask --app lab4serwer <polecenie>)
+@api.cli.command('init-db')
+def init_db():
+    """Tworzy brakujące tabele i dostosowuje istniejącą bazę do modeli."""
+    db.create_all()
+    migruj_baze()
+    click.echo("Baza danych gotowa.")
+
+
+@api.cli.command('seed')
+@click.argument('tryb', type=click.Choice(['demo', 'syntetyczne']))
+@click.option('--nauczyciele', type=int)
+@click.option('--studenci', type=int)
+@click.option('--lekcje', type=int)
+@click.option('--od', type=click.DateTime(['%Y-%m-%d']), help="Pierwszy dzień lekcji")
+@click.option('--dni', type=int)
+@click.option('--ziarno', type=int)
+def seed(tryb, **parametry):
+    """Tworzy bazę od nowa z danymi demonstracyjnymi albo syntetycznymi (jak generator_danych.py)."""
+    import generator_danych
+
+    if parametry['od'] is not None:
+        parametry['od'] = parametry['od'].date()
+    generator_danych.uruchom(tryb, **{nazwa: wartosc for nazwa, wartosc in parametry.items() if wartosc is not None})
+
+
+@api.cli.command('archive')
+@click.option('--miesiace', type=int, help="Horyzont: liczba pełnych miesięcy przed bieżącym pozostających w tabeli lekcje")
+def archive(miesiace):
+    """Przenosi lekcje starsze niż horyzont (domyślnie ARCHIWUM_MIESIACE) do miesięcznych partycji archiwum."""
+    if miesiace is None:
+        miesiace = current_app.config['ARCHIWUM_MIESIACE']
+    granica = archiwum.poczatek_miesiaca(datetime.now(), -miesiace)
+    with db.engine.execution_options(natychmiastowa=True).begin() as polaczenie:
+        przeniesione = archiwum.archiwizuj(polaczenie, granica)
+    for tabela, liczba in przeniesione.items():
+        click.echo(f"{tabela}: {liczba}")
+    click.echo(f"Przeniesiono {sum(przeniesione.values())} lekcji sprzed {granica:%Y-%m-%d}.")
+
+
+@api.cli.command('compact-changes')
+@click.option('--dni', type=int, help="Liczba dni przechowywania wpisów dziennika zmian lekcji")
+def compact_changes(dni):
+    """Usuwa z dziennika zmian lekcji wpisy starsze niż `dni` (domyślnie ZMIANY_DNI).
+    Klienci z kursorem sprzed usuniętych wpisów dostają 410 i pobierają plan od nowa."""
+    if dni is None:
+        dni = current_app.config['ZMIANY_DNI']
+    with db.engine.execution_options(natychmiastowa=True).begin() as polaczenie:
+        usuniete = zmiany.kompaktuj(polaczenie, timedelta(days=dni))
+    click.echo(f"Usunięto {usuniete} wpisów dziennika zmian starszych niż {dni} dni.")
+
+
+FORMAT_DATY = "%Y-%m-%d %H:%M"
+
+
+def wiersz_do_dict(wiersz):
+    """Zamienia wiersz zapytania z etykietowanymi kolumnami na słownik do jsonify.
+    Daty formatuje dostawca JSON (serializacja.DostawcaJSON) w formacie FORMAT_DATY."""
+    return dict(wiersz._mapping)
+
+
+# Przedmioty nauczyciela jako tekst oddzielony przecinkami w kolejności z prowadzone_przedmioty (podzapytanie
+# po kluczu tabeli łączącej). group_concat łączy w kolejności podzapytania - ORDER BY w agregacie jest
+# dostępne dopiero od SQLite 3.44.
+PRZEDMIOTY_W_KOLEJNOSCI = (
+    db.select(Przedmiot.nazwa_przedmiotu)
+    .select_from(nauczyciele_przedmioty)
+    .join(Przedmiot, Przedmiot.id == nauczyciele_przedmioty.c.id_przedmiotu)
+    .where(nauczyciele_przedmioty.c.id_nauczyciela == Nauczyciel.id_nauczyciela)
+    .order_by(nauczyciele_przedmioty.c.pozycja, nauczyciele_przedmioty.c.id_przedmiotu)
+    .correlate(Nauczyciel)
+    .subquery()
+)
+PRZEDMIOTY_NAUCZYCIELA = (
+    db.select(db.func.group_concat(PRZEDMIOTY_W_KOLEJNOSCI.c.nazwa_przedmiotu, ','))
+    .scalar_subquery()
+)
+
+# Projekcje kolumn - etykiety są kluczami w odpowiedziach JSON
+KOLUMNY_LISTY_NAUCZYCIELI = (
+    Nauczyciel.id_nauczyciela,
+    Nauczyciel.imie,
+    Nauczyciel.nazwisko,
+    PRZEDMIOTY_NAUCZYCIELA.label('przedmioty'),
+)
+
+KOLUMNY_SZCZEGOLOW_NAUCZYCIELA = (
+    Nauczyciel.id_nauczyciela,
+    Nauczyciel.imie,
+    Nauczyciel.nazwisko,
+    Nauczyciel.opis,
+    PRZEDMIOTY_NAUCZYCIELA.label('przedmioty'),
+    Nauczyciel.ocena_nauczyciela.label('ocena'),
+    Nauczyciel.numer_telefonu,
+    Nauczyciel.stawka,
+    Nauczyciel.waluta,
+    Nauczyciel.email,
+)
+
+KOLUMNY_NAUCZYCIELI_PRZEDMIOTU = (
+    Nauczyciel.id_nauczyciela,
+    Nauczyciel.imie,
+    Nauczyciel.nazwisko,
+    Nauczyciel.ocena_nauczyciela.label('ocena'),
+    Nauczyciel.stawka,
+    Nauczyciel.waluta,
+)
+
+def kolumny_lekcji(lekcja):
+    """Projekcja lekcji studenta dla encji lekcji `lekcja` (Lekcja albo archiwum.lekcje(...))."""
+    return (
+        lekcja.id_lekcji,
+        lekcja.id_nauczyciela,
+        Nauczyciel.imie.label('imie nauczyciela'),
+        Nauczyciel.nazwisko.label('nazwisko nauczyciela'),
+        lekcja.id_studenta,
+        lekcja.data_lekcji,
+        lekcja.czas_trwania,
+        lekcja.id_przedmiotu,
+        Przedmiot.nazwa_przedmiotu.label('przedmiotu'),
+    )
 
 
 # 1. Lista nauczycieli
-@app.route('/teacher-list', methods=['GET'])
+DOMYSLNY_LIMIT_LISTY = 100
+MAKSYMALNY_LIMIT_LISTY = 1000
+
+@api.route('/teacher-list', methods=['GET'])
 def get_teacher_list():
-    nauczyciele = Nauczyciel.query.all()
-    response = [
-        {
-            'id_nauczyciela': nauczyciel.id_nauczyciela,
-            'imie': nauczyciel.imie,
-            'nazwisko': nauczyciel.nazwisko,
-            'przedmioty': nauczyciel.prowadzone_przedmioty
-        }
-        for nauczyciel in nauczyciele
-    ]
-    return jsonify(response), 200
+    """Lista nauczycieli stronicowana po id_nauczyciela.
+    Parametr `kursor` to ostatnie id z poprzedniej strony, kolejny kursor zwracany jest w nagłówku X-Nastepny-Kursor."""
+    kursor = request.args.get('kursor', 0, type=int)
+    limit = request.args.get('limit', DOMYSLNY_LIMIT_LISTY, type=int)
+    if limit < 1 or limit > MAKSYMALNY_LIMIT_LISTY:
+        return jsonify({'error': f"Limit musi być z przedziału 1-{MAKSYMALNY_LIMIT_LISTY}"}), 400
+
+    # Pobieramy tylko potrzebne kolumny - bez tworzenia obiektów ORM
+    wiersze = db.session.execute(
+        db.select(*KOLUMNY_LISTY_NAUCZYCIELI)
+        .where(Nauczyciel.id_nauczyciela > kursor)
+        .order_by(Nauczyciel.id_nauczyciela)
+        .limit(limit)
+    ).all()
+
+    response = [wiersz_do_dict(wiersz) for wiersz in wiersze]
+    naglowki = {}
+    if len(wiersze) == limit:
+        naglowki['X-Nastepny-Kursor'] = str(wiersze[-1].id_nauczyciela)
+    return jsonify(response), 200, naglowki
 
 # 2. Szczegóły nauczyciela
-@app.route('/teacher-details/<int:id_nauczyciela>', methods=['GET'])
+@api.route('/teacher-details/<int:id_nauczyciela>', methods=['GET'])
 def get_teacher_details(id_nauczyciela):
-    nauczyciel = Nauczyciel.query.filter_by(id_nauczyciela=id_nauczyciela).first()
-    if not nauczyciel:
-        return jsonify({'error': 'Nie znaleziono nauczyciela'}), 404
-
-    response = {
-        'id_nauczyciela': nauczyciel.id_nauczyciela,
-        'imie': nauczyciel.imie,
-        'nazwisko': nauczyciel.nazwisko,
-        'opis': nauczyciel.opis,
-        'przedmioty': nauczyciel.prowadzone_przedmioty,
-        'ocena': nauczyciel.ocena_nauczyciela,
-        'numer_telefonu': nauczyciel.numer_telefonu,
-        'stawka': nauczyciel.stawka,
-        'waluta': nauczyciel.waluta,
-        'email': nauczyciel.email
-    }
-    return jsonify(response), 200
+    """Szczegóły nauczyciela z pamięci podręcznej, z ETagiem i obsługą If-None-Match (304)."""
+    wpis = pamiec_nauczycieli().pobierz(id_nauczyciela)
+    if wpis is None:
+        nauczyciel = db.session.execute(
+            db.select(*KOLUMNY_SZCZEGOLOW_NAUCZYCIELA).where(Nauczyciel.id_nauczyciela == id_nauczyciela)
+        ).first()
+        if not nauczyciel:
+            return jsonify({'error': 'Nie znaleziono nauczyciela'}), 404
+
+        tresc = jsonify(wiersz_do_dict(nauczyciel)).get_data()
+        wpis = (tresc, hashlib.sha256(tresc).hexdigest())
+        pamiec_nauczycieli().zapisz(id_nauczyciela, wpis)
+
+    tresc, etag = wpis
+    response = Response(tresc, status=200, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+@api.route('/cache-stats', methods=['GET'])
+def get_cache_stats():
+    """Liczniki trafień i chybień pamięci podręcznej szczegółów nauczycieli."""
+    return jsonify(pamiec_nauczycieli().statystyki()), 200
+
+
+# Nauczyciele danego przedmiotu
+SORTOWANIE_NAUCZYCIELI = {
+    'ocena': Nauczyciel.ocena_nauczyciela.desc(),
+    'stawka': Nauczyciel.stawka.asc(),
+}
+
+@api.route('/teachers-by-subject/<przedmiot>', methods=['GET'])
+def get_teachers_by_subject(przedmiot):
+    """Nauczyciele prowadzący przedmiot, wyszukiwani po indeksie tabeli łączącej.
+    Parametr `sortuj`: 'ocena' (najlepsi najpierw, domyślnie) lub 'stawka' (najtańsi najpierw)."""
+    sortuj = request.args.get('sortuj', 'ocena')
+    limit = request.args.get('limit', DOMYSLNY_LIMIT_LISTY, type=int)
+    if sortuj not in SORTOWANIE_NAUCZYCIELI:
+        return jsonify({'error': f"Nieprawidłowe sortowanie: {sortuj}"}), 400
+    if limit < 1 or limit > MAKSYMALNY_LIMIT_LISTY:
+        return jsonify({'error': f"Limit musi być z przedziału 1-{MAKSYMALNY_LIMIT_LISTY}"}), 400
+
+    id_przedmiotu = db.session.execute(
+        db.select(Przedmiot.id).where(Przedmiot.nazwa_przedmiotu == przedmiot)
+    ).scalar()
+    if id_przedmiotu is None:
+        return jsonify({'error': 'Nie znaleziono przedmiotu'}), 404
+
+    wiersze = db.session.execute(
+        db.select(*KOLUMNY_NAUCZYCIELI_PRZEDMIOTU)
+        .select_from(nauczyciele_przedmioty)
+        .join(Nauczyciel, Nauczyciel.id_nauczyciela == nauczyciele_przedmioty.c.id_nauczyciela)
+        .where(nauczyciele_przedmioty.c.id_przedmiotu == id_przedmiotu)
+        .order_by(SORTOWANIE_NAUCZYCIELI[sortuj], Nauczyciel.id_nauczyciela)
+        .limit(limit)
+    ).all()
+
+    return jsonify([wiersz_do_dict(wiersz) for wiersz in wiersze]), 200
+
+
+# Ranking nauczycieli przedmiotu
+DOMYSLNE_K_RANKINGU = 10
+
+@api.route('/teacher-ranking/<przedmiot>', methods=['GET'])
+def get_teacher_ranking(przedmiot):
+    """K najlepszych nauczycieli przedmiotu (najwyższa ocena, przy równej najniższa stawka) z tabeli rankingu.
+    Filtry: `waluta`, `max_stawka` (wymaga waluty - stawek w różnych walutach nie porównujemy), `min_ocena`."""
+    k = request.args.get('k', DOMYSLNE_K_RANKINGU, type=int)
+    waluta = request.args.get('waluta')
+    max_stawka = request.args.get('max_stawka', type=int)
+    min_ocena = request.args.get('min_ocena', type=float)
+    if k < 1 or k > MAKSYMALNY_LIMIT_LISTY:
+        return jsonify({'error': f"K musi być z przedziału 1-{MAKSYMALNY_LIMIT_LISTY}"}), 400
+    if max_stawka is not None and waluta is None:
+        return jsonify({'error': 'Filtr max_stawka wymaga parametru waluta'}), 400
+
+    id_przedmiotu = db.session.execute(
+        db.select(Przedmiot.id).where(Przedmiot.nazwa_przedmiotu == przedmiot)
+    ).scalar()
+    if id_przedmiotu is None:
+        return jsonify({'error': 'Nie znaleziono przedmiotu'}), 404
+
+    # Odczyt kolejnych wierszy klucza tabeli rankingu do zebrania K pasujących
+    najlepsi = db.select(ranking.RANKING).where(ranking.RANKING.c.id_przedmiotu == id_przedmiotu)
+    if min_ocena is not None:
+        najlepsi = najlepsi.where(ranking.RANKING.c.ocena_nauczyciela >= min_ocena)
+    if waluta is not None:
+        najlepsi = najlepsi.where(ranking.RANKING.c.waluta == waluta)
+    if max_stawka is not None:
+        najlepsi = najlepsi.where(ranking.RANKING.c.stawka <= max_stawka)
+    najlepsi = najlepsi.order_by(*ranking.KOLEJNOSC).limit(k).subquery('najlepsi')
+
+    wiersze = db.session.execute(
+        db.select(
+            Nauczyciel.id_nauczyciela,
+            Nauczyciel.imie,
+            Nauczyciel.nazwisko,
+            najlepsi.c.ocena_nauczyciela.label('ocena'),
+            najlepsi.c.stawka,
+            najlepsi.c.waluta,
+        )
+        .join(najlepsi, najlepsi.c.id_nauczyciela == Nauczyciel.id_nauczyciela)
+        .order_by(najlepsi.c.ocena_nauczyciela.desc(), najlepsi.c.stawka, najlepsi.c.id_nauczyciela)
+    ).all()
+
+    return jsonify([wiersz_do_dict(wiersz) for wiersz in wiersze]), 200
+
+
+# Wyszukiwanie nauczycieli
+DOMYSLNY_LIMIT_WYSZUKIWANIA = 20
+
+@api.route('/teacher-search', methods=['GET'])
+def search_teachers():
+    """Nauczyciele pasujący do wszystkich słów parametru `q` (po imieniu, nazwisku, opisie i przedmiotach),
+    od najtrafniejszych. Słowa dopasowywane są jako prefiksy, bez względu na polskie znaki (Wiśniewska = wisniewska)."""
+    limit = request.args.get('limit', DOMYSLNY_LIMIT_WYSZUKIWANIA, type=int)
+    if limit < 1 or limit > MAKSYMALNY_LIMIT_LISTY:
+        return jsonify({'error': f"Limit musi być z przedziału 1-{MAKSYMALNY_LIMIT_LISTY}"}), 400
+    zapytanie = wyszukiwanie.wyrazenie_fts(request.args.get('q', ''))
+    if not zapytanie:
+        return jsonify({'error': 'Parametr q musi zawierać co najmniej jedno słowo'}), 400
+
+    trafienia = wyszukiwanie.TRAFIENIA.bindparams(zapytanie=zapytanie, limit=limit).subquery('trafienia')
+    wiersze = db.session.execute(
+        db.select(*KOLUMNY_LISTY_NAUCZYCIELI)
+        .join(trafienia, trafienia.c.id_nauczyciela == Nauczyciel.id_nauczyciela)
+        .order_by(trafienia.c.ranga, Nauczyciel.id_nauczyciela)
+    ).all()
+
+    return jsonify([wiersz_do_dict(wiersz) for wiersz in wiersze]), 200
 
 
 # 3. Zarezerwowanie lekcji
-@app.route("/book-lesson", methods=["POST"])
-def book_lesson():
-    """Endpoint do rezerwowania lekcji.
-    Sprawdza, czy wybrana data i godzina są dostępne."""
-    data = request.get_json()
+def parsuj_rezerwacje(data):
+    """Waliduje parametry rezerwacji. `czas_trwania` (minuty) jest opcjonalny, domyślnie godzina.
+    Zwraca krotkę ((id_studenta, id_nauczyciela, data_lekcji, czas_trwania), None) albo (None, komunikat błędu)."""
+    if not isinstance(data, dict):
+        return None, "Brak wymaganych parametrów"
 
     # Pobieranie parametrów
     id_studenta = data.get("id_studenta")
     id_nauczyciela = data.get("id_nauczyciela")
-    data_lekcji = data.get("data_lekcji") 
+    data_lekcji = data.get("data_lekcji")
 
     # Walidacja parametrów
     if not all([id_studenta, id_nauczyciela, data_lekcji]):
-        return jsonify({"error": "Brak wymaganych parametrów"}), 400
+        return None, "Brak wymaganych parametrów"
+
+    try:
+        id_studenta, id_nauczyciela = int(id_studenta), int(id_nauczyciela)
+    except (TypeError, ValueError):
+        return None, "Nieprawidłowe id studenta lub nauczyciela"
 
     try:
         # Konwersja daty i godziny
-        data_lekcji = datetime.strptime(data_lekcji, "%Y-%m-%d %H:%M")
-    except ValueError:
-        return jsonify({"error": "Nieprawidłowy format daty i godziny"}), 400
+        data_lekcji = datetime.strptime(data_lekcji, FORMAT_DATY)
+    except (TypeError, ValueError):
+        return None, "Nieprawidłowy format daty i godziny"
+
+    czas_trwania = data.get("czas_trwania", CZAS_LEKCJI // timedelta(minutes=1))
+    maksymalny = MAKSYMALNY_CZAS_LEKCJI // timedelta(minutes=1)
+    if isinstance(czas_trwania, bool) or not isinstance(czas_trwania, int) or not 0 < czas_trwania <= maksymalny:
+        return None, f"Czas trwania lekcji musi być liczbą minut z przedziału 1-{maksymalny}"
+
+    return (id_studenta, id_nauczyciela, data_lekcji, timedelta(minutes=czas_trwania)), None
+
+
+def godziny_dostepnosci(id_nauczycieli):
+    """Codzienne okna dostępności z kalendarza: {id_nauczyciela: [(dostepny_od, dostepny_do), ...]}."""
+    godziny = {id_nauczyciela: [] for id_nauczyciela in id_nauczycieli}
+    for wiersz in db.session.execute(
+        db.select(
+            KalendarzNauczyciela.id_nauczyciela,
+            KalendarzNauczyciela.dostepny_od,
+            KalendarzNauczyciela.dostepny_do
+        ).where(KalendarzNauczyciela.id_nauczyciela.in_(id_nauczycieli))
+    ):
+        godziny[wiersz.id_nauczyciela].append((wiersz.dostepny_od, wiersz.dostepny_do))
+    return godziny
+
+
+# Zapytanie o kolizje dla wielu nauczycieli dzielone na paczki (limit głębokości wyrażeń SQLite)
+PACZKA_NAUCZYCIELI = 200
+
+def zapytanie_kolizji(pozycje):
+    """Lekcje, które mogą nachodzić na zakresy [(id_nauczyciela, (od, do)), ...]. Każdy warunek to zakres
+    indeksu (id_nauczyciela, data_lekcji) poszerzony wstecz o najdłuższą lekcję - bez skanowania
+    pozostałych lekcji nauczyciela."""
+    return (
+        db.select(Lekcja.id_nauczyciela, Lekcja.data_lekcji, Lekcja.czas_trwania)
+        .where(db.or_(*(
+            db.and_(
+                Lekcja.id_nauczyciela == id_nauczyciela,
+                Lekcja.data_lekcji > od - MAKSYMALNY_CZAS_LEKCJI,
+                Lekcja.data_lekcji < do,
+            )
+            for id_nauczyciela, (od, do) in pozycje
+        )))
+        .order_by(Lekcja.id_nauczyciela, Lekcja.data_lekcji)
+    )
 
-    # Sprawdzenie, czy termin jest już zajęty
-    zajeta_lekcja = Lekcja.query.filter_by(
-        id_nauczyciela=id_nauczyciela,
-        data_lekcji=data_lekcji
-    ).first()
 
-    if zajeta_lekcja:
+def zajete_przedzialy(zakresy):
+    """Lekcje nachodzące na podane zakresy: {id_nauczyciela: (od, do)} -> {id_nauczyciela: [(poczatek, koniec), ...]}
+    (posortowane i scalone)."""
+    zajete = {id_nauczyciela: [] for id_nauczyciela in zakresy}
+    pozycje = list(zakresy.items())
+    for nr in range(0, len(pozycje), PACZKA_NAUCZYCIELI):
+        for id_nauczyciela, data_lekcji, czas_trwania in db.session.execute(
+            zapytanie_kolizji(pozycje[nr:nr + PACZKA_NAUCZYCIELI])
+        ):
+            zajete[id_nauczyciela].append((data_lekcji, data_lekcji + timedelta(minutes=czas_trwania)))
+    return {id_nauczyciela: scal_przedzialy(przedzialy) for id_nauczyciela, przedzialy in zajete.items()}
+
+
+def w_archiwum(data_lekcji, granica):
+    """Czy termin należy do okresu przeniesionego do archiwum (granica to wynik archiwum.GRANICA).
+    Partycje archiwum są tylko do odczytu, więc takich terminów nie można rezerwować."""
+    return granica is not None and data_lekcji < granica
+
+
+@api.route("/book-lesson", methods=["POST"])
+def book_lesson():
+    """Endpoint do rezerwowania lekcji.
+    Sprawdza, czy lekcja mieści się w godzinach dostępności i nie nachodzi na inne lekcje nauczyciela.
+    Sprawdzenie i zapis wykonywane są w jednej transakcji BEGIN IMMEDIATE, więc równoległe
+    rezerwacje tego samego terminu nie mogą obie się udać."""
+    rezerwacja, blad = parsuj_rezerwacje(request.get_json())
+    if blad:
+        return jsonify({"error": blad}), 400
+    id_studenta, id_nauczyciela, data_lekcji, czas_trwania = rezerwacja
+    koniec = data_lekcji + czas_trwania
+
+    konfiguracja_bazy.transakcja_zapisu(db.session)
+
+    if w_archiwum(data_lekcji, db.session.scalar(archiwum.GRANICA)):
+        db.session.rollback()
+        return jsonify({"error": "Termin w zarchiwizowanym okresie"}), 409
+
+    # Lekcja musi mieścić się w godzinach z kalendarza nauczyciela
+    godziny = godziny_dostepnosci([id_nauczyciela])[id_nauczyciela]
+    if not w_godzinach_dostepnosci(godziny, data_lekcji, czas_trwania):
+        db.session.rollback()
+        return jsonify({"error": "Termin poza godzinami dostępności nauczyciela"}), 409
+
+    if koliduje(zajete_przedzialy({id_nauczyciela: (data_lekcji, koniec)})[id_nauczyciela], data_lekcji, koniec):
+        db.session.rollback()
         return jsonify({"error": "Termin jest już zajęty"}), 409
 
     # Dodanie nowej lekcji
@@ -252,16 +511,154 @@ def book_lesson():
         id_nauczyciela=id_nauczyciela,
         id_studenta=id_studenta,
         id_przedmiotu=1,  
-        data_lekcji=data_lekcji
+        data_lekcji=data_lekcji,
+        czas_trwania=czas_trwania // timedelta(minutes=1)
     )
     db.session.add(nowa_lekcja)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Termin jest już zajęty"}), 409
 
     return jsonify({"message": "Lekcja została zarezerwowana"}), 201
 
 
+# 3a. Zarezerwowanie wielu lekcji naraz
+MAKSYMALNA_LICZBA_REZERWACJI = 5000
+
+@api.route("/book-lessons", methods=["POST"])
+def book_lessons():
+    """Rezerwacja wielu lekcji w jednej transakcji (BEGIN IMMEDIATE, jak w /book-lesson).
+    Przyjmuje listę obiektów jak /book-lesson i zwraca status dla każdej pozycji (w kolejności żądania).
+    Z pozycji nachodzących na siebie w obrębie żądania rezerwowana jest pierwsza."""
+    data = request.get_json()
+    if not isinstance(data, list) or not data:
+        return jsonify({"error": "Oczekiwano niepustej listy rezerwacji"}), 400
+    if len(data) > MAKSYMALNA_LICZBA_REZERWACJI:
+        return jsonify({"error": f"Maksymalnie {MAKSYMALNA_LICZBA_REZERWACJI} rezerwacji w jednym żądaniu"}), 400
+
+    wyniki = [None] * len(data)
+    kandydaci = []  # (indeks, id_studenta, id_nauczyciela, data_lekcji, czas_trwania)
+    zakresy = {}  # id_nauczyciela -> (najwcześniejszy początek, najpóźniejszy koniec)
+    for indeks, pozycja in enumerate(data):
+        rezerwacja, blad = parsuj_rezerwacje(pozycja)
+        if blad:
+            wyniki[indeks] = {"status": 400, "error": blad}
+            continue
+        id_studenta, id_nauczyciela, data_lekcji, czas_trwania = rezerwacja
+        kandydaci.append((indeks, *rezerwacja))
+        od, do = zakresy.get(id_nauczyciela, (data_lekcji, data_lekcji + czas_trwania))
+        zakresy[id_nauczyciela] = (min(od, data_lekcji), max(do, data_lekcji + czas_trwania))
+
+    konfiguracja_bazy.transakcja_zapisu(db.session)
+
+    # Godziny dostępności i zajęte przedziały wszystkich nauczycieli z żądania - zapytaniami zbiorczymi
+    granica = db.session.scalar(archiwum.GRANICA)
+    godziny = godziny_dostepnosci(list(zakresy))
+    zajete = zajete_przedzialy(zakresy)
+    przyjete = {id_nauczyciela: [] for id_nauczyciela in zakresy}
+    do_zapisu = []
+    for indeks, id_studenta, id_nauczyciela, data_lekcji, czas_trwania in kandydaci:
+        koniec = data_lekcji + czas_trwania
+        if w_archiwum(data_lekcji, granica):
+            wyniki[indeks] = {"status": 409, "error": "Termin w zarchiwizowanym okresie"}
+        elif not w_godzinach_dostepnosci(godziny[id_nauczyciela], data_lekcji, czas_trwania):
+            wyniki[indeks] = {"status": 409, "error": "Termin poza godzinami dostępności nauczyciela"}
+        elif koliduje(zajete[id_nauczyciela], data_lekcji, koniec):
+            wyniki[indeks] = {"status": 409, "error": "Termin jest już zajęty"}
+        elif koliduje(przyjete[id_nauczyciela], data_lekcji, koniec):
+            wyniki[indeks] = {"status": 409, "error": "Termin nachodzi na inną lekcję z żądania"}
+        else:
+            zajmij(przyjete[id_nauczyciela], data_lekcji, koniec)
+            do_zapisu.append({
+                "id_nauczyciela": id_nauczyciela,
+                "id_studenta": id_studenta,
+                "id_przedmiotu": 1,
+                "data_lekcji": data_lekcji,
+                "czas_trwania": czas_trwania // timedelta(minutes=1),
+            })
+            wyniki[indeks] = {"status": 201, "message": "Lekcja została zarezerwowana"}
+
+    try:
+        if do_zapisu:
+            db.session.execute(db.insert(Lekcja), do_zapisu)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        for indeks, wynik in enumerate(wyniki):
+            if wynik["status"] == 201:
+                wyniki[indeks] = {"status": 409, "error": "Konflikt z równoległą rezerwacją, spróbuj ponownie"}
+
+    status = 201 if all(wynik["status"] == 201 for wynik in wyniki) else 207
+    return jsonify(wyniki), status
+
+
+# 3b. Wolne terminy nauczycieli
+MAKSYMALNA_LICZBA_NAUCZYCIELI = 1000
+MAKSYMALNY_ZAKRES_DNI = 92
+
+@functools.lru_cache(maxsize=128)
+def zapytanie_lekcji_nauczycieli(partycje):
+    """Lekcje nauczycieli z listy `id_nauczycieli` zaczynające się w przedziale (od, do), z tabeli lekcje
+    i partycji archiwum (krotka nazw), posortowane po indeksie (id_nauczyciela, data_lekcji).
+    Wartości są parametrami, więc zapytanie budowane jest raz dla każdego zestawu partycji."""
+    def warunki(lekcja):
+        return (
+            lekcja.id_nauczyciela.in_(db.bindparam('id_nauczycieli', expanding=True)),
+            lekcja.data_lekcji > db.bindparam('od'),
+            lekcja.data_lekcji < db.bindparam('do'),
+        )
+
+    lekcja = archiwum.lekcje(partycje, warunki)
+    return (
+        db.select(lekcja.id_nauczyciela, lekcja.data_lekcji, lekcja.czas_trwania)
+        .where(*warunki(lekcja))
+        .order_by(lekcja.id_nauczyciela, lekcja.data_lekcji)
+    )
+
+
+@api.route("/free-slots", methods=["GET"])
+def get_free_slots():
+    """Wolne przedziały czasu nauczycieli w podanym zakresie dat.
+    Parametr `id_nauczyciela` może zawierać wiele id oddzielonych przecinkami."""
+    try:
+        id_nauczycieli = sorted({int(id_nauczyciela) for id_nauczyciela in request.args.get("id_nauczyciela", "").split(",")})
+        data_poczatkowa = datetime.strptime(request.args.get("data_początkowa", ""), FORMAT_DATY)
+        data_koncowa = datetime.strptime(request.args.get("data_końcowa", ""), FORMAT_DATY)
+    except ValueError:
+        return jsonify({"error": "Nieprawidłowe parametry"}), 400
+    if len(id_nauczycieli) > MAKSYMALNA_LICZBA_NAUCZYCIELI:
+        return jsonify({"error": f"Maksymalnie {MAKSYMALNA_LICZBA_NAUCZYCIELI} nauczycieli w jednym zapytaniu"}), 400
+    if not data_poczatkowa < data_koncowa <= data_poczatkowa + timedelta(days=MAKSYMALNY_ZAKRES_DNI):
+        return jsonify({"error": f"Zakres dat musi być dodatni i nie dłuższy niż {MAKSYMALNY_ZAKRES_DNI} dni"}), 400
+
+    godziny = godziny_dostepnosci(id_nauczycieli)
+
+    # Zarezerwowane lekcje wszystkich nauczycieli (razem z partycjami archiwum nachodzącymi na zakres)
+    od = data_poczatkowa - MAKSYMALNY_CZAS_LEKCJI
+    partycje = tuple(db.session.execute(archiwum.zapytanie_partycji(od, data_koncowa)).scalars())
+    lekcje = {id_nauczyciela: [] for id_nauczyciela in id_nauczycieli}
+    for id_nauczyciela, data_lekcji, czas_trwania in db.session.execute(
+        zapytanie_lekcji_nauczycieli(partycje), {"id_nauczycieli": id_nauczycieli, "od": od, "do": data_koncowa}
+    ):
+        lekcje[id_nauczyciela].append((data_lekcji, data_lekcji + timedelta(minutes=czas_trwania)))
+
+    response = [
+        {
+            "id_nauczyciela": id_nauczyciela,
+            "wolne": [
+                {"od": od, "do": do}
+                for od, do in wolne_przedzialy(godziny[id_nauczyciela], lekcje[id_nauczyciela], data_poczatkowa, data_koncowa)
+            ],
+        }
+        for id_nauczyciela in id_nauczycieli
+    ]
+    return jsonify(response), 200
+
+
 # 4. Dodawanie nauczyciela
-@app.route('/add-teacher', methods=['POST'])
+@api.route('/add-teacher', methods=['POST'])
 def add_teacher():
     data = request.get_json()
 
@@ -270,30 +667,46 @@ def add_teacher():
         if field not in data:
             return jsonify({'error': f"Brak wymaganego pola: {field}"}), 400
 
+    konfiguracja_bazy.transakcja_zapisu(db.session)
+
     # Pobranie istniejącego kalendarza
     kalendarz = KalendarzNauczyciela.query.get(data['id'])
     if not kalendarz:
         return jsonify({'error': 'Nie znaleziono kalendarza o podanym id'}), 404
 
-    # Tworzenie nowego nauczyciela
-    nowy_nauczyciel = Nauczyciel(
-        imie=data['imie'],
-        nazwisko=data['nazwisko'],
-        prowadzone_przedmioty=data['prowadzone_przedmioty'],
-        opis=data['opis'],
-        ocena_nauczyciela=data['ocena_nauczyciela'], 
-        numer_telefonu=data['numer_telefonu'],
-        stawka=data['stawka'],
-        waluta=data['waluta'],
-        email=data['email']
-    )
+    # Zajęty adres email - w transakcji zapisu nikt inny nie doda go do czasu zatwierdzenia
+    if db.session.scalar(db.select(Nauczyciel.id_nauczyciela).where(Nauczyciel.email == data['email'])):
+        db.session.rollback()
+        return jsonify({'error': 'Nauczyciel o podanym adresie email już istnieje'}), 409
+
+    # Tworzenie nowego nauczyciela (walidatory modelu: nieznany przedmiot, ocena spoza zakresu lub innego typu)
+    try:
+        nowy_nauczyciel = Nauczyciel(
+            imie=data['imie'],
+            nazwisko=data['nazwisko'],
+            prowadzone_przedmioty=data['prowadzone_przedmioty'],
+            opis=data['opis'],
+            ocena_nauczyciela=data['ocena_nauczyciela'],
+            numer_telefonu=data['numer_telefonu'],
+            stawka=data['stawka'],
+            waluta=data['waluta'],
+            email=data['email']
+        )
+    except (TypeError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
 
     # Powiązanie nauczyciela z kalendarzem
     kalendarz.nauczyciel = nowy_nauczyciel
 
     # Zapis do bazy danych
     db.session.add(nowy_nauczyciel)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Pozostałe ograniczenia tabel (np. brak wartości wymaganego pola)
+        db.session.rollback()
+        return jsonify({'error': 'Nieprawidłowe dane nauczyciela'}), 400
 
     return jsonify({
         'message': 'Nauczyciel został dodany',
@@ -301,8 +714,239 @@ def add_teacher():
     }), 201
 
 
+# 4a. Import wielu nauczycieli (CSV lub NDJSON)
+PACZKA_IMPORTU = 500
+MAKSYMALNA_LICZBA_BLEDOW_RAPORTU = 1000
+POLA_NAUCZYCIELA = ('imie', 'nazwisko', 'prowadzone_przedmioty', 'opis', 'ocena_nauczyciela', 'numer_telefonu', 'stawka', 'waluta', 'email')
+DLUGOSCI_POL = {'imie': 50, 'nazwisko': 50, 'numer_telefonu': 15, 'waluta': 10, 'email': 100}
+
+
+def parsuj_nauczyciela(dane):
+    """Waliduje wiersz importu (pola jak w /add-teacher, liczby mogą być tekstem z CSV).
+    Zwraca (kolumny nauczyciela, przedmioty, id kalendarza lub None); błędy zgłasza jako ValueError."""
+    if not isinstance(dane, dict):
+        raise ValueError("Wiersz musi być obiektem JSON")
+    for pole in POLA_NAUCZYCIELA:
+        if dane.get(pole) in (None, '') and pole != 'opis':
+            raise ValueError(f"Brak wymaganego pola: {pole}")
+    for pole, dlugosc in DLUGOSCI_POL.items():
+        if len(str(dane[pole])) > dlugosc:
+            raise ValueError(f"Pole {pole} może mieć najwyżej {dlugosc} znaków")
+
+    przedmioty = list(dict.fromkeys(parsuj_przedmioty(str(dane['prowadzone_przedmioty']))))
+    try:
+        ocena = float(dane['ocena_nauczyciela'])
+        stawka = int(dane['stawka'])
+        id_kalendarza = int(dane['id']) if dane.get('id') not in (None, '') else None
+    except (TypeError, ValueError):
+        raise ValueError("Pola ocena_nauczyciela, stawka i id muszą być liczbami")
+    if not 0.0 <= ocena <= 5.0:
+        raise ValueError("Ocena nauczyciela musi być liczbą rzeczywistą z przedziału 0.0-5.0.")
+
+    kolumny = {pole: str(dane[pole]) for pole in ('imie', 'nazwisko', 'numer_telefonu', 'waluta', 'email')}
+    kolumny.update(opis=dane.get('opis') or None, ocena_nauczyciela=ocena, stawka=stawka)
+    return kolumny, przedmioty, id_kalendarza
+
+
+def wiersze_importu(typ):
+    """(numer linii, słownik pól) z treści żądania czytanej strumieniowo - bez wczytywania całego pliku."""
+    strumien = io.TextIOWrapper(request.stream, encoding='utf-8-sig', newline='' if typ == 'text/csv' else None)
+    if typ == 'text/csv':
+        czytnik = csv.DictReader(strumien)
+        for wiersz in czytnik:
+            yield czytnik.line_num, wiersz
+        return
+    for numer, linia in enumerate(strumien, start=1):
+        if linia.strip():
+            try:
+                yield numer, current_app.json.loads(linia)
+            except ValueError:
+                yield numer, None
+
+
+def importuj_paczke(paczka, emaile_importu, id_przedmiotow):
+    """Zapisuje paczkę poprawnych wierszy [(numer, kolumny, przedmioty, id_kalendarza)] w jednej transakcji.
+    Zwraca (liczba dodanych, błędy [(numer, status, komunikat)])."""
+    bledy = []
+    konfiguracja_bazy.transakcja_zapisu(db.session)
+
+    # Sprawdzenia zbiorowe: zajęte adresy email i istniejące kalendarze - po jednym zapytaniu na paczkę
+    zajete = set(db.session.execute(
+        db.select(Nauczyciel.email).where(Nauczyciel.email.in_([kolumny['email'] for _, kolumny, _, _ in paczka]))
+    ).scalars())
+    kalendarze = set(db.session.execute(
+        db.select(KalendarzNauczyciela.id).where(KalendarzNauczyciela.id.in_(
+            {id_kalendarza for *_, id_kalendarza in paczka if id_kalendarza is not None}
+        ))
+    ).scalars())
+
+    do_zapisu = []
+    for numer, kolumny, przedmioty, id_kalendarza in paczka:
+        if kolumny['email'] in zajete or kolumny['email'] in emaile_importu:
+            bledy.append((numer, 409, 'Nauczyciel o podanym adresie email już istnieje'))
+        elif id_kalendarza is not None and id_kalendarza not in kalendarze:
+            bledy.append((numer, 404, 'Nie znaleziono kalendarza o podanym id'))
+        else:
+            emaile_importu.add(kolumny['email'])
+            do_zapisu.append((numer, kolumny, przedmioty, id_kalendarza))
+    if not do_zapisu:
+        db.session.rollback()
+        return 0, bledy
+
+    # Przedmioty dodane w tej paczce - po wycofaniu transakcji ich id nie istnieją i są usuwane z id_przedmiotow
+    dodane_przedmioty = []
+    try:
+        brakujace = {nazwa for _, _, przedmioty, _ in do_zapisu for nazwa in przedmioty} - id_przedmiotow.keys()
+        if brakujace:
+            # Przedmioty dodane w międzyczasie przez inne żądania (w transakcji zapisu lista już się nie zmieni)
+            id_przedmiotow.update(db.session.execute(
+                db.select(Przedmiot.nazwa_przedmiotu, Przedmiot.id).where(Przedmiot.nazwa_przedmiotu.in_(brakujace))
+            ).all())
+        for nazwa in sorted(brakujace - id_przedmiotow.keys()):
+            id_przedmiotow[nazwa] = db.session.execute(
+                db.insert(Przedmiot).values(nazwa_przedmiotu=nazwa).returning(Przedmiot.id)
+            ).scalar_one()
+            dodane_przedmioty.append(nazwa)
+
+        id_nauczycieli = db.session.execute(
+            db.insert(Nauczyciel).returning(Nauczyciel.id_nauczyciela, sort_by_parameter_order=True),
+            [kolumny for _, kolumny, _, _ in do_zapisu],
+        ).scalars().all()
+        db.session.execute(nauczyciele_przedmioty.insert(), [
+            {'id_nauczyciela': id_nauczyciela, 'id_przedmiotu': id_przedmiotow[nazwa], 'pozycja': pozycja}
+            for id_nauczyciela, (_, _, przedmioty, _) in zip(id_nauczycieli, do_zapisu)
+            for pozycja, nazwa in enumerate(przedmioty)
+        ])
+        powiazania = [
+            {'id_kalendarza': id_kalendarza, 'nowe_id': id_nauczyciela}
+            for id_nauczyciela, (*_, id_kalendarza) in zip(id_nauczycieli, do_zapisu)
+            if id_kalendarza is not None
+        ]
+        if powiazania:
+            db.session.execute(
+                db.update(KalendarzNauczyciela.__table__)
+                .where(KalendarzNauczyciela.id == db.bindparam('id_kalendarza'))
+                .values(id_nauczyciela=db.bindparam('nowe_id')),
+                powiazania,
+            )
+        db.session.commit()
+    except IntegrityError:
+        # Adres email dodany w międzyczasie przez inne żądanie
+        db.session.rollback()
+        for nazwa in dodane_przedmioty:
+            del id_przedmiotow[nazwa]
+        for numer, kolumny, _, _ in do_zapisu:
+            emaile_importu.discard(kolumny['email'])
+            bledy.append((numer, 409, 'Konflikt z równoległym zapisem, spróbuj ponownie'))
+        return 0, bledy
+
+    for id_nauczyciela in id_nauczycieli:
+        pamiec_nauczycieli().uniewaznij(id_nauczyciela)
+    return len(id_nauczycieli), bledy
+
+
+@api.route('/import-teachers', methods=['POST'])
+def import_teachers():
+    """Import nauczycieli z pliku CSV (Content-Type: text/csv, nagłówek z nazwami pól) albo NDJSON
+    (application/x-ndjson, obiekt w linii). Pola jak w /add-teacher, `id` kalendarza jest opcjonalne.
+    Wiersze zapisywane są paczkami po PACZKA_IMPORTU w osobnych transakcjach; odpowiedź zawiera liczbę
+    dodanych nauczycieli i błędy wierszy (numer linii pliku, status, komunikat)."""
+    typ = request.mimetype
+    if typ not in ('text/csv', TYP_NDJSON):
+        return jsonify({'error': f"Oczekiwano treści text/csv albo {TYP_NDJSON}"}), 415
+
+    id_przedmiotow = dict(db.session.execute(db.select(Przedmiot.nazwa_przedmiotu, Przedmiot.id)).all())
+    db.session.commit()
+
+    emaile_importu = set()
+    dodani, liczba_wierszy, bledy, liczba_bledow = 0, 0, [], 0
+
+    def zapisz_bledy(nowe):
+        nonlocal liczba_bledow
+        liczba_bledow += len(nowe)
+        for numer, status, komunikat in nowe:
+            if len(bledy) < MAKSYMALNA_LICZBA_BLEDOW_RAPORTU:
+                bledy.append({'wiersz': numer, 'status': status, 'error': komunikat})
+
+    try:
+        wiersze = wiersze_importu(typ)
+        while wczytane := list(itertools.islice(wiersze, PACZKA_IMPORTU)):
+            liczba_wierszy += len(wczytane)
+            paczka, bledy_paczki = [], []
+            for numer, dane in wczytane:
+                try:
+                    paczka.append((numer, *parsuj_nauczyciela(dane)))
+                except ValueError as e:
+                    bledy_paczki.append((numer, 400, str(e)))
+            if paczka:
+                dodani_paczki, bledy_zapisu = importuj_paczke(paczka, emaile_importu, id_przedmiotow)
+                dodani += dodani_paczki
+                bledy_paczki.extend(bledy_zapisu)
+            zapisz_bledy(sorted(bledy_paczki))
+    except (UnicodeDecodeError, csv.Error) as e:
+        db.session.rollback()
+        zapisz_bledy([(liczba_wierszy + 1, 400, f"Nieprawidłowy plik: {e}")])
+
+    if not liczba_wierszy and not liczba_bledow:
+        return jsonify({'error': 'Brak wierszy do importu'}), 400
+    status = 201 if not liczba_bledow else 207
+    return jsonify({
+        'dodani': dodani,
+        'wiersze': liczba_wierszy,
+        'liczba_bledow': liczba_bledow,
+        'bledy': bledy,
+    }), status
+
+
 #5. Pobranie informacji o lekcjach studenta w danym przedziale
-@app.route("/get-lessons", methods=["GET"])
+TYP_NDJSON = 'application/x-ndjson'
+ROZMIAR_PACZKI_STRUMIENIA = 1000
+
+def strumien_lekcji(zapytanie, parametry):
+    """Odpowiedź NDJSON (jedna lekcja w linii) wysyłana w trakcie odczytu zapytania.
+    Wiersze pobierane są paczkami (yield_per), więc pamięć nie zależy od zakresu dat."""
+    paczki = db.session.execute(
+        zapytanie.execution_options(yield_per=ROZMIAR_PACZKI_STRUMIENIA), parametry
+    ).partitions()
+
+    # Pierwsza paczka odczytywana od razu - statusy 404 / pusta odpowiedź 200 jak w trybie JSON
+    pierwsza = next(paczki, [])
+    if not pierwsza:
+        return "", 404
+    if pierwsza[0].id_lekcji is None:
+        return "", 200
+
+    def linie():
+        for paczka in itertools.chain([pierwsza], paczki):
+            yield ''.join(current_app.json.dumps(wiersz_do_dict(wiersz)) + '\n' for wiersz in paczka)
+
+    return Response(stream_with_context(linie()), status=200, mimetype=TYP_NDJSON)
+
+@functools.lru_cache(maxsize=128)
+def zapytanie_lekcji_studenta(partycje):
+    """Jedno zapytanie: student złączony zewnętrznie z lekcjami z zakresu (z tabeli lekcje i partycji
+    archiwum - krotka nazw). Brak wierszy oznacza brak studenta, wiersz z pustym id_lekcji - brak lekcji.
+    Parametry: id_studenta, data_poczatkowa, data_koncowa (zapytanie budowane raz dla zestawu partycji)."""
+    def warunki(lekcja):
+        return (
+            lekcja.id_studenta == db.bindparam('id_studenta'),
+            lekcja.data_lekcji >= db.bindparam('data_poczatkowa'),
+            lekcja.data_lekcji <= db.bindparam('data_koncowa'),
+        )
+
+    lekcja = archiwum.lekcje(partycje, warunki)
+    return (
+        db.select(*kolumny_lekcji(lekcja))
+        .select_from(Student)
+        .outerjoin(lekcja, db.and_(*warunki(lekcja)))
+        .outerjoin(Nauczyciel, Nauczyciel.id_nauczyciela == lekcja.id_nauczyciela)
+        .outerjoin(Przedmiot, Przedmiot.id == lekcja.id_przedmiotu)
+        .where(Student.id_studenta == db.bindparam('id_studenta'))
+        .order_by(lekcja.data_lekcji)
+    )
+
+
+@api.route("/get-lessons", methods=["GET"])
 def get_lessons():
     # Pobranie parametrów z zapytania
     id_studenta = request.args.get("id_studenta", type=int)
@@ -315,48 +959,93 @@ def get_lessons():
 
     try:
         # Konwersja dat na obiekt datetime
-        data_poczatkowa = datetime.strptime(data_poczatkowa, "%Y-%m-%d %H:%M")
-        data_koncowa = datetime.strptime(data_koncowa, "%Y-%m-%d %H:%M")
+        data_poczatkowa = datetime.strptime(data_poczatkowa, FORMAT_DATY)
+        data_koncowa = datetime.strptime(data_koncowa, FORMAT_DATY)
     except ValueError:
         return "", 400  # Błąd parsowania daty, zwraca pustą odpowiedź
 
-    # Sprawdzenie, czy student istnieje
-    student = Student.query.get(id_studenta)
-    if not student:
-        return "", 404  # Brak studenta, zwraca pustą odpowiedź z kodem 404 (Not Found)
+    partycje = tuple(db.session.execute(archiwum.zapytanie_partycji(data_poczatkowa, data_koncowa)).scalars())
+    zapytanie = zapytanie_lekcji_studenta(partycje)
+    parametry = {"id_studenta": id_studenta, "data_poczatkowa": data_poczatkowa, "data_koncowa": data_koncowa}
 
-    # Pobieranie lekcji dla studenta w danym przedziale czasowym
-    lekcje = (
-        Lekcja.query
-        .filter(Lekcja.id_studenta == id_studenta)
-        .filter(Lekcja.data_lekcji >= data_poczatkowa)
-        .filter(Lekcja.data_lekcji <= data_koncowa)
-        .all()
-    )
+    if request.accept_mimetypes.best_match(['application/json', TYP_NDJSON]) == TYP_NDJSON:
+        return strumien_lekcji(zapytanie, parametry)
+
+    wiersze = db.session.execute(zapytanie, parametry).all()
+
+    if not wiersze:
+        return "", 404  # Brak studenta, zwraca pustą odpowiedź z kodem 404 (Not Found)
 
     # Jeśli brak wyników, zwracamy pustą odpowiedź z kodem 200
-    if not lekcje:
+    if wiersze[0].id_lekcji is None:
         return "", 200
 
     # Konwersja wyników na JSON
-    lekcje_json = [
-        {
-            "id_lekcji": lekcja.id_lekcji,
-            "id_nauczyciela": lekcja.id_nauczyciela,
-            "imie nauczyciela": lekcja.nauczyciel.imie,
-            "nazwisko nauczyciela": lekcja.nauczyciel.nazwisko,
-            "id_studenta": lekcja.id_studenta,
-            "data_lekcji": lekcja.data_lekcji.strftime("%Y-%m-%d %H:%M"),
-            "id_przedmiotu": lekcja.id_przedmiotu,
-            "przedmiotu": lekcja.przedmiot.nazwa_przedmiotu
-        }
-        for lekcja in lekcje
-    ]
+    lekcje_json = [wiersz_do_dict(wiersz) for wiersz in wiersze]
 
     return jsonify(lekcje_json), 200
 
 
+# 6. Zmiany lekcji od kursora (synchronizacja przyrostowa planu)
+DOMYSLNY_LIMIT_ZMIAN = 1000
+MAKSYMALNY_LIMIT_ZMIAN = 10_000
+
+@api.route("/lessons/changes", methods=["GET"])
+def get_lesson_changes():
+    """Zmiany lekcji z dziennika (zmiany.py) po kursorze `since`, w kolejności zatwierdzenia, opcjonalnie
+    tylko dla `id_studenta` i/lub `id_nauczyciela`. Każda zmiana to `operacja` (wstawienie, zmiana, usuniecie)
+    i lekcja w formacie /get-lessons. Bez `since` zwracany jest tylko bieżący kursor - klient pobiera plan
+    przez /get-lessons i dalej pyta o zmiany od tego kursora. Kursor, po którym zmiany zostały już usunięte
+    z dziennika (kompakcja), daje 410 - plan trzeba pobrać od nowa."""
+    id_studenta = request.args.get("id_studenta", type=int)
+    id_nauczyciela = request.args.get("id_nauczyciela", type=int)
+    limit = request.args.get("limit", DOMYSLNY_LIMIT_ZMIAN, type=int)
+    if limit < 1 or limit > MAKSYMALNY_LIMIT_ZMIAN:
+        return jsonify({"error": f"Parametr limit musi być z przedziału 1-{MAKSYMALNY_LIMIT_ZMIAN}"}), 400
+    try:
+        kursor = zmiany.dekoduj_kursor(request.args["since"]) if "since" in request.args else None
+    except ValueError:
+        return jsonify({"error": "Nieprawidłowy kursor"}), 400
+
+    # Zakres dziennika i zmiany czytane w jednej transakcji odczytu (ten sam stan bazy)
+    ostatnia, najstarsza = db.session.execute(zmiany.ZAKRES).one()
+    if kursor is None:
+        return jsonify({"zmiany": [], "kursor": zmiany.koduj_kursor(ostatnia), "wiecej": False}), 200
+    if not zmiany.kursor_aktualny(kursor, ostatnia, najstarsza):
+        return jsonify({"error": "Kursor jest nieaktualny, pobierz lekcje od nowa przez /get-lessons"}), 410
+
+    dziennik = zmiany.ZMIANY.c
+    zapytanie = (
+        db.select(dziennik.id_zmiany, dziennik.operacja, *kolumny_lekcji(dziennik))
+        .select_from(zmiany.ZMIANY)
+        .outerjoin(Nauczyciel, Nauczyciel.id_nauczyciela == dziennik.id_nauczyciela)
+        .outerjoin(Przedmiot, Przedmiot.id == dziennik.id_przedmiotu)
+        .where(dziennik.id_zmiany > kursor, dziennik.id_zmiany <= ostatnia)
+        .order_by(dziennik.id_zmiany)
+        .limit(limit + 1)
+    )
+    if id_studenta is not None:
+        zapytanie = zapytanie.where(dziennik.id_studenta == id_studenta)
+    if id_nauczyciela is not None:
+        zapytanie = zapytanie.where(dziennik.id_nauczyciela == id_nauczyciela)
+    wiersze = db.session.execute(zapytanie).all()
+
+    # Bez kolejnych stron kursor przesuwa się na koniec dziennika - także za zmianami innych studentów
+    wiecej = len(wiersze) > limit
+    wiersze = wiersze[:limit]
+    return jsonify({
+        "zmiany": [
+            {nazwa: wartosc for nazwa, wartosc in wiersz._mapping.items() if nazwa != "id_zmiany"}
+            for wiersz in wiersze
+        ],
+        "kursor": zmiany.koduj_kursor(wiersze[-1].id_zmiany if wiecej else ostatnia),
+        "wiecej": wiecej,
+    }), 200
+
+
 if __name__ == '__main__':
+    app = create_app()
     with app.app_context():
         db.create_all()
+        migruj_baze()
     app.run(debug=True)
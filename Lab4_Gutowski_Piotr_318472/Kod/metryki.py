@@ -0,0 +1,159 @@
+import bisect
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+# Metryki żądań w formacie tekstowym Prometheusa: liczba żądań wg statusu, histogramy czasu odpowiedzi,
+# rozmiarów żądań i odpowiedzi oraz liczby i czasu zapytań SQL w żądaniu (zdarzenia silnika SQLAlchemy).
+# Zbieranie to kilka operacji pod blokadą na żądanie; przy wyłączonych metrykach (METRYKI=0)
+# nie są rejestrowane żadne hooki ani endpoint /metrics.
+
+PRZEDZIALY_CZASU = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PRZEDZIALY_ROZMIARU = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+PRZEDZIALY_ZAPYTAN = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Histogram skumulowany jak w Prometheusie: liczniki przedziałów, suma i liczba obserwacji."""
+
+    def __init__(self, przedzialy):
+        self.przedzialy = przedzialy
+        self.liczniki = [0] * (len(przedzialy) + 1)
+        self.suma = 0
+        self.liczba = 0
+
+    def obserwuj(self, wartosc):
+        self.liczniki[bisect.bisect_left(self.przedzialy, wartosc)] += 1
+        self.suma += wartosc
+        self.liczba += 1
+
+    def linie(self, nazwa, etykiety):
+        skumulowane = 0
+        for granica, licznik in zip((*self.przedzialy, '+Inf'), self.liczniki):
+            skumulowane += licznik
+            yield f'{nazwa}_bucket{formatuj_etykiety(etykiety, le=granica)} {skumulowane}'
+        yield f'{nazwa}_sum{formatuj_etykiety(etykiety)} {self.suma}'
+        yield f'{nazwa}_count{formatuj_etykiety(etykiety)} {self.liczba}'
+
+
+def escapuj(wartosc):
+    return str(wartosc).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def formatuj_etykiety(etykiety, **dodatkowe):
+    pary = [*etykiety, *dodatkowe.items()]
+    if not pary:
+        return ''
+    return '{' + ','.join(f'{nazwa}="{escapuj(wartosc)}"' for nazwa, wartosc in pary) + '}'
+
+
+# Nazwa metryki -> (typ, opis, przedziały histogramu)
+DEFINICJE = {
+    'http_requests_total': ('counter', 'Liczba żądań HTTP', None),
+    'http_request_duration_seconds': ('histogram', 'Czas obsługi żądania', PRZEDZIALY_CZASU),
+    'http_request_size_bytes': ('histogram', 'Rozmiar treści żądania', PRZEDZIALY_ROZMIARU),
+    'http_response_size_bytes': ('histogram', 'Rozmiar treści odpowiedzi (bez odpowiedzi strumieniowych)', PRZEDZIALY_ROZMIARU),
+    'sql_statements_per_request': ('histogram', 'Liczba zapytań SQL w żądaniu', PRZEDZIALY_ZAPYTAN),
+    'sql_duration_seconds_per_request': ('histogram', 'Łączny czas zapytań SQL w żądaniu', PRZEDZIALY_CZASU),
+}
+
+
+class Metryki:
+    """Rejestr metryk: {nazwa: {etykiety: licznik lub Histogram}}, bezpieczny dla wątków."""
+
+    def __init__(self):
+        self._blokada = threading.Lock()
+        self._wartosci = {nazwa: {} for nazwa in DEFINICJE}
+        self.dodatkowe = []  # funkcje zwracające linie dodatkowych metryk (np. pamięci podręcznej)
+
+    def zapisz_zadanie(self, endpoint, metoda, status, czas, rozmiar_zadania, rozmiar_odpowiedzi, zapytania, czas_sql):
+        etykiety = (('endpoint', endpoint), ('method', metoda))
+        with self._blokada:
+            liczniki = self._wartosci['http_requests_total']
+            klucz = (*etykiety, ('status', status))
+            liczniki[klucz] = liczniki.get(klucz, 0) + 1
+            self._histogram('http_request_duration_seconds', etykiety).obserwuj(czas)
+            self._histogram('http_request_size_bytes', etykiety).obserwuj(rozmiar_zadania)
+            if rozmiar_odpowiedzi is not None:
+                self._histogram('http_response_size_bytes', etykiety).obserwuj(rozmiar_odpowiedzi)
+            self._histogram('sql_statements_per_request', etykiety).obserwuj(zapytania)
+            self._histogram('sql_duration_seconds_per_request', etykiety).obserwuj(czas_sql)
+
+    def _histogram(self, nazwa, etykiety):
+        histogramy = self._wartosci[nazwa]
+        histogram = histogramy.get(etykiety)
+        if histogram is None:
+            histogram = histogramy[etykiety] = Histogram(DEFINICJE[nazwa][2])
+        return histogram
+
+    def tekst(self):
+        """Wszystkie metryki w formacie tekstowym Prometheusa (wersja 0.0.4)."""
+        linie = []
+        with self._blokada:
+            for nazwa, (typ, opis, _) in DEFINICJE.items():
+                linie.append(f'# HELP {nazwa} {opis}')
+                linie.append(f'# TYPE {nazwa} {typ}')
+                for etykiety, wartosc in sorted(self._wartosci[nazwa].items()):
+                    if typ == 'histogram':
+                        linie.extend(wartosc.linie(nazwa, etykiety))
+                    else:
+                        linie.append(f'{nazwa}{formatuj_etykiety(etykiety)} {wartosc}')
+        for funkcja in self.dodatkowe:
+            linie.extend(funkcja())
+        return '\n'.join(linie) + '\n'
+
+
+def linie_pamieci(nazwa, pamiec):
+    """Liczniki PamiecPodreczna jako metryki `<nazwa>_*`."""
+    statystyki = pamiec.statystyki()
+    for klucz, typ in (('trafienia', 'counter'), ('chybienia', 'counter'), ('usuniete', 'counter'), ('rozmiar', 'gauge')):
+        metryka = f'{nazwa}_{klucz}_total' if typ == 'counter' else f'{nazwa}_{klucz}'
+        yield f'# TYPE {metryka} {typ}'
+        yield f'{metryka} {statystyki[klucz]}'
+
+
+def zainstaluj(app, db, metryki=None):
+    """Rejestruje hooki żądań, zdarzenia silników bazy i endpoint /metrics (w kontekście aplikacji)."""
+    metryki = metryki or Metryki()
+
+    def przed_zapytaniem(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context():
+            conn.info.setdefault('metryki_start', []).append(time.perf_counter())
+
+    def po_zapytaniu(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and conn.info.get('metryki_start'):
+            sql = g.setdefault('metryki_sql', [0, 0.0])
+            sql[0] += 1
+            sql[1] += time.perf_counter() - conn.info['metryki_start'].pop()
+
+    for silnik in db.engines.values():
+        event.listen(silnik, 'before_cursor_execute', przed_zapytaniem)
+        event.listen(silnik, 'after_cursor_execute', po_zapytaniu)
+
+    @app.before_request
+    def poczatek_zadania():
+        g.metryki_start = time.perf_counter()
+
+    @app.after_request
+    def koniec_zadania(response):
+        if 'metryki_start' in g and request.endpoint != 'metrics':
+            zapytania, czas_sql = g.get('metryki_sql', (0, 0.0))
+            metryki.zapisz_zadanie(
+                request.url_rule.rule if request.url_rule else 'nieznany',
+                request.method,
+                response.status_code,
+                time.perf_counter() - g.metryki_start,
+                request.content_length or 0,
+                None if response.is_streamed else response.calculate_content_length(),
+                zapytania,
+                czas_sql,
+            )
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        return Response(metryki.tekst(), mimetype='text/plain; version=0.0.4')
+
+    return metryki
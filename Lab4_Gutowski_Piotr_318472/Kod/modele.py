@@ -0,0 +1,297 @@
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import bindparam, event, inspect, text
+from sqlalchemy.orm import validates
+
+import konfiguracja_bazy
+import ranking
+import wyszukiwanie
+import zmiany
+
+# Modele bazy lekcji wspólne dla aplikacji Flask (lab4serwer.create_app), trybu ASGI i skryptów
+# (generator danych, benchmarki). Obiekt `db` nie jest związany z aplikacją - wiąże go db.init_app,
+# więc import modułu nie tworzy aplikacji ani silnika bazy.
+
+db = SQLAlchemy(session_options={'class_': konfiguracja_bazy.SesjaRozdzielajaca})
+
+# Dozwolone przedmioty
+DOZWOLONE_PRZEDMIOTY = ["matematyka", "fizyka", "chemia", "historia", "WoS", "biologia", "geografia"]
+
+
+def parsuj_przedmioty(value):
+    """Zamienia tekst 'matematyka, fizyka' na listę nazw i sprawdza, czy przedmioty są dozwolone."""
+    przedmioty = [p.strip() for p in value.split(',')]
+    for przedmiot in przedmioty:
+        if przedmiot not in DOZWOLONE_PRZEDMIOTY:
+            raise ValueError(f"Nieprawidłowy przedmiot: {przedmiot}")
+    return przedmioty
+
+
+# Tabela łącząca nauczycieli z prowadzonymi przedmiotami
+nauczyciele_przedmioty = db.Table(
+    'nauczyciele_przedmioty',
+    db.Column('id_nauczyciela', db.Integer, db.ForeignKey('nauczyciele.id_nauczyciela'), primary_key=True),
+    db.Column('id_przedmiotu', db.Integer, db.ForeignKey('lista_przedmiotow.id'), primary_key=True),
+    # Kolejność przedmiotu w prowadzone_przedmioty nauczyciela (od 0)
+    db.Column('pozycja', db.Integer, nullable=False, server_default=text('0')),
+    # Wyszukiwanie nauczycieli danego przedmiotu
+    db.Index('ix_nauczyciele_przedmioty_przedmiot', 'id_przedmiotu', 'id_nauczyciela'),
+)
+
+# Tabela nauczycieli
+class Nauczyciel(db.Model):
+    __tablename__ = 'nauczyciele'
+
+    id_nauczyciela = db.Column(db.Integer, primary_key=True)
+    imie = db.Column(db.String(50), nullable=False)
+    nazwisko = db.Column(db.String(50), nullable=False)
+    opis = db.Column(db.Text)
+    ocena_nauczyciela = db.Column(db.Float, nullable=False)
+    numer_telefonu = db.Column(db.String(15), nullable=False)
+    stawka = db.Column(db.Integer, nullable=False)
+    waluta = db.Column(db.String(10), nullable=False)
+    email = db.Column(db.String(100), unique=True, nullable=False)
+
+    # Relacje
+    lekcje = db.relationship('Lekcja', back_populates='nauczyciel', cascade='all, delete-orphan')
+    kalendarz = db.relationship('KalendarzNauczyciela', back_populates='nauczyciel', cascade='all, delete-orphan')
+    przedmioty = db.relationship('Przedmiot', secondary=nauczyciele_przedmioty, back_populates='nauczyciele',
+                                 order_by=nauczyciele_przedmioty.c.pozycja)
+
+    @property
+    def prowadzone_przedmioty(self):
+        """Przedmioty jako tekst oddzielony przecinkami (format używany w API)."""
+        return ','.join(przedmiot.nazwa_przedmiotu for przedmiot in self.przedmioty)
+
+    @prowadzone_przedmioty.setter
+    def prowadzone_przedmioty(self, value):
+        # Bez powtórzeń - para (nauczyciel, przedmiot) jest kluczem tabeli łączącej
+        self.przedmioty = [Przedmiot.pobierz_lub_utworz(nazwa) for nazwa in dict.fromkeys(parsuj_przedmioty(value))]
+
+    @validates('ocena_nauczyciela')
+    def validate_ocena(self, key, value):
+        """Walidacja wartości oceny nauczyciela (od 0.0 do 5.0)."""
+        if value < 0.0 or value > 5.0:
+            raise ValueError("Ocena nauczyciela musi być liczbą rzeczywistą z przedziału 0.0-5.0.")
+        return value
+
+
+@event.listens_for(db.session, 'after_flush')
+def zapisz_kolejnosc_przedmiotow(session, flush_context):
+    """Relacja Nauczyciel.przedmioty zapisuje w tabeli łączącej tylko klucze - pozycje przedmiotów
+    (kolejność z prowadzone_przedmioty) ustawiane są po zapisie powiązań, w tym samym flush."""
+    pozycje = [
+        {'nauczyciel': nauczyciel.id_nauczyciela, 'przedmiot': przedmiot.id, 'nowa_pozycja': pozycja}
+        for nauczyciel in (*session.new, *session.dirty)
+        if isinstance(nauczyciel, Nauczyciel) and inspect(nauczyciel).attrs.przedmioty.history.has_changes()
+        for pozycja, przedmiot in enumerate(nauczyciel.przedmioty)
+    ]
+    if pozycje:
+        session.connection().execute(
+            nauczyciele_przedmioty.update()
+            .where(nauczyciele_przedmioty.c.id_nauczyciela == bindparam('nauczyciel'),
+                   nauczyciele_przedmioty.c.id_przedmiotu == bindparam('przedmiot'))
+            .values(pozycja=bindparam('nowa_pozycja')),
+            pozycje,
+        )
+
+
+# Tabela studentów
+class Student(db.Model):
+    __tablename__ = 'studenci'
+
+    id_studenta = db.Column(db.Integer, primary_key=True)
+    imie = db.Column(db.String(50), nullable=False)
+    nazwisko = db.Column(db.String(50), nullable=False)
+    email = db.Column(db.String(100), unique=True, nullable=False)
+
+
+    lekcje = db.relationship('Lekcja', back_populates='student', cascade='all, delete-orphan')
+
+class Lekcja(db.Model):
+    __tablename__ = 'lekcje'
+
+    id_lekcji = db.Column(db.Integer, primary_key=True)
+    id_nauczyciela = db.Column(db.Integer, db.ForeignKey('nauczyciele.id_nauczyciela'), nullable=False)
+    id_studenta = db.Column(db.Integer, db.ForeignKey('studenci.id_studenta'), nullable=False)
+    id_przedmiotu = db.Column(db.Integer, db.ForeignKey('lista_przedmiotow.id'), nullable=False)
+    data_lekcji = db.Column(db.DateTime, nullable=False)
+    czas_trwania = db.Column(db.Integer, nullable=False, default=60, server_default='60')  # minuty
+
+    # Relacje
+    nauczyciel = db.relationship('Nauczyciel', back_populates='lekcje')
+    student = db.relationship('Student', back_populates='lekcje')
+    przedmiot = db.relationship('Przedmiot', back_populates='lekcje')
+
+    # Indeksy: unikalny termin nauczyciela (wykrywanie konfliktów przez bazę)
+    # oraz przedział dat dla lekcji studenta. AUTOINCREMENT - id lekcji przeniesionych do archiwum
+    # (archiwum.py) nie są nadawane ponownie nowym lekcjom.
+    __table_args__ = (
+        db.Index('ix_lekcje_nauczyciel_data', 'id_nauczyciela', 'data_lekcji', unique=True),
+        db.Index('ix_lekcje_student_data', 'id_studenta', 'data_lekcji'),
+        {'sqlite_autoincrement': True},
+    )
+
+
+# Rejestr partycji archiwum lekcji (archiwum.py): tabela `tabela` zawiera lekcje z przedziału [od, do)
+class PartycjaLekcji(db.Model):
+    __tablename__ = 'partycje_lekcji'
+
+    tabela = db.Column(db.String(30), primary_key=True)
+    od = db.Column(db.DateTime, nullable=False, unique=True)
+    do = db.Column(db.DateTime, nullable=False)
+    liczba_lekcji = db.Column(db.Integer, nullable=False)
+
+
+# Tabela kalendarza nauczycieli
+class KalendarzNauczyciela(db.Model):
+    __tablename__ = 'kalendarz_nauczycieli'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Indeks dla sprawdzania godzin dostępności przy rezerwacji (wcześniej pełny skan tabeli)
+    id_nauczyciela = db.Column(db.Integer, db.ForeignKey('nauczyciele.id_nauczyciela'), nullable=False, index=True)
+    dostepny_od = db.Column(db.Time, nullable=False)
+    dostepny_do = db.Column(db.Time, nullable=False)
+
+    # Relacje
+    nauczyciel = db.relationship('Nauczyciel', back_populates='kalendarz')
+
+# Tabela listy przedmiotów
+class Przedmiot(db.Model):
+    __tablename__ = 'lista_przedmiotow'
+
+    id = db.Column(db.Integer, primary_key=True)
+    nazwa_przedmiotu = db.Column(db.String(50), nullable=False, unique=True)
+
+    # Relacje
+    lekcje = db.relationship('Lekcja', back_populates='przedmiot', cascade='all, delete-orphan')
+    nauczyciele = db.relationship('Nauczyciel', secondary=nauczyciele_przedmioty, back_populates='przedmioty')
+
+    @validates('nazwa_przedmiotu')
+    def validate_nazwa_przedmiotu(self, key, value):
+        if value not in DOZWOLONE_PRZEDMIOTY:
+            raise ValueError(f"Nieprawidłowy przedmiot: {value}")
+        return value
+
+    @classmethod
+    def pobierz_lub_utworz(cls, nazwa):
+        """Zwraca przedmiot o podanej nazwie, dodając go do listy przedmiotów, jeśli jeszcze go nie ma."""
+        for obiekt in db.session.new:
+            if isinstance(obiekt, cls) and obiekt.nazwa_przedmiotu == nazwa:
+                return obiekt
+        with db.session.no_autoflush:
+            przedmiot = cls.query.filter_by(nazwa_przedmiotu=nazwa).first()
+        if not przedmiot:
+            przedmiot = cls(nazwa_przedmiotu=nazwa)
+            db.session.add(przedmiot)
+        return przedmiot
+
+
+def lekcje_autoincrement(polaczenie):
+    """Czy tabela lekcje ma AUTOINCREMENT (starsze bazy - nie, migruj_baze przebudowuje tabelę)."""
+    sql = polaczenie.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'lekcje'")).scalar()
+    return 'AUTOINCREMENT' in (sql or '').upper()
+
+
+def partycje_lekcji_w_bazie(polaczenie):
+    """Nazwy tabel partycji archiwum lekcji (archiwum.py) istniejących w bazie."""
+    return polaczenie.execute(text(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB 'lekcje_[0-9][0-9][0-9][0-9]_[0-9][0-9]'"
+    )).scalars().all()
+
+
+def ustaw_sekwencje_lekcji(polaczenie):
+    """Przesuwa licznik id lekcji (sqlite_sequence) za największe id w tabeli lekcje i we wszystkich
+    partycjach archiwum, żeby nowa lekcja nigdy nie dostała id lekcji już istniejącej lub zarchiwizowanej."""
+    najwieksze = max(polaczenie.execute(text(f"SELECT coalesce(max(id_lekcji), 0) FROM {tabela}")).scalar()
+                     for tabela in ['lekcje', *partycje_lekcji_w_bazie(polaczenie)])
+    obecna = polaczenie.execute(text("SELECT seq FROM sqlite_sequence WHERE name = 'lekcje'")).scalar()
+    if obecna is None:
+        polaczenie.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('lekcje', :seq)"), {'seq': najwieksze})
+    elif obecna < najwieksze:
+        polaczenie.execute(text("UPDATE sqlite_sequence SET seq = :seq WHERE name = 'lekcje'"), {'seq': najwieksze})
+
+
+def id_lekcji_w_archiwum(polaczenie):
+    """Id lekcji z tabeli lekcje, które mają też lekcje w partycjach archiwum (nadane ponownie przed
+    wprowadzeniem AUTOINCREMENT)."""
+    partycje = partycje_lekcji_w_bazie(polaczenie)
+    if not partycje:
+        return []
+    archiwum = ' UNION ALL '.join(f"SELECT id_lekcji FROM {tabela}" for tabela in partycje)
+    return polaczenie.execute(text(
+        f"SELECT id_lekcji FROM lekcje WHERE id_lekcji IN ({archiwum}) ORDER BY id_lekcji"
+    )).scalars().all()
+
+
+def migruj_baze():
+    """Dostosowuje istniejącą bazę (np. starego app.db) do aktualnych modeli.
+    Dodaje brakujące indeksy tabel lekcji i kalendarza - indeks unikalny terminu nauczyciela nie powstanie,
+    jeśli w danych są już zdublowane terminy - przebudowuje tabelę lekcji bez AUTOINCREMENT
+    i przenosi przedmioty nauczycieli do tabeli łączącej (z kolejnością przedmiotów)."""
+    with db.engine.begin() as polaczenie:
+        duplikaty = polaczenie.execute(text(
+            "SELECT id_nauczyciela, data_lekcji, COUNT(*) FROM lekcje "
+            "GROUP BY id_nauczyciela, data_lekcji HAVING COUNT(*) > 1"
+        )).fetchall()
+        if duplikaty:
+            raise RuntimeError(f"Zdublowane terminy lekcji, popraw dane przed migracją: {duplikaty}")
+
+        for indeks in (*Lekcja.__table__.indexes, *KalendarzNauczyciela.__table__.indexes):
+            indeks.create(polaczenie, checkfirst=True)
+
+        # Czas trwania lekcji - istniejące lekcje trwają godzinę
+        kolumny_lekcji = [kolumna[1] for kolumna in polaczenie.execute(text("PRAGMA table_info(lekcje)"))]
+        if 'czas_trwania' not in kolumny_lekcji:
+            polaczenie.execute(text("ALTER TABLE lekcje ADD COLUMN czas_trwania INTEGER NOT NULL DEFAULT 60"))
+
+        # Tabela lekcje bez AUTOINCREMENT (SQLite nie pozwala go dodać) - przebudowa z przepisaniem wierszy.
+        # Wyzwalacze na starej tabeli znikają razem z nią i są tworzone niżej od nowa.
+        if not lekcje_autoincrement(polaczenie):
+            for indeks in Lekcja.__table__.indexes:
+                polaczenie.execute(text(f"DROP INDEX IF EXISTS {indeks.name}"))
+            polaczenie.execute(text("ALTER TABLE lekcje RENAME TO lekcje_bez_autoincrement"))
+            Lekcja.__table__.create(polaczenie)
+            kolumny = ', '.join(kolumna.name for kolumna in Lekcja.__table__.c)
+            polaczenie.execute(text(f"INSERT INTO lekcje ({kolumny}) SELECT {kolumny} FROM lekcje_bez_autoincrement"))
+            polaczenie.execute(text("DROP TABLE lekcje_bez_autoincrement"))
+        ustaw_sekwencje_lekcji(polaczenie)
+
+        # Przeniesienie przedmiotów zapisanych tekstowo w nauczyciele.prowadzone_przedmioty do tabeli łączącej
+        kolumny = [kolumna[1] for kolumna in polaczenie.execute(text("PRAGMA table_info(nauczyciele)"))]
+        if 'prowadzone_przedmioty' in kolumny:
+            nauczyciele_przedmioty.create(polaczenie, checkfirst=True)
+            id_przedmiotow = dict(polaczenie.execute(text("SELECT nazwa_przedmiotu, id FROM lista_przedmiotow")).all())
+            powiazania = []
+            for id_nauczyciela, tekst in polaczenie.execute(
+                text("SELECT id_nauczyciela, prowadzone_przedmioty FROM nauczyciele")
+            ).all():
+                for pozycja, nazwa in enumerate(dict.fromkeys(parsuj_przedmioty(tekst))):
+                    if nazwa not in id_przedmiotow:
+                        id_przedmiotow[nazwa] = polaczenie.execute(
+                            Przedmiot.__table__.insert().values(nazwa_przedmiotu=nazwa)
+                        ).inserted_primary_key[0]
+                    powiazania.append({'id_nauczyciela': id_nauczyciela, 'id_przedmiotu': id_przedmiotow[nazwa],
+                                       'pozycja': pozycja})
+            if powiazania:
+                polaczenie.execute(nauczyciele_przedmioty.insert().prefix_with('OR IGNORE'), powiazania)
+            polaczenie.execute(text("ALTER TABLE nauczyciele DROP COLUMN prowadzone_przedmioty"))
+
+        # Tabela łącząca bez kolejności przedmiotów - pozycje według kolejności zapisu powiązań (rowid)
+        kolumny = [kolumna[1] for kolumna in polaczenie.execute(text("PRAGMA table_info(nauczyciele_przedmioty)"))]
+        if 'pozycja' not in kolumny:
+            polaczenie.execute(text("ALTER TABLE nauczyciele_przedmioty ADD COLUMN pozycja INTEGER NOT NULL DEFAULT 0"))
+            polaczenie.execute(text(
+                "UPDATE nauczyciele_przedmioty SET pozycja = (SELECT count(*) FROM nauczyciele_przedmioty w "
+                "WHERE w.id_nauczyciela = nauczyciele_przedmioty.id_nauczyciela AND w.rowid < nauczyciele_przedmioty.rowid)"
+            ))
+            # Wyzwalacze indeksu pełnotekstowego łączą przedmioty według pozycji
+            wyszukiwanie.odbuduj_indeks(polaczenie)
+
+        # Indeks pełnotekstowy nauczycieli (/teacher-search), ranking przedmiotów (/teacher-ranking)
+        # i dziennik zmian lekcji (/lessons/changes) z wyzwalaczami
+        if not wyszukiwanie.indeks_aktualny(polaczenie):
+            wyszukiwanie.odbuduj_indeks(polaczenie)
+        if not ranking.ranking_aktualny(polaczenie):
+            ranking.odbuduj_ranking(polaczenie)
+        if not zmiany.dziennik_aktualny(polaczenie):
+            zmiany.odbuduj_dziennik(polaczenie)
@@ -0,0 +1,207 @@
+import argparse
+import difflib
+import gzip
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmark_obciazenie import podsumuj
+from pcap import status_odpowiedzi, wymiany_http
+
+# Odtwarzanie ruchu HTTP nagranego w pliku pcap/pcapng (np. ../lab4ariusGutowski.pcapng) jako powtarzalny
+# test wydajności. Żądania wysyłane są w nagranych odstępach czasu (--tempo 10 - dziesięć razy szybciej,
+# --tempo 0 - bez przerw) do aplikacji w tym procesie albo do działającego serwera. Wynik: rozkład czasów
+# odpowiedzi dla każdego endpointu i różnice względem nagranych odpowiedzi (status, treść JSON).
+#
+#   python odtwarzanie_ruchu.py --demo
+#   python odtwarzanie_ruchu.py --tryb http --url http://127.0.0.1:5000 --tempo 0 --powtorzenia 100
+#
+# Domyślnie żądania wysyłane są po kolei (--watki 1), więc zapisy trafiają do bazy w nagranej kolejności.
+# Większe --watki mierzy obciążenie równoległe - różnice w odpowiedziach nie oznaczają wtedy regresji.
+
+KATALOG = os.path.dirname(os.path.abspath(__file__))
+DOMYSLNE_NAGRANIE = os.path.join(KATALOG, '..', 'lab4ariusGutowski.pcapng')
+
+# Nagłówki opisujące połączenie, a nie żądanie - ustawia je klient odtwarzający
+POMIJANE_NAGLOWKI = {'host', 'content-length', 'connection', 'keep-alive', 'transfer-encoding', 'upgrade'}
+
+
+def rozpakuj(tresc, kodowanie):
+    if kodowanie == 'gzip':
+        return gzip.decompress(tresc)
+    if kodowanie == 'br':
+        import brotli
+
+        return brotli.decompress(tresc)
+    return tresc
+
+
+def klient_procesu():
+    from lab4serwer import create_app
+
+    klient = create_app().test_client()
+
+    def wyslij(metoda, sciezka, naglowki, tresc):
+        response = klient.open(sciezka, method=metoda, headers=naglowki, data=tresc)
+        return response.status_code, rozpakuj(response.get_data(), response.headers.get('Content-Encoding'))
+
+    return wyslij
+
+
+def klient_http(url):
+    import requests
+
+    lokalny = threading.local()
+
+    def wyslij(metoda, sciezka, naglowki, tresc):
+        # Osobna sesja (pula połączeń) dla każdego wątku; requests sam rozpakowuje gzip
+        if not hasattr(lokalny, 'sesja'):
+            lokalny.sesja = requests.Session()
+        response = lokalny.sesja.request(metoda, url + sciezka, headers=dict(naglowki), data=tresc or None)
+        return response.status_code, response.content
+
+    return wyslij
+
+
+def endpoint(wymiana):
+    """Metoda i pierwszy segment ścieżki, np. 'GET /teacher-details'."""
+    return f"{wymiana.metoda} /{wymiana.sciezka.split('?', 1)[0].strip('/').split('/', 1)[0]}"
+
+
+def bez_pol(wartosc, ignorowane):
+    if isinstance(wartosc, dict):
+        return {klucz: bez_pol(pole, ignorowane) for klucz, pole in wartosc.items() if klucz not in ignorowane}
+    if isinstance(wartosc, list):
+        return [bez_pol(element, ignorowane) for element in wartosc]
+    return wartosc
+
+
+def jako_tekst(tresc, ignorowane):
+    """Treść do porównania: JSON w postaci kanonicznej (bez ignorowanych pól), inaczej surowy tekst."""
+    try:
+        return json.dumps(bez_pol(json.loads(tresc), ignorowane), ensure_ascii=False, indent=2, sort_keys=True)
+    except ValueError:
+        return tresc.decode('utf-8', 'replace')
+
+
+def roznica(wymiana, status, tresc, ignorowane):
+    """Opis różnicy między nagraną a otrzymaną odpowiedzią albo None."""
+    if wymiana.odpowiedz is None:
+        return None
+    nagrany_status = status_odpowiedzi(wymiana.odpowiedz)
+    naglowki = {nazwa.lower(): wartosc for nazwa, wartosc in wymiana.odpowiedz.naglowki}
+    nagrana = jako_tekst(rozpakuj(wymiana.odpowiedz.tresc, naglowki.get('content-encoding')), ignorowane)
+    otrzymana = jako_tekst(tresc, ignorowane)
+    if status == nagrany_status and nagrana == otrzymana:
+        return None
+    opis = [f"status {nagrany_status} -> {status}"] if status != nagrany_status else []
+    opis.extend(difflib.unified_diff(nagrana.splitlines(), otrzymana.splitlines(), 'nagrana', 'otrzymana', lineterm='', n=1))
+    return '\n'.join(opis)
+
+
+def plan(wymiany, tempo, powtorzenia):
+    """(czas wysłania od startu w sekundach, wymiana) - nagrane odstępy podzielone przez tempo."""
+    if not wymiany:
+        return []
+    poczatek = wymiany[0].czas
+    # Kolejne powtórzenie zaczyna się po ostatnim żądaniu nagrania i średnim odstępie między żądaniami
+    dlugosc = (wymiany[-1].czas - poczatek) * (1 + 1 / max(1, len(wymiany) - 1))
+    return [
+        ((nr * dlugosc + wymiana.czas - poczatek) / tempo if tempo else 0.0, wymiana)
+        for nr in range(powtorzenia)
+        for wymiana in wymiany
+    ]
+
+
+def odtworz(args, wymiany):
+    wyslij = klient_procesu() if args.tryb == 'proces' else klient_http(args.url)
+    ignorowane = set(args.ignoruj)
+    pomiary, roznice, opoznienia = {}, [], []
+    blokada = threading.Lock()
+
+    def wykonaj(termin, wymiana, start):
+        opoznienie = time.perf_counter() - start - termin
+        naglowki = [(nazwa, wartosc) for nazwa, wartosc in wymiana.naglowki if nazwa.lower() not in POMIJANE_NAGLOWKI]
+        poczatek = time.perf_counter()
+        try:
+            status, tresc = wyslij(wymiana.metoda, wymiana.sciezka, naglowki, wymiana.tresc)
+        except Exception as e:
+            # Błąd połączenia liczony jak status odpowiedzi, żeby nie zniknął w wątku puli
+            status, tresc = type(e).__name__, str(e).encode()
+        czas_ms = (time.perf_counter() - poczatek) * 1000
+        opis = roznica(wymiana, status, tresc, ignorowane)
+        with blokada:
+            pomiary.setdefault(endpoint(wymiana), []).append((status, czas_ms))
+            opoznienia.append(opoznienie)
+            if opis:
+                roznice.append((wymiana, opis))
+
+    # Rozgrzewka (połączenia z bazą, pierwsze wywołania widoków) poza pomiarem - nieistniejąca ścieżka nie zmienia danych
+    wyslij('GET', '/', [], b'')
+
+    harmonogram = plan(wymiany, args.tempo, args.powtorzenia)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.watki) as pula:
+        for termin, wymiana in harmonogram:
+            czekaj = start + termin - time.perf_counter()
+            if czekaj > 0:
+                time.sleep(czekaj)
+            pula.submit(wykonaj, termin, wymiana, start)
+    czas = time.perf_counter() - start
+
+    wszystkie = [pomiar for lista in pomiary.values() for pomiar in lista]
+    return {
+        'calosc': dict(podsumuj(wszystkie), czas_s=czas, przepustowosc_rps=len(wszystkie) / czas,
+                       max_opoznienie_ms=max(opoznienia, default=0) * 1000),
+        'endpointy': {nazwa: podsumuj(lista) for nazwa, lista in sorted(pomiary.items())},
+        'roznice': roznice,
+    }
+
+
+def wypisz(wynik, limit_roznic):
+    calosc = wynik['calosc']
+    print(f"Żądania: {calosc['liczba']} w {calosc['czas_s']:.2f} s, przepustowość {calosc['przepustowosc_rps']:.1f} req/s, "
+          f"największe opóźnienie względem harmonogramu {calosc['max_opoznienie_ms']:.1f} ms")
+    print(f"{'endpoint':<24}{'liczba':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}  statusy")
+    for nazwa, dane in wynik['endpointy'].items():
+        print(f"{nazwa:<24}{dane['liczba']:>8}{dane['p50_ms']:>10.2f}{dane['p95_ms']:>10.2f}{dane['p99_ms']:>10.2f}"
+              f"{dane['max_ms']:>10.2f}  {dane['statusy']}")
+
+    roznice = wynik['roznice']
+    print(f"\nOdpowiedzi różne od nagranych: {len(roznice)} z {calosc['liczba']}")
+    for wymiana, opis in roznice[:limit_roznic]:
+        print(f"\n{wymiana.metoda} {wymiana.sciezka}\n{opis}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Odtwarzanie ruchu HTTP z pliku pcap/pcapng")
+    parser.add_argument('plik', nargs='?', default=DOMYSLNE_NAGRANIE, help="Nagranie pcap/pcapng")
+    parser.add_argument('--port', type=int, help="Port serwera w nagraniu (domyślnie strona odbierająca żądania)")
+    parser.add_argument('--tryb', choices=['proces', 'http'], default='proces')
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--demo', action='store_true',
+                        help="Tryb proces: świeża baza tymczasowa z danymi demonstracyjnymi (jak podczas nagrania)")
+    parser.add_argument('--tempo', type=float, default=1.0, help="Mnożnik szybkości względem nagrania; 0 - bez przerw")
+    parser.add_argument('--powtorzenia', type=int, default=1, help="Ile razy odtworzyć nagranie")
+    parser.add_argument('--watki', type=int, default=1,
+                        help="Maksymalna liczba równoczesnych żądań (domyślnie 1 - po kolei, jak klient z nagrania; "
+                             "przy większej zapisy mogą się wyprzedzać i dawać różnice w odpowiedziach)")
+    parser.add_argument('--ignoruj', nargs='*', default=[], help="Pola JSON pomijane przy porównaniu odpowiedzi")
+    parser.add_argument('--roznice', type=int, default=10, help="Ile różnic wypisać")
+    args = parser.parse_args()
+
+    wymiany = wymiany_http(args.plik, args.port)
+    if not wymiany:
+        sys.exit(f"Brak żądań HTTP w {args.plik}")
+    print(f"Nagranie: {len(wymiany)} żądań w {wymiany[-1].czas - wymiany[0].czas:.3f} s")
+
+    if args.demo:
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'odtwarzanie.db')
+        subprocess.run([sys.executable, os.path.join(KATALOG, 'generator_danych.py'), 'demo'], check=True, stdout=subprocess.DEVNULL)
+
+    wypisz(odtworz(args, wymiany), args.roznice)
@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class PamiecPodreczna:
+    """Pamięć podręczna LRU z czasem życia wpisów (TTL), bezpieczna dla wątków.
+    Zlicza trafienia i chybienia, żeby można było dobrać pojemność."""
+
+    def __init__(self, pojemnosc=1024, ttl=300):
+        self.pojemnosc = pojemnosc
+        self.ttl = ttl
+        self._wpisy = OrderedDict()
+        self._blokada = threading.Lock()
+        self.trafienia = 0
+        self.chybienia = 0
+        self.usuniete = 0
+
+    def pobierz(self, klucz):
+        """Zwraca zapisaną wartość albo None, jeśli jej nie ma lub wygasła."""
+        with self._blokada:
+            wpis = self._wpisy.get(klucz)
+            if wpis is None or wpis[0] < time.monotonic():
+                if wpis is not None:
+                    del self._wpisy[klucz]
+                self.chybienia += 1
+                return None
+            self._wpisy.move_to_end(klucz)
+            self.trafienia += 1
+            return wpis[1]
+
+    def zapisz(self, klucz, wartosc):
+        with self._blokada:
+            self._wpisy[klucz] = (time.monotonic() + self.ttl, wartosc)
+            self._wpisy.move_to_end(klucz)
+            while len(self._wpisy) > self.pojemnosc:
+                self._wpisy.popitem(last=False)
+                self.usuniete += 1
+
+    def uniewaznij(self, klucz):
+        with self._blokada:
+            self._wpisy.pop(klucz, None)
+
+    def wyczysc(self):
+        with self._blokada:
+            self._wpisy.clear()
+
+    def statystyki(self):
+        with self._blokada:
+            zapytania = self.trafienia + self.chybienia
+            return {
+                'rozmiar': len(self._wpisy),
+                'pojemnosc': self.pojemnosc,
+                'ttl': self.ttl,
+                'trafienia': self.trafienia,
+                'chybienia': self.chybienia,
+                'usuniete': self.usuniete,
+                'wspolczynnik_trafien': self.trafienia / zapytania if zapytania else 0.0,
+            }
@@ -0,0 +1,284 @@
+import struct
+from bisect import bisect_right
+from collections import namedtuple
+
+# Odczyt żądań i odpowiedzi HTTP/1.x z przechwyconego ruchu (pcap lub pcapng) bez zewnętrznych bibliotek:
+# bloki pliku -> ramki łącza (loopback BSD/NULL, Ethernet z VLAN, surowe IP, Linux SLL) -> segmenty TCP
+# nad IPv4/IPv6 -> strumienie TCP złożone wg numerów sekwencyjnych -> komunikaty HTTP.
+#
+#   python pcap.py ../lab4ariusGutowski.pcapng
+
+Pakiet = namedtuple('Pakiet', 'czas typ_lacza dane')
+Segment = namedtuple('Segment', 'czas zrodlo cel seq flagi dane')
+Komunikat = namedtuple('Komunikat', 'czas linia naglowki tresc')
+Wymiana = namedtuple('Wymiana', 'czas polaczenie metoda sciezka naglowki tresc odpowiedz')
+
+LACZE_NULL, LACZE_ETHERNET, LACZE_RAW, LACZE_SLL = 0, 1, 101, 113
+FLAGA_SYN = 0x02
+METODY = (b'GET', b'POST', b'PUT', b'PATCH', b'DELETE', b'HEAD', b'OPTIONS')
+
+
+class BladPcap(ValueError):
+    pass
+
+
+# Bloki plików
+
+def czytaj_pcap(dane):
+    """Pakiety klasycznego pliku pcap (mikro- lub nanosekundowe znaczniki czasu, dowolna kolejność bajtów)."""
+    magia = dane[:4]
+    for kolejnosc in ('<', '>'):
+        (wartosc,) = struct.unpack(kolejnosc + 'I', magia)
+        if wartosc in (0xa1b2c3d4, 0xa1b23c4d):
+            break
+    else:
+        raise BladPcap("To nie jest plik pcap")
+    dzielnik = 1e6 if wartosc == 0xa1b2c3d4 else 1e9
+    typ_lacza = struct.unpack_from(kolejnosc + 'I', dane, 20)[0] & 0x0fffffff
+    pozycja = 24
+    while pozycja + 16 <= len(dane):
+        sekundy, ulamek, dlugosc, _ = struct.unpack_from(kolejnosc + 'IIII', dane, pozycja)
+        pozycja += 16
+        yield Pakiet(sekundy + ulamek / dzielnik, typ_lacza, dane[pozycja:pozycja + dlugosc])
+        pozycja += dlugosc
+
+
+def rozdzielczosc_czasu(opcje, kolejnosc):
+    """Rozdzielczość znaczników czasu interfejsu z opcji if_tsresol (domyślnie mikrosekundy)."""
+    pozycja = 0
+    while pozycja + 4 <= len(opcje):
+        kod, dlugosc = struct.unpack_from(kolejnosc + 'HH', opcje, pozycja)
+        if kod == 0:
+            break
+        if kod == 9 and dlugosc >= 1:
+            wartosc = opcje[pozycja + 4]
+            return 2 ** (wartosc & 0x7f) if wartosc & 0x80 else 10 ** wartosc
+        pozycja += 4 + (dlugosc + 3) // 4 * 4
+    return 10 ** 6
+
+
+def czytaj_pcapng(dane):
+    """Pakiety pliku pcapng (bloki EPB, SPB i przestarzałe PB; interfejsy z bloków IDB każdej sekcji)."""
+    pozycja = 0
+    kolejnosc = '<'
+    interfejsy = []
+    while pozycja + 12 <= len(dane):
+        if dane[pozycja:pozycja + 4] == b'\x0a\x0d\x0d\x0a':
+            # Nowa sekcja: kolejność bajtów z magicznej liczby, interfejsy od nowa
+            kolejnosc = '<' if dane[pozycja + 8:pozycja + 12] == b'\x4d\x3c\x2b\x1a' else '>'
+            interfejsy = []
+        typ, dlugosc = struct.unpack_from(kolejnosc + 'II', dane, pozycja)
+        if dlugosc < 12 or pozycja + dlugosc > len(dane):
+            raise BladPcap(f"Uszkodzony blok pcapng na pozycji {pozycja}")
+        tresc = dane[pozycja + 8:pozycja + dlugosc - 4]
+
+        if typ == 1:
+            typ_lacza = struct.unpack_from(kolejnosc + 'H', tresc)[0]
+            interfejsy.append((typ_lacza, rozdzielczosc_czasu(tresc[8:], kolejnosc)))
+        elif typ in (2, 6):
+            if typ == 6:
+                interfejs, gorne, dolne, przechwycone = struct.unpack_from(kolejnosc + 'IIII', tresc)
+            else:
+                interfejs, _, gorne, dolne, przechwycone = struct.unpack_from(kolejnosc + 'HHIII', tresc)
+            typ_lacza, rozdzielczosc = interfejsy[interfejs]
+            yield Pakiet(((gorne << 32) | dolne) / rozdzielczosc, typ_lacza, tresc[20:20 + przechwycone])
+        elif typ == 3 and interfejsy:
+            # Simple Packet Block nie ma znacznika czasu
+            (dlugosc_pakietu,) = struct.unpack_from(kolejnosc + 'I', tresc)
+            yield Pakiet(None, interfejsy[0][0], tresc[4:4 + dlugosc_pakietu])
+        pozycja += dlugosc
+
+
+def czytaj_pakiety(sciezka):
+    with open(sciezka, 'rb') as plik:
+        dane = plik.read()
+    if dane[:4] == b'\x0a\x0d\x0d\x0a':
+        return list(czytaj_pcapng(dane))
+    return list(czytaj_pcap(dane))
+
+
+# Warstwy łącza, sieci i transportu
+
+def ramka_ip(typ_lacza, dane):
+    """Pakiet IP z ramki łącza albo None dla innych protokołów."""
+    if typ_lacza == LACZE_NULL:
+        return dane[4:]
+    if typ_lacza == LACZE_RAW:
+        return dane
+    if typ_lacza == LACZE_SLL:
+        typ, pozycja = struct.unpack_from('>H', dane, 14)[0], 16
+    elif typ_lacza == LACZE_ETHERNET:
+        typ, pozycja = struct.unpack_from('>H', dane, 12)[0], 14
+        while typ in (0x8100, 0x88a8):
+            typ, pozycja = struct.unpack_from('>H', dane, pozycja + 2)[0], pozycja + 4
+    else:
+        raise BladPcap(f"Nieobsługiwany typ łącza: {typ_lacza}")
+    return dane[pozycja:] if typ in (0x0800, 0x86dd) else None
+
+
+def segment_tcp(pakiet):
+    """Segment TCP z pakietu albo None (inne protokoły, fragmenty IP, ucięte nagłówki)."""
+    ip = ramka_ip(pakiet.typ_lacza, pakiet.dane)
+    if not ip:
+        return None
+    wersja = ip[0] >> 4
+    if wersja == 4:
+        dlugosc_naglowka = (ip[0] & 0x0f) * 4
+        dlugosc_calkowita, fragment, protokol = struct.unpack_from('>H2xHxB', ip, 2)
+        if protokol != 6 or fragment & 0x3fff:
+            return None
+        zrodlo, cel = ip[12:16], ip[16:20]
+        tcp = ip[dlugosc_naglowka:dlugosc_calkowita or len(ip)]
+        adres = lambda surowy: '.'.join(map(str, surowy))
+    elif wersja == 6:
+        dlugosc_danych, protokol = struct.unpack_from('>HB', ip, 4)
+        if protokol != 6:
+            return None
+        zrodlo, cel = ip[8:24], ip[24:40]
+        tcp = ip[40:40 + dlugosc_danych]
+        adres = lambda surowy: ':'.join(surowy[i:i + 2].hex() for i in range(0, 16, 2))
+    else:
+        return None
+    if len(tcp) < 20:
+        return None
+    port_zrodla, port_celu, seq, przesuniecie, flagi = struct.unpack_from('>HHI4xBB', tcp)
+    return Segment(
+        pakiet.czas,
+        (adres(zrodlo), port_zrodla),
+        (adres(cel), port_celu),
+        seq,
+        flagi,
+        tcp[(przesuniecie >> 4) * 4:],
+    )
+
+
+def zloz_strumienie(segmenty):
+    """Strumienie TCP: {(zrodlo, cel, nr_polaczenia): [(czas, bajty), ...]} - fragmenty w kolejności numerów
+    sekwencyjnych, bez retransmisji. Kolejne połączenia na tych samych portach zaczynają się od SYN."""
+    polaczenia = {}
+    for segment in segmenty:
+        lista = polaczenia.setdefault((segment.zrodlo, segment.cel), [])
+        if segment.flagi & FLAGA_SYN:
+            poczatek = (segment.seq + 1) & 0xffffffff
+            if not lista or lista[-1][0] != poczatek:
+                lista.append((poczatek, {}))
+        elif not lista:
+            lista.append((segment.seq, {}))  # połączenie otwarte przed początkiem nagrania
+        if segment.dane:
+            lista[-1][1].setdefault(segment.seq, (segment.czas, segment.dane))
+
+    wynik = {}
+    for (zrodlo, cel), lista in polaczenia.items():
+        for nr, (poczatek, fragmenty) in enumerate(lista):
+            zlozone, pozycja = [], 0
+            przesuniecia = sorted(((seq - poczatek) & 0xffffffff, seq) for seq in fragmenty)
+            for przesuniecie, seq in przesuniecia:
+                if przesuniecie >= 0x80000000:
+                    continue  # dane sprzed początku strumienia
+                czas, dane = fragmenty[seq]
+                if przesuniecie + len(dane) <= pozycja:
+                    continue  # retransmisja
+                zlozone.append((czas, dane[max(0, pozycja - przesuniecie):]))
+                pozycja = przesuniecie + len(dane)
+            wynik[(zrodlo, cel, nr)] = zlozone
+    return wynik
+
+
+# HTTP
+
+def czytaj_komunikaty(fragmenty, odpowiedzi=False):
+    """Komunikaty HTTP/1.x z bajtów strumienia. Treść wg Content-Length, Transfer-Encoding: chunked
+    albo - dla odpowiedzi - do końca połączenia. Czas komunikatu to czas fragmentu z jego pierwszym bajtem."""
+    dane = b''.join(fragment for _, fragment in fragmenty)
+    poczatki, pozycja = [], 0
+    for _, fragment in fragmenty:
+        poczatki.append(pozycja)
+        pozycja += len(fragment)
+
+    def czas_bajtu(nr):
+        return fragmenty[bisect_right(poczatki, nr) - 1][0]
+
+    komunikaty, pozycja = [], 0
+    while pozycja < len(dane):
+        koniec_naglowkow = dane.find(b'\r\n\r\n', pozycja)
+        if koniec_naglowkow < 0:
+            break
+        pozycja_komunikatu = pozycja
+        linia, *reszta = dane[pozycja:koniec_naglowkow].decode('latin-1').split('\r\n')
+        naglowki = []
+        for wiersz in reszta:
+            nazwa, _, wartosc = wiersz.partition(':')
+            naglowki.append((nazwa.strip(), wartosc.strip()))
+        slownik = {nazwa.lower(): wartosc for nazwa, wartosc in naglowki}
+        poczatek_tresci = koniec_naglowkow + 4
+
+        if 'chunked' in slownik.get('transfer-encoding', '').lower():
+            tresc, pozycja = b'', poczatek_tresci
+            while True:
+                koniec_linii = dane.find(b'\r\n', pozycja)
+                if koniec_linii < 0:
+                    pozycja = len(dane)
+                    break
+                rozmiar = int(dane[pozycja:koniec_linii].split(b';')[0] or b'0', 16)
+                pozycja = koniec_linii + 2
+                if rozmiar == 0:
+                    koniec_stopki = dane.find(b'\r\n\r\n', pozycja - 2)
+                    pozycja = len(dane) if koniec_stopki < 0 else koniec_stopki + 4
+                    break
+                tresc += dane[pozycja:pozycja + rozmiar]
+                pozycja += rozmiar + 2
+        elif 'content-length' in slownik:
+            pozycja = poczatek_tresci + int(slownik['content-length'])
+            tresc = dane[poczatek_tresci:pozycja]
+        elif odpowiedzi and linia.split(' ')[1:2] not in (['204'], ['304']):
+            tresc, pozycja = dane[poczatek_tresci:], len(dane)
+        else:
+            tresc, pozycja = b'', poczatek_tresci
+
+        komunikaty.append(Komunikat(czas_bajtu(pozycja_komunikatu), linia, naglowki, tresc))
+    return komunikaty
+
+
+def wymiany_http(sciezka, port=None):
+    """Żądania HTTP z pliku w kolejności wysłania, każde z nagraną odpowiedzią (albo None).
+    `port` ogranicza ruch do serwera na tym porcie; domyślnie serwerem jest strona odbierająca żądania."""
+    strumienie = zloz_strumienie(filter(None, map(segment_tcp, czytaj_pakiety(sciezka))))
+    wymiany = []
+    for (zrodlo, cel, nr), fragmenty in strumienie.items():
+        if not fragmenty or (port is not None and cel[1] != port):
+            continue
+        if fragmenty[0][1].split(b' ', 1)[0] not in METODY:
+            continue
+        zadania = czytaj_komunikaty(fragmenty)
+        odpowiedzi = czytaj_komunikaty(strumienie.get((cel, zrodlo, nr), []), odpowiedzi=True)
+        for nr_zadania, zadanie in enumerate(zadania):
+            metoda, sciezka_zadania, _ = zadanie.linia.split(' ', 2)
+            wymiany.append(Wymiana(
+                zadanie.czas,
+                f"{zrodlo[0]}:{zrodlo[1]}->{cel[0]}:{cel[1]}",
+                metoda,
+                sciezka_zadania,
+                zadanie.naglowki,
+                zadanie.tresc,
+                odpowiedzi[nr_zadania] if nr_zadania < len(odpowiedzi) else None,
+            ))
+    return sorted(wymiany, key=lambda wymiana: (wymiana.czas or 0))
+
+
+def status_odpowiedzi(komunikat):
+    return int(komunikat.linia.split(' ', 2)[1])
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Lista żądań HTTP z pliku pcap/pcapng")
+    parser.add_argument('plik')
+    parser.add_argument('--port', type=int, help="Port serwera HTTP")
+    args = parser.parse_args()
+
+    wymiany = wymiany_http(args.plik, args.port)
+    poczatek = wymiany[0].czas if wymiany else 0
+    for wymiana in wymiany:
+        status = status_odpowiedzi(wymiana.odpowiedz) if wymiana.odpowiedz else '-'
+        print(f"{wymiana.czas - poczatek:9.3f}s  {wymiana.metoda:<6} {wymiana.sciezka}  -> {status}  ({len(wymiana.tresc)} B)")
@@ -0,0 +1,87 @@
+from sqlalchemy import column, table
+
+# Ranking nauczycieli przedmiotu: tabela `ranking_nauczycieli` WITHOUT ROWID z kluczem
+# (id_przedmiotu, ocena DESC, stawka, id_nauczyciela), czyli dla każdego przedmiotu lista nauczycieli
+# już posortowana od najlepszych (przy równej ocenie najtańsi). Zapytanie o K najlepszych to odczyt
+# kolejnych K wierszy klucza bez sortowania; filtry waluty i stawki sprawdzane są w trakcie odczytu.
+# Tabelę aktualizują wyzwalacze: przypisanie/odebranie przedmiotu (tabela łącząca, więc także
+# /add-teacher i /import-teachers), zmiana oceny, stawki lub waluty i usunięcie nauczyciela.
+
+TABELA = """
+    CREATE TABLE ranking_nauczycieli (
+        id_przedmiotu INTEGER NOT NULL,
+        ocena_nauczyciela FLOAT NOT NULL,
+        stawka INTEGER NOT NULL,
+        id_nauczyciela INTEGER NOT NULL,
+        waluta VARCHAR(10) NOT NULL,
+        PRIMARY KEY (id_przedmiotu, ocena_nauczyciela DESC, stawka, id_nauczyciela)
+    ) WITHOUT ROWID"""
+
+WYZWALACZE = {
+    'ranking_wstawienie': """
+        CREATE TRIGGER ranking_wstawienie AFTER INSERT ON nauczyciele_przedmioty BEGIN
+            INSERT INTO ranking_nauczycieli (id_przedmiotu, ocena_nauczyciela, stawka, id_nauczyciela, waluta)
+            SELECT new.id_przedmiotu, ocena_nauczyciela, stawka, id_nauczyciela, waluta
+            FROM nauczyciele WHERE id_nauczyciela = new.id_nauczyciela;
+        END""",
+    'ranking_usuniecie': """
+        CREATE TRIGGER ranking_usuniecie AFTER DELETE ON nauczyciele_przedmioty BEGIN
+            DELETE FROM ranking_nauczycieli WHERE id_przedmiotu = old.id_przedmiotu AND id_nauczyciela = old.id_nauczyciela
+                AND (ocena_nauczyciela, stawka) = (
+                    SELECT ocena_nauczyciela, stawka FROM nauczyciele WHERE id_nauczyciela = old.id_nauczyciela);
+        END""",
+    # Stare wartości oceny i stawki dają pełny klucz - każdy wiersz przedmiotu znajdowany bez przeglądania
+    'ranking_zmiana': """
+        CREATE TRIGGER ranking_zmiana AFTER UPDATE OF ocena_nauczyciela, stawka, waluta ON nauczyciele BEGIN
+            UPDATE ranking_nauczycieli
+            SET ocena_nauczyciela = new.ocena_nauczyciela, stawka = new.stawka, waluta = new.waluta
+            WHERE id_przedmiotu IN (
+                    SELECT id_przedmiotu FROM nauczyciele_przedmioty WHERE id_nauczyciela = new.id_nauczyciela)
+                AND ocena_nauczyciela = old.ocena_nauczyciela AND stawka = old.stawka
+                AND id_nauczyciela = new.id_nauczyciela;
+        END""",
+    # Gdyby powiązania zostały usunięte już po nauczycielu (wtedy ranking_usuniecie nie zna klucza)
+    'ranking_usuniecie_nauczyciela': """
+        CREATE TRIGGER ranking_usuniecie_nauczyciela AFTER DELETE ON nauczyciele BEGIN
+            DELETE FROM ranking_nauczycieli
+            WHERE id_przedmiotu IN (SELECT id FROM lista_przedmiotow)
+                AND ocena_nauczyciela = old.ocena_nauczyciela AND stawka = old.stawka
+                AND id_nauczyciela = old.id_nauczyciela;
+        END""",
+}
+
+# Do budowania zapytań (tabela spoza metadanych modeli - tworzą ją odbuduj_ranking i migracja)
+RANKING = table(
+    'ranking_nauczycieli',
+    column('id_przedmiotu'),
+    column('ocena_nauczyciela'),
+    column('stawka'),
+    column('id_nauczyciela'),
+    column('waluta'),
+)
+
+# Kolejność klucza tabeli
+KOLEJNOSC = (RANKING.c.ocena_nauczyciela.desc(), RANKING.c.stawka, RANKING.c.id_nauczyciela)
+
+
+def ranking_aktualny(polaczenie):
+    """Czy tabela rankingu i wszystkie wyzwalacze istnieją."""
+    obiekty = {nazwa for (nazwa,) in polaczenie.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE name = 'ranking_nauczycieli' OR type = 'trigger'"
+    )}
+    return {'ranking_nauczycieli', *WYZWALACZE} <= obiekty
+
+
+def odbuduj_ranking(polaczenie):
+    """Tworzy od nowa tabelę rankingu z bieżących danych (jednym INSERT ... SELECT) i wyzwalacze."""
+    for nazwa in WYZWALACZE:
+        polaczenie.exec_driver_sql(f"DROP TRIGGER IF EXISTS {nazwa}")
+    polaczenie.exec_driver_sql("DROP TABLE IF EXISTS ranking_nauczycieli")
+    polaczenie.exec_driver_sql(TABELA)
+    polaczenie.exec_driver_sql(
+        "INSERT INTO ranking_nauczycieli (id_przedmiotu, ocena_nauczyciela, stawka, id_nauczyciela, waluta) "
+        "SELECT np.id_przedmiotu, n.ocena_nauczyciela, n.stawka, n.id_nauczyciela, n.waluta "
+        "FROM nauczyciele_przedmioty np JOIN nauczyciele n ON n.id_nauczyciela = np.id_nauczyciela"
+    )
+    for sql in WYZWALACZE.values():
+        polaczenie.exec_driver_sql(sql)
@@ -0,0 +1,69 @@
+import json
+import os
+from datetime import datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Dostawca JSON aplikacji: orjson, jeśli jest zainstalowany (JSON_ORJSON=0 wymusza bibliotekę
+# standardową). Daty (datetime) serializowane są przez dostawcę w formacie parametrów endpointów
+# (RRRR-MM-DD GG:MM), więc widoki przekazują wiersze z bazy bez formatowania pól. Oba warianty
+# dają te same bajty: klucze posortowane, zapis zwarty, znaki spoza ASCII jako UTF-8.
+
+UZYJ_ORJSON = orjson is not None and os.environ.get('JSON_ORJSON', '1') != '0'
+
+
+def formatuj_date(wartosc):
+    """Data jak FORMAT_DATY ('%Y-%m-%d %H:%M') - isoformat jest kilkakrotnie szybszy od strftime."""
+    return wartosc.isoformat(' ', 'minutes')
+
+
+class DostawcaJSON(DefaultJSONProvider):
+    """DefaultJSONProvider z orjson i własnym formatem dat."""
+
+    ensure_ascii = False
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, datetime):
+            return formatuj_date(o)
+        return DefaultJSONProvider.default(o)
+
+    def _opcje_orjson(self, wciecia):
+        opcje = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            opcje |= orjson.OPT_SORT_KEYS
+        if wciecia:
+            opcje |= orjson.OPT_INDENT_2
+        return opcje
+
+    def _wciecia(self):
+        return (self.compact is None and self._app.debug) or self.compact is False
+
+    def dumps(self, obj, **kwargs):
+        """Zapis zwarty. Argumenty spoza json.dumps-owych domyślnych (np. indent) wyłączają orjson."""
+        if UZYJ_ORJSON and not kwargs:
+            return orjson.dumps(obj, default=self.default, option=self._opcje_orjson(False)).decode()
+        kwargs.setdefault('separators', (',', ':'))
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if UZYJ_ORJSON and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        """Odpowiedź JSON zakończona znakiem nowej linii, jak w DefaultJSONProvider. orjson zwraca bajty
+        bez pośredniego str."""
+        obj = self._prepare_response_obj(args, kwargs)
+        if UZYJ_ORJSON:
+            tresc = orjson.dumps(obj, default=self.default, option=self._opcje_orjson(self._wciecia())) + b'\n'
+        elif self._wciecia():
+            tresc = super().dumps(obj, indent=2) + '\n'
+        else:
+            tresc = self.dumps(obj) + '\n'
+        return self._app.response_class(tresc, mimetype=self.mimetype)
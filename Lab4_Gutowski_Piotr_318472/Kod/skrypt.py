@@ -1,6 +1,8 @@
 import requests
 import json
 
+# Przed uruchomieniem testów baza musi zawierać dane demonstracyjne:
+#   python generator_danych.py demo && python lab4serwer.py
 BASE_URL = "http://127.0.0.1:5000"  # Adres lokalnego serwera Flask
 HEADERS = {"Authorization": "Piotr Gutowski"}
 
@@ -11,6 +13,16 @@ def test_teacher_list():
     response = requests.get(f"{BASE_URL}/teacher-list", headers=HEADERS)
     print("Wynik:", response.status_code, response.json())
 
+    # Stronicowanie - kolejne strony po kursorze z nagłówka X-Nastepny-Kursor
+    params = {"limit": 2}
+    while True:
+        response = requests.get(f"{BASE_URL}/teacher-list", headers=HEADERS, params=params)
+        print("Strona:", response.status_code, response.json())
+        kursor = response.headers.get("X-Nastepny-Kursor")
+        if not kursor:
+            break
+        params["kursor"] = kursor
+
 def test_teacher_details():
     print("\n### TEST /teacher-details ###")
     # Przypadek pozytywny - poprawne id
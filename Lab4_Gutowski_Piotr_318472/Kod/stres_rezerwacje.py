@@ -0,0 +1,147 @@
+import argparse
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+# Test obciążeniowy rezerwacji: wiele procesów (każdy z kilkoma wątkami) rezerwuje jednocześnie
+# losowe, nachodzące na siebie terminy o różnej długości u kilku nauczycieli w wąskim oknie czasu
+# (pojedynczo przez /book-lesson i paczkami przez /book-lessons). Na koniec baza jest sprawdzana
+# pod kątem nakładających się lekcji tego samego nauczyciela - kod wyjścia 1, jeśli takie istnieją.
+#
+#   python stres_rezerwacje.py --procesy 4 --watki 4 --proby 200
+
+KATALOG = os.path.dirname(os.path.abspath(__file__))
+
+# Okno rezerwacji: jeden dzień, terminy co 15 minut, długości 30-120 minut
+DZIEN = datetime(2031, 1, 6)
+KROK = timedelta(minutes=15)
+DLUGOSCI = (30, 45, 60, 90, 120)
+
+
+def losowa_rezerwacja(los, nauczyciele, studenci, godziny):
+    id_nauczyciela = los.choice(nauczyciele)
+    od, do = godziny[id_nauczyciela]
+    czas_trwania = los.choice(DLUGOSCI)
+    poczatek = DZIEN.replace(hour=od.hour, minute=od.minute)
+    koniec = DZIEN.replace(hour=do.hour, minute=do.minute) - timedelta(minutes=czas_trwania)
+    data = poczatek + KROK * los.randint(0, max(0, (koniec - poczatek) // KROK))
+    return {
+        "id_studenta": los.randint(1, studenci),
+        "id_nauczyciela": id_nauczyciela,
+        "data_lekcji": data.strftime("%Y-%m-%d %H:%M"),
+        "czas_trwania": czas_trwania,
+    }
+
+
+def klient(nr, args, app, godziny, statusy, blokada):
+    klient_http = app.test_client()
+    los = random.Random(nr)
+    nauczyciele = sorted(godziny)
+    lokalne = {}
+    for _ in range(args.proby):
+        if los.random() < 0.2:
+            response = klient_http.post("/book-lessons", json=[
+                losowa_rezerwacja(los, nauczyciele, args.studenci, godziny) for _ in range(los.randint(2, 5))
+            ])
+            wyniki = [wynik["status"] for wynik in response.get_json()] if response.status_code in (201, 207) else [response.status_code]
+        else:
+            wyniki = [klient_http.post("/book-lesson", json=losowa_rezerwacja(los, nauczyciele, args.studenci, godziny)).status_code]
+        for status in wyniki:
+            lokalne[status] = lokalne.get(status, 0) + 1
+    with blokada:
+        for status, liczba in lokalne.items():
+            statusy[status] = statusy.get(status, 0) + liczba
+
+
+def proces(nr, args, app, godziny, wyniki):
+    statusy = {}
+    blokada = threading.Lock()
+    watki = [
+        threading.Thread(target=klient, args=(nr * args.watki + w, args, app, godziny, statusy, blokada))
+        for w in range(args.watki)
+    ]
+    for watek in watki:
+        watek.start()
+    for watek in watki:
+        watek.join()
+    wyniki.put(statusy)
+
+
+def nakladajace_sie(app):
+    """Pary nakładających się lekcji tego samego nauczyciela."""
+    from modele import Lekcja, db
+
+    konflikty = []
+    with app.app_context():
+        lekcje = db.session.execute(
+            db.select(Lekcja.id_lekcji, Lekcja.id_nauczyciela, Lekcja.data_lekcji, Lekcja.czas_trwania)
+            .order_by(Lekcja.id_nauczyciela, Lekcja.data_lekcji)
+        ).all()
+    poprzednia = None
+    for lekcja in lekcje:
+        if poprzednia and poprzednia.id_nauczyciela == lekcja.id_nauczyciela:
+            koniec_poprzedniej = poprzednia.data_lekcji + timedelta(minutes=poprzednia.czas_trwania)
+            if koniec_poprzedniej > lekcja.data_lekcji:
+                konflikty.append((poprzednia.id_lekcji, lekcja.id_lekcji))
+        # Najpóźniej kończąca się lekcja dotąd - tylko z nią może kolidować kolejna
+        if (not poprzednia or poprzednia.id_nauczyciela != lekcja.id_nauczyciela
+                or lekcja.data_lekcji + timedelta(minutes=lekcja.czas_trwania)
+                > poprzednia.data_lekcji + timedelta(minutes=poprzednia.czas_trwania)):
+            poprzednia = lekcja
+    return konflikty
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Równoległe rezerwacje nachodzących na siebie terminów")
+    parser.add_argument("--procesy", type=int, default=4)
+    parser.add_argument("--watki", type=int, default=4, help="Liczba wątków w każdym procesie")
+    parser.add_argument("--proby", type=int, default=100, help="Liczba żądań wysyłanych przez każdy wątek")
+    parser.add_argument("--nauczyciele", type=int, default=3, help="Liczba nauczycieli, u których rezerwowane są lekcje")
+    parser.add_argument("--studenci", type=int, default=100)
+    args = parser.parse_args()
+
+    if "DATABASE_URL" not in os.environ:
+        os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "stres.db")
+    subprocess.run(
+        [sys.executable, os.path.join(KATALOG, "generator_danych.py"), "syntetyczne",
+         "--nauczyciele", str(args.nauczyciele), "--studenci", str(args.studenci), "--lekcje", "0"],
+        check=True, stdout=subprocess.DEVNULL,
+    )
+
+    from lab4serwer import create_app
+    from modele import KalendarzNauczyciela, db
+
+    app = create_app()
+    with app.app_context():
+        godziny = {
+            id_nauczyciela: (od, do) for id_nauczyciela, od, do in db.session.execute(
+                db.select(KalendarzNauczyciela.id_nauczyciela, KalendarzNauczyciela.dostepny_od, KalendarzNauczyciela.dostepny_do)
+                .where(KalendarzNauczyciela.id_nauczyciela.is_not(None))
+            )
+        }
+        # Silnik nie może być współdzielony przez procesy potomne
+        db.engine.dispose()
+
+    kontekst = multiprocessing.get_context("fork")
+    wyniki = kontekst.Queue()
+    procesy = [kontekst.Process(target=proces, args=(nr, args, app, godziny, wyniki)) for nr in range(args.procesy)]
+    for p in procesy:
+        p.start()
+    statusy = {}
+    for _ in procesy:
+        for status, liczba in wyniki.get().items():
+            statusy[status] = statusy.get(status, 0) + liczba
+    for p in procesy:
+        p.join()
+
+    konflikty = nakladajace_sie(app)
+    print(f"statusy rezerwacji: {dict(sorted(statusy.items()))}")
+    print(f"nakładające się lekcje: {len(konflikty)}")
+    for para in konflikty[:10]:
+        print(f"  lekcje {para[0]} i {para[1]}")
+    sys.exit(1 if konflikty else 0)
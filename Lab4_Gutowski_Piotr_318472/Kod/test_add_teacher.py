@@ -0,0 +1,62 @@
+import pytest
+
+NAUCZYCIEL = {
+    "imie": "Adam",
+    "nazwisko": "Nowakowski",
+    "prowadzone_przedmioty": "matematyka, fizyka",
+    "opis": "Nauczyciel z wieloletnim doświadczeniem.",
+    "ocena_nauczyciela": 4.9,
+    "numer_telefonu": "123456788",
+    "stawka": 100,
+    "waluta": "PLN",
+    "email": "a.nowakowski@example.com",
+    "id": 3,
+}
+
+
+def test_dodanie_nauczyciela(klient):
+    response = klient.post("/add-teacher", json=NAUCZYCIEL)
+    assert response.status_code == 201
+    assert response.get_json()["id_nauczyciela"]
+
+
+@pytest.mark.parametrize("pole, wartosc", [
+    ("prowadzone_przedmioty", "matematyka, astrologia"),
+    ("ocena_nauczyciela", 5.5),
+    ("ocena_nauczyciela", -1),
+    ("ocena_nauczyciela", "dobra"),
+], ids=["przedmiot", "ocena_powyzej", "ocena_ponizej", "ocena_tekst"])
+def test_nieprawidlowe_dane(klient, pole, wartosc):
+    response = klient.post("/add-teacher", json=dict(NAUCZYCIEL, **{pole: wartosc}))
+    assert response.status_code == 400
+    assert response.get_json()["error"]
+
+    # Transakcja zapisu wycofana - kolejne żądanie zapisu działa normalnie
+    assert klient.post("/add-teacher", json=NAUCZYCIEL).status_code == 201
+
+
+def test_powtorzony_przedmiot(klient):
+    response = klient.post("/add-teacher", json=dict(NAUCZYCIEL, prowadzone_przedmioty="matematyka, matematyka"))
+    assert response.status_code == 201
+    szczegoly = klient.get(f"/teacher-details/{response.get_json()['id_nauczyciela']}")
+    assert szczegoly.get_json()["przedmioty"] == "matematyka"
+
+
+def test_zajety_email(klient):
+    assert klient.post("/add-teacher", json=NAUCZYCIEL).status_code == 201
+    response = klient.post("/add-teacher", json=NAUCZYCIEL)
+    assert response.status_code == 409
+    assert "email" in response.get_json()["error"]
+
+
+def test_brak_wartosci_pola(klient):
+    response = klient.post("/add-teacher", json=dict(NAUCZYCIEL, imie=None))
+    assert response.status_code == 400
+
+
+def test_kolejnosc_przedmiotow(klient):
+    response = klient.post("/add-teacher", json=dict(NAUCZYCIEL, prowadzone_przedmioty="fizyka, matematyka, chemia"))
+    id_nauczyciela = response.get_json()["id_nauczyciela"]
+    assert klient.get(f"/teacher-details/{id_nauczyciela}").get_json()["przedmioty"] == "fizyka,matematyka,chemia"
+    lista = klient.get("/teacher-list", query_string={"kursor": id_nauczyciela - 1, "limit": 1}).get_json()
+    assert [nauczyciel["przedmioty"] for nauczyciel in lista] == ["fizyka,matematyka,chemia"]
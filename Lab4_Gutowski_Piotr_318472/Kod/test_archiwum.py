@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+import archiwum
+from modele import db, lekcje_autoincrement, migruj_baze
+
+CALY_ZAKRES = {"data_początkowa": "2000-01-01 00:00", "data_końcowa": "2099-12-31 23:59"}
+
+
+def archiwizuj_wszystko(app):
+    wynik = app.test_cli_runner().invoke(args=["archive", "--miesiace", "1"])
+    assert wynik.exit_code == 0, wynik.output
+    with app.app_context():
+        return db.session.execute(text("SELECT max(id_lekcji) FROM lekcje_2024_12")).scalar()
+
+
+def zarezerwuj(klient, id_studenta=1):
+    # Nauczyciel 1 jest dostępny 9-17, termin po końcu archiwum
+    termin = (datetime.now() + timedelta(days=7)).replace(hour=10, minute=0, second=0, microsecond=0)
+    return klient.post("/book-lesson", json={
+        "id_studenta": id_studenta, "id_nauczyciela": 1, "data_lekcji": termin.strftime("%Y-%m-%d %H:%M"),
+    })
+
+
+def id_lekcji_studenta(klient, id_studenta=1):
+    response = klient.get("/get-lessons", query_string=dict(CALY_ZAKRES, id_studenta=id_studenta))
+    assert response.status_code == 200
+    return [lekcja["id_lekcji"] for lekcja in response.get_json()]
+
+
+def sprawdz_rezerwacje_po_archiwizacji(app, klient):
+    """Lekcja zarezerwowana po archiwizacji dostaje id większe od id wszystkich lekcji archiwum."""
+    najwieksze_zarchiwizowane = archiwizuj_wszystko(app)
+    assert najwieksze_zarchiwizowane
+
+    response = zarezerwuj(klient)
+    assert response.status_code == 201, response.get_json()
+
+    identyfikatory = id_lekcji_studenta(klient)
+    assert len(identyfikatory) == len(set(identyfikatory))
+    assert max(identyfikatory) > najwieksze_zarchiwizowane
+
+
+def test_rezerwacja_po_archiwizacji_nie_uzywa_id_archiwum(app, klient):
+    sprawdz_rezerwacje_po_archiwizacji(app, klient)
+
+
+def test_migracja_tabeli_bez_autoincrement(app, klient):
+    # Baza sprzed AUTOINCREMENT: ta sama tabela lekcje z id jako zwykłym INTEGER PRIMARY KEY
+    with app.app_context(), db.engine.begin() as polaczenie:
+        sql = polaczenie.execute(text("SELECT sql FROM sqlite_master WHERE name = 'lekcje'")).scalar()
+        polaczenie.execute(text("ALTER TABLE lekcje RENAME TO lekcje_stare"))
+        polaczenie.execute(text(sql.replace("AUTOINCREMENT", "")))
+        polaczenie.execute(text("INSERT INTO lekcje SELECT * FROM lekcje_stare"))
+        polaczenie.execute(text("DROP TABLE lekcje_stare"))
+        polaczenie.execute(text("DELETE FROM sqlite_sequence WHERE name = 'lekcje'"))
+        assert not lekcje_autoincrement(polaczenie)
+        liczba_lekcji = polaczenie.execute(text("SELECT count(*) FROM lekcje")).scalar()
+
+        with pytest.raises(RuntimeError):
+            archiwum.archiwizuj(polaczenie, datetime(2025, 1, 1))
+
+    with app.app_context():
+        migruj_baze()
+        with db.engine.connect() as polaczenie:
+            assert lekcje_autoincrement(polaczenie)
+            assert polaczenie.execute(text("SELECT count(*) FROM lekcje")).scalar() == liczba_lekcji
+
+    sprawdz_rezerwacje_po_archiwizacji(app, klient)
@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy import event
+
+from modele import db
+
+# /get-lessons wykonuje stałą liczbę instrukcji SQL niezależnie od liczby zwracanych lekcji: jedno zapytanie
+# z projekcją lekcji studenta (złączenie z nauczycielem i przedmiotem, bez leniwego ładowania relacji
+# dla każdego wiersza) i odczyt rejestru partycji archiwum.
+
+GRUDZIEN = {"data_początkowa": "2024-12-01 00:00", "data_końcowa": "2024-12-31 23:59"}
+BEZ_LEKCJI = {"data_początkowa": "2000-01-01 00:00", "data_końcowa": "2000-01-31 23:59"}
+
+# (id studenta, zakres dat, liczba lekcji w danych demonstracyjnych)
+PRZYPADKI = [(2, BEZ_LEKCJI, 0), (3, GRUDZIEN, 1), (2, GRUDZIEN, 10)]
+
+
+@pytest.fixture
+def instrukcje(app):
+    """Lista instrukcji SQL wykonanych na wszystkich silnikach aplikacji."""
+    wykonane = []
+
+    def zapisz(polaczenie, kursor, instrukcja, parametry, kontekst, executemany):
+        wykonane.append(instrukcja)
+
+    with app.app_context():
+        silniki = list(db.engines.values())
+    for silnik in silniki:
+        event.listen(silnik, "before_cursor_execute", zapisz)
+    yield wykonane
+    for silnik in silniki:
+        event.remove(silnik, "before_cursor_execute", zapisz)
+
+
+def zapytania_lekcji(instrukcje):
+    return [instrukcja for instrukcja in instrukcje if "FROM studenci" in instrukcja]
+
+
+@pytest.mark.parametrize("naglowki", [{}, {"Accept": "application/x-ndjson"}], ids=["json", "ndjson"])
+def test_stala_liczba_instrukcji(klient, instrukcje, naglowki):
+    liczby_instrukcji = []
+    for id_studenta, zakres, liczba_lekcji in PRZYPADKI:
+        instrukcje.clear()
+        response = klient.get("/get-lessons", query_string=dict(zakres, id_studenta=id_studenta), headers=naglowki)
+        assert response.status_code == 200
+        # Brak lekcji - pusta odpowiedź, w trybie JSON tablica, w NDJSON lekcja w linii
+        tresc = response.get_data(as_text=True)
+        if naglowki:
+            assert len(tresc.splitlines()) == liczba_lekcji
+        else:
+            assert len(response.get_json() if tresc else []) == liczba_lekcji
+        assert len(zapytania_lekcji(instrukcje)) == 1
+        liczby_instrukcji.append(len(instrukcje))
+
+    assert len(set(liczby_instrukcji)) == 1, liczby_instrukcji
+
+
+def test_nieznany_student(klient, instrukcje):
+    response = klient.get("/get-lessons", query_string=dict(GRUDZIEN, id_studenta=999_999))
+    assert response.status_code == 404
+    assert len(zapytania_lekcji(instrukcje)) == 1
@@ -0,0 +1,57 @@
+import json
+
+from sqlalchemy import text
+
+import lab4serwer
+from modele import db
+from test_add_teacher import NAUCZYCIEL
+
+
+def nauczyciel(email, przedmioty):
+    return dict(NAUCZYCIEL, email=email, prowadzone_przedmioty=przedmioty, id="")
+
+
+def importuj(klient, wiersze):
+    return klient.post("/import-teachers", data="".join(json.dumps(wiersz) + "\n" for wiersz in wiersze),
+                       content_type="application/x-ndjson")
+
+
+def przedmioty_nauczyciela(klient, email):
+    lista = klient.get("/teacher-list", query_string={"limit": 100}).get_json()
+    for pozycja in lista:
+        szczegoly = klient.get(f"/teacher-details/{pozycja['id_nauczyciela']}").get_json()
+        if szczegoly.get("email") == email:
+            return szczegoly["przedmioty"]
+    return None
+
+
+def test_wycofana_paczka_nie_zostawia_id_przedmiotu(app, klient, monkeypatch):
+    monkeypatch.setattr(lab4serwer, "PACZKA_IMPORTU", 1)
+    with app.app_context(), db.engine.begin() as polaczenie:
+        # Zapis pierwszej paczki kończy się błędem ograniczenia po dodaniu nowego przedmiotu
+        polaczenie.execute(text(
+            "CREATE TRIGGER blokada BEFORE INSERT ON nauczyciele WHEN new.email = 'blokada@example.com' "
+            "BEGIN SELECT RAISE(ABORT, 'blokada'); END"
+        ))
+
+    response = importuj(klient, [nauczyciel("blokada@example.com", "geografia"),
+                                 nauczyciel("nowy@example.com", "geografia, fizyka")])
+    wynik = response.get_json()
+    assert (wynik["dodani"], [blad["status"] for blad in wynik["bledy"]]) == (1, [409])
+    assert przedmioty_nauczyciela(klient, "nowy@example.com") == "geografia,fizyka"
+
+
+def test_przedmiot_dodany_w_trakcie_importu(app, klient, monkeypatch):
+    monkeypatch.setattr(lab4serwer, "PACZKA_IMPORTU", 1)
+
+    def wiersze_importu(typ):
+        yield 1, nauczyciel("pierwszy@example.com", "fizyka")
+        # Inne żądanie dodaje przedmiot między paczkami
+        with db.engine.begin() as polaczenie:
+            polaczenie.execute(text("INSERT INTO lista_przedmiotow (nazwa_przedmiotu) VALUES ('WoS')"))
+        yield 2, nauczyciel("drugi@example.com", "WoS")
+
+    monkeypatch.setattr(lab4serwer, "wiersze_importu", wiersze_importu)
+    response = importuj(klient, [])
+    assert response.status_code == 201, response.get_json()
+    assert przedmioty_nauczyciela(klient, "drugi@example.com") == "WoS"
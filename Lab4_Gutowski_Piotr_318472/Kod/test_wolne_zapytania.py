@@ -0,0 +1,30 @@
+import json
+
+from sqlalchemy import create_engine, text
+
+import wolne_zapytania
+
+
+def wpisy(plik):
+    return [json.loads(linia) for linia in plik.read_text(encoding='utf-8').splitlines()]
+
+
+def test_osobny_plik_dla_kazdego_silnika(tmp_path):
+    # Dwie aplikacje w jednym procesie - każda zapisuje tylko do swojego pliku
+    pliki = {}
+    for nazwa in ("a", "b"):
+        silnik = create_engine(f"sqlite:///{tmp_path / f'{nazwa}.db'}")
+        pliki[nazwa] = tmp_path / f"wolne_{nazwa}.log"
+        wolne_zapytania.zainstaluj(silnik, str(pliki[nazwa]), prog_ms=0)
+        with silnik.begin() as polaczenie:
+            polaczenie.execute(text(f"CREATE TABLE tabela_{nazwa} (x INTEGER)"))
+            polaczenie.execute(text(f"SELECT x FROM tabela_{nazwa}")).all()
+        silnik.dispose()
+
+    for nazwa, plik in pliki.items():
+        zapytania = [wpis['sql'] for wpis in wpisy(plik)]
+        assert f"SELECT x FROM tabela_{nazwa}" in zapytania
+        assert all(f"tabela_{inna}" not in sql for inna in pliki if inna != nazwa for sql in zapytania)
+
+    skan, = [wpis for wpis in wpisy(pliki["a"]) if wpis['sql'].startswith("SELECT")]
+    assert skan['pelne_skany'] == ["tabela_a"]
@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import text
+
+import zmiany
+from modele import db
+from test_archiwum import archiwizuj_wszystko, zarezerwuj
+
+
+def zmiany_od(klient, kursor, id_studenta=1):
+    response = klient.get("/lessons/changes", query_string={"since": kursor, "id_studenta": id_studenta})
+    assert response.status_code == 200
+    return response.get_json()["zmiany"]
+
+
+def id_zarchiwizowanych(app):
+    with app.app_context():
+        return set(db.session.execute(text("SELECT id_lekcji FROM lekcje_2024_12")).scalars())
+
+
+def test_wstawienie_po_archiwizacji_ma_nowe_id(app, klient):
+    archiwizuj_wszystko(app)
+    kursor = klient.get("/lessons/changes").get_json()["kursor"]
+    # Archiwizacja nie jest zmianą planu
+    assert zmiany_od(klient, kursor) == []
+
+    assert zarezerwuj(klient).status_code == 201
+    wpisy = zmiany_od(klient, kursor)
+    assert [wpis["operacja"] for wpis in wpisy] == ["wstawienie"]
+    assert wpisy[0]["id_lekcji"] not in id_zarchiwizowanych(app)
+
+
+def test_odbudowa_dziennika_przesuwa_licznik_lekcji(app, klient):
+    archiwizuj_wszystko(app)
+    with app.app_context(), db.engine.begin() as polaczenie:
+        # Licznik cofnięty jak w bazie sprzed AUTOINCREMENT
+        polaczenie.execute(text("UPDATE sqlite_sequence SET seq = 0 WHERE name = 'lekcje'"))
+        zmiany.odbuduj_dziennik(polaczenie)
+
+    kursor = klient.get("/lessons/changes").get_json()["kursor"]
+    assert zarezerwuj(klient).status_code == 201
+    assert all(wpis["id_lekcji"] not in id_zarchiwizowanych(app) for wpis in zmiany_od(klient, kursor))
+
+
+def test_odbudowa_dziennika_odrzuca_id_z_archiwum(app):
+    archiwizuj_wszystko(app)
+    with app.app_context(), db.engine.begin() as polaczenie:
+        # Bieżąca lekcja z id lekcji zarchiwizowanej (baza, w której id zostało już nadane ponownie)
+        polaczenie.execute(text(
+            "INSERT INTO lekcje (id_lekcji, id_nauczyciela, id_studenta, id_przedmiotu, data_lekcji, czas_trwania) "
+            "SELECT id_lekcji, id_nauczyciela, id_studenta, id_przedmiotu, '2099-01-05 10:00:00.000000', czas_trwania "
+            "FROM lekcje_2024_12 ORDER BY id_lekcji LIMIT 1"
+        ))
+        with pytest.raises(RuntimeError):
+            zmiany.odbuduj_dziennik(polaczenie)
@@ -0,0 +1,117 @@
+import json
+import logging
+import os
+import time
+import traceback
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+# Dziennik wolnych zapytań: zapytania SQL trwające dłużej niż próg zapisywane są jako linie JSON
+# (rotowany plik) z parametrami, endpointem i funkcją, z której pochodzą, oraz planem
+# EXPLAIN QUERY PLAN - pełne skany tabel są oznaczane osobno. Plan liczony jest tylko dla
+# zapytań przekraczających próg, więc szybkie zapytania kosztują jeden pomiar czasu.
+#
+#   WOLNE_ZAPYTANIA_MS=50 python lab4serwer.py      (WOLNE_ZAPYTANIA_MS=-1 wyłącza dziennik)
+
+PROG_MS = float(os.environ.get('WOLNE_ZAPYTANIA_MS', 100))
+MAKSYMALNY_ROZMIAR_PLIKU = 10 * 1024 * 1024
+LICZBA_KOPII = 5
+
+# Zapytania, dla których EXPLAIN QUERY PLAN ma sens
+RODZAJE_Z_PLANEM = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+KATALOG_MODULU = os.path.dirname(os.path.abspath(__file__))
+
+
+def utworz_logger(sciezka):
+    """Logger zapisujący surowe linie JSON do rotowanego pliku (otwieranego przy pierwszym wpisie).
+    Każdy plik ma osobny logger - kilka aplikacji w jednym procesie (testy, benchmarki) pisze każda
+    do swojego katalogu instance, a silniki jednej aplikacji dzielą jeden handler."""
+    logger = logging.getLogger(f'wolne_zapytania.{os.path.abspath(sciezka)}')
+    logger.setLevel(logging.WARNING)
+    logger.propagate = False
+    if not logger.handlers:
+        handler = RotatingFileHandler(
+            sciezka, maxBytes=MAKSYMALNY_ROZMIAR_PLIKU, backupCount=LICZBA_KOPII, encoding='utf-8', delay=True
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+    return logger
+
+
+def plan_zapytania(polaczenie_dbapi, statement, parametry):
+    """Wiersze EXPLAIN QUERY PLAN (kolumna detail) - bezpośrednio na połączeniu DBAPI, bez zdarzeń silnika."""
+    if not statement.lstrip().upper().startswith(RODZAJE_Z_PLANEM):
+        return []
+    kursor = polaczenie_dbapi.cursor()
+    try:
+        kursor.execute(f"EXPLAIN QUERY PLAN {statement}", parametry)
+        return [wiersz[3] for wiersz in kursor.fetchall()]
+    except Exception as e:
+        return [f"(nie udało się pobrać planu: {e})"]
+    finally:
+        kursor.close()
+
+
+def pelne_skany(plan):
+    """Tabele czytane w całości: krok 'SCAN tabela' bez indeksu (starsze SQLite: 'SCAN TABLE tabela')."""
+    skany = []
+    for krok in plan:
+        slowa = krok.split()
+        if slowa[:1] != ['SCAN'] or 'USING' in slowa or 'VIRTUAL' in slowa:
+            continue
+        tabela = slowa[2] if slowa[1:2] == ['TABLE'] else slowa[1]
+        if tabela != 'CONSTANT':
+            skany.append(tabela)
+    return skany
+
+
+def pochodzenie():
+    """Pierwsza ramka stosu w kodzie aplikacji (poza bibliotekami i tym modułem)."""
+    for ramka in reversed(traceback.extract_stack()):
+        if ramka.filename.startswith('<'):
+            continue
+        plik = os.path.abspath(ramka.filename)
+        if plik != os.path.abspath(__file__) and 'site-packages' not in plik and not plik.startswith(os.path.dirname(os.__file__)):
+            return f"{os.path.relpath(plik, KATALOG_MODULU)}:{ramka.lineno} {ramka.name}"
+    return None
+
+
+def zainstaluj(silnik, sciezka, prog_ms=PROG_MS):
+    """Podłącza dziennik wolnych zapytań do silnika SQLAlchemy."""
+    if prog_ms < 0:
+        return
+    logger = utworz_logger(sciezka)
+    prog = prog_ms / 1000
+
+    @event.listens_for(silnik, 'before_cursor_execute')
+    def przed_zapytaniem(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('wolne_zapytania_start', []).append(time.perf_counter())
+
+    @event.listens_for(silnik, 'after_cursor_execute')
+    def po_zapytaniu(conn, cursor, statement, parameters, context, executemany):
+        starty = conn.info.get('wolne_zapytania_start')
+        if not starty:
+            return
+        czas = time.perf_counter() - starty.pop()
+        if czas < prog:
+            return
+
+        # Przy executemany zapisujemy tylko pierwszy zestaw parametrów
+        parametry = parameters[0] if executemany and parameters else parameters
+        plan = plan_zapytania(cursor.connection, statement, parametry)
+        wpis = {
+            'czas': datetime.now().isoformat(timespec='milliseconds'),
+            'czas_ms': round(czas * 1000, 3),
+            'sql': statement,
+            'parametry': parametry,
+            'liczba_zestawow_parametrow': len(parameters) if executemany else 1,
+            'endpoint': request.endpoint if has_request_context() else None,
+            'funkcja': pochodzenie(),
+            'plan': plan,
+            'pelne_skany': pelne_skany(plan),
+        }
+        logger.warning(json.dumps(wpis, ensure_ascii=False, default=str))
@@ -0,0 +1,100 @@
+import re
+
+from sqlalchemy import Float, Integer, text
+
+# Wyszukiwanie pełnotekstowe nauczycieli: tabela wirtualna FTS5 `nauczyciele_fts` (rowid = id_nauczyciela)
+# z imieniem, nazwiskiem, opisem i przedmiotami, aktualizowana wyzwalaczami na tabelach nauczycieli
+# i tabeli łączącej. Tokenizator unicode61 z remove_diacritics 2 usuwa znaki diakrytyczne (ś -> s, ż -> z),
+# ale nie zamienia ł na l (to osobna litera w Unicode) - ł składane jest w wyzwalaczach i w zapytaniu.
+# Indeksy prefiksów 2 i 3 znaków przyspieszają krótkie zapytania typu "wi*".
+
+MAKSYMALNA_LICZBA_SLOW = 8
+
+SKLADANIE = str.maketrans({'ł': 'l', 'Ł': 'L'})
+
+
+def zloz_sql(wyrazenie):
+    """Wyrażenie SQL z ł/Ł zamienionymi na l/L (odpowiednik SKLADANIE)."""
+    return f"replace(replace({wyrazenie}, 'ł', 'l'), 'Ł', 'L')"
+
+
+def przedmioty_sql(id_nauczyciela):
+    # group_concat łączy w kolejności podzapytania (ORDER BY w agregacie dopiero od SQLite 3.44)
+    return (
+        "(SELECT coalesce(group_concat(nazwa_przedmiotu, ' '), '') FROM (SELECT p.nazwa_przedmiotu "
+        "FROM nauczyciele_przedmioty np JOIN lista_przedmiotow p ON p.id = np.id_przedmiotu "
+        f"WHERE np.id_nauczyciela = {id_nauczyciela} ORDER BY np.pozycja, np.id_przedmiotu))"
+    )
+
+
+TABELA = (
+    "CREATE VIRTUAL TABLE nauczyciele_fts USING fts5("
+    "imie, nazwisko, opis, przedmioty, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+WYZWALACZE = {
+    'nauczyciele_fts_wstawienie': f"""
+        CREATE TRIGGER nauczyciele_fts_wstawienie AFTER INSERT ON nauczyciele BEGIN
+            INSERT INTO nauczyciele_fts (rowid, imie, nazwisko, opis, przedmioty) VALUES (
+                new.id_nauczyciela, {zloz_sql('new.imie')}, {zloz_sql('new.nazwisko')},
+                {zloz_sql("coalesce(new.opis, '')")}, {przedmioty_sql('new.id_nauczyciela')});
+        END""",
+    'nauczyciele_fts_zmiana': f"""
+        CREATE TRIGGER nauczyciele_fts_zmiana AFTER UPDATE OF imie, nazwisko, opis ON nauczyciele BEGIN
+            UPDATE nauczyciele_fts SET imie = {zloz_sql('new.imie')}, nazwisko = {zloz_sql('new.nazwisko')},
+                opis = {zloz_sql("coalesce(new.opis, '')")}
+            WHERE rowid = new.id_nauczyciela;
+        END""",
+    'nauczyciele_fts_usuniecie': """
+        CREATE TRIGGER nauczyciele_fts_usuniecie AFTER DELETE ON nauczyciele BEGIN
+            DELETE FROM nauczyciele_fts WHERE rowid = old.id_nauczyciela;
+        END""",
+    'nauczyciele_przedmioty_fts_wstawienie': f"""
+        CREATE TRIGGER nauczyciele_przedmioty_fts_wstawienie AFTER INSERT ON nauczyciele_przedmioty BEGIN
+            UPDATE nauczyciele_fts SET przedmioty = {przedmioty_sql('new.id_nauczyciela')}
+            WHERE rowid = new.id_nauczyciela;
+        END""",
+    'nauczyciele_przedmioty_fts_usuniecie': f"""
+        CREATE TRIGGER nauczyciele_przedmioty_fts_usuniecie AFTER DELETE ON nauczyciele_przedmioty BEGIN
+            UPDATE nauczyciele_fts SET przedmioty = {przedmioty_sql('old.id_nauczyciela')}
+            WHERE rowid = old.id_nauczyciela;
+        END""",
+}
+
+# Najlepsze trafienia: bm25 z wagami kolumn (imie, nazwisko, opis, przedmioty) - mniejsza wartość = lepiej
+TRAFIENIA = text(
+    "SELECT rowid AS id_nauczyciela, bm25(nauczyciele_fts, 5.0, 10.0, 1.0, 3.0) AS ranga "
+    "FROM nauczyciele_fts WHERE nauczyciele_fts MATCH :zapytanie ORDER BY ranga LIMIT :limit"
+).columns(id_nauczyciela=Integer, ranga=Float)
+
+
+def indeks_aktualny(polaczenie):
+    """Czy tabela FTS i wszystkie wyzwalacze istnieją."""
+    obiekty = {nazwa for (nazwa,) in polaczenie.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE name = 'nauczyciele_fts' OR type = 'trigger'"
+    )}
+    return {'nauczyciele_fts', *WYZWALACZE} <= obiekty
+
+
+def odbuduj_indeks(polaczenie):
+    """Tworzy od nowa tabelę FTS z bieżących danych (jednym INSERT ... SELECT) i wyzwalacze."""
+    for nazwa in WYZWALACZE:
+        polaczenie.exec_driver_sql(f"DROP TRIGGER IF EXISTS {nazwa}")
+    polaczenie.exec_driver_sql("DROP TABLE IF EXISTS nauczyciele_fts")
+    polaczenie.exec_driver_sql(TABELA)
+    opis = zloz_sql("coalesce(n.opis, '')")
+    polaczenie.exec_driver_sql(
+        "INSERT INTO nauczyciele_fts (rowid, imie, nazwisko, opis, przedmioty) "
+        f"SELECT n.id_nauczyciela, {zloz_sql('n.imie')}, {zloz_sql('n.nazwisko')}, {opis}, "
+        f"{przedmioty_sql('n.id_nauczyciela')} FROM nauczyciele n"
+    )
+    polaczenie.exec_driver_sql("INSERT INTO nauczyciele_fts (nauczyciele_fts) VALUES ('optimize')")
+    for sql in WYZWALACZE.values():
+        polaczenie.exec_driver_sql(sql)
+
+
+def wyrazenie_fts(tekst):
+    """Zapytanie FTS5 z tekstu użytkownika: każde słowo jako prefiks, wszystkie słowa wymagane.
+    'Wiśniewska Łuk' -> '"Wiśniewska"* "Luk"*'. Słowa z samych liter/cyfr, więc bez składni FTS5 z wejścia."""
+    slowa = re.findall(r'\w+', tekst.translate(SKLADANIE))[:MAKSYMALNA_LICZBA_SLOW]
+    return ' '.join(f'"{slowo}"*' for slowo in slowa)
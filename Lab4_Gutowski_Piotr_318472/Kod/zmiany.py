@@ -0,0 +1,160 @@
+import base64
+import os
+import time
+
+from sqlalchemy import DateTime, Integer, String, column, func, select, table
+
+# Dziennik zmian lekcji do synchronizacji przyrostowej planu (/lessons/changes): tabela `zmiany_lekcji`,
+# do której wyzwalacze na tabeli lekcje dopisują każde wstawienie, zmianę i usunięcie - w tej samej
+# transakcji co zapis (book-lesson, book-lessons, usunięcie nauczyciela z lekcjami itd.). Wpis zawiera
+# stan lekcji po zmianie, a przy usunięciu - ostatni stan. Numer zmiany to AUTOINCREMENT: rośnie i nie jest
+# używany ponownie, a SQLite ma jednego piszącego, więc kolejność numerów to kolejność zatwierdzenia
+# i kursor "po zmianie N" niczego nie pomija. Przeniesienie lekcji do archiwum (archiwum.py) nie jest
+# zmianą planu - usunięcia lekcji sprzed końca archiwum nie trafiają do dziennika.
+#
+#   flask --app lab4serwer compact-changes --dni 30
+
+# Domyślny czas przechowywania wpisów (polecenie compact-changes)
+PRZECHOWYWANIE_DNI = int(os.environ.get('ZMIANY_DNI', 30))
+
+KOLUMNY = ('id_lekcji', 'id_nauczyciela', 'id_studenta', 'id_przedmiotu', 'data_lekcji', 'czas_trwania')
+
+TABELA = """
+    CREATE TABLE zmiany_lekcji (
+        id_zmiany INTEGER PRIMARY KEY AUTOINCREMENT,
+        operacja VARCHAR(10) NOT NULL,
+        id_lekcji INTEGER NOT NULL,
+        id_nauczyciela INTEGER NOT NULL,
+        id_studenta INTEGER NOT NULL,
+        id_przedmiotu INTEGER NOT NULL,
+        data_lekcji DATETIME NOT NULL,
+        czas_trwania INTEGER NOT NULL,
+        czas_zmiany INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+    )"""
+
+# Zmiany studenta / nauczyciela po kursorze - indeks zawiera też rowid, czyli id_zmiany
+INDEKSY = (
+    "CREATE INDEX ix_zmiany_lekcji_student ON zmiany_lekcji (id_studenta)",
+    "CREATE INDEX ix_zmiany_lekcji_nauczyciel ON zmiany_lekcji (id_nauczyciela)",
+)
+
+
+def wpis_sql(operacja, wiersz, warunek=None):
+    """INSERT wpisu dziennika z kolumnami wiersza NEW lub OLD (opcjonalnie tylko przy spełnionym warunku)."""
+    wartosci = ', '.join(f"{wiersz}.{kolumna}" for kolumna in KOLUMNY)
+    return (
+        f"INSERT INTO zmiany_lekcji (operacja, {', '.join(KOLUMNY)}) SELECT '{operacja}', {wartosci}"
+        + (f" WHERE {warunek};" if warunek else ";")
+    )
+
+
+WYZWALACZE = {
+    'zmiany_lekcji_wstawienie': f"""
+        CREATE TRIGGER zmiany_lekcji_wstawienie AFTER INSERT ON lekcje BEGIN
+            {wpis_sql('wstawienie', 'new')}
+        END""",
+    # Lekcja przeniesiona do innego studenta lub nauczyciela znika z planu poprzedniego
+    'zmiany_lekcji_zmiana': f"""
+        CREATE TRIGGER zmiany_lekcji_zmiana AFTER UPDATE ON lekcje BEGIN
+            {wpis_sql('usuniecie', 'old', 'old.id_lekcji IS NOT new.id_lekcji OR old.id_studenta IS NOT new.id_studenta '
+                                         'OR old.id_nauczyciela IS NOT new.id_nauczyciela')}
+            {wpis_sql('zmiana', 'new')}
+        END""",
+    # Archiwizacja najpierw zapisuje partycje w rejestrze, potem usuwa z lekcje terminy sprzed końca archiwum
+    'zmiany_lekcji_usuniecie': f"""
+        CREATE TRIGGER zmiany_lekcji_usuniecie AFTER DELETE ON lekcje
+        WHEN old.data_lekcji >= coalesce((SELECT max(do) FROM partycje_lekcji), '') BEGIN
+            {wpis_sql('usuniecie', 'old')}
+        END""",
+}
+
+# Do budowania zapytań (tabela spoza metadanych modeli - tworzą ją odbuduj_dziennik i migracja)
+ZMIANY = table(
+    'zmiany_lekcji',
+    column('id_zmiany', Integer),
+    column('operacja', String),
+    column('id_lekcji', Integer),
+    column('id_nauczyciela', Integer),
+    column('id_studenta', Integer),
+    column('id_przedmiotu', Integer),
+    column('data_lekcji', DateTime),
+    column('czas_trwania', Integer),
+    column('czas_zmiany', Integer),
+)
+SEKWENCJE = table('sqlite_sequence', column('name', String), column('seq', Integer))
+
+# (ostatni nadany numer zmiany, najstarszy zachowany numer albo NULL przy pustym dzienniku)
+ZAKRES = select(
+    select(SEKWENCJE.c.seq).where(SEKWENCJE.c.name == 'zmiany_lekcji').scalar_subquery(),
+    select(func.min(ZMIANY.c.id_zmiany)).scalar_subquery(),
+)
+
+PREFIKS_KURSORA = 'zmiany:'
+
+
+def koduj_kursor(id_zmiany):
+    return base64.urlsafe_b64encode(f"{PREFIKS_KURSORA}{id_zmiany}".encode()).decode().rstrip('=')
+
+
+def dekoduj_kursor(kursor):
+    """Numer zmiany z kursora zwróconego przez koduj_kursor (ValueError dla nieprawidłowego kursora)."""
+    try:
+        tekst = base64.urlsafe_b64decode(kursor + '=' * (-len(kursor) % 4)).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Nieprawidłowy kursor") from None
+    if not tekst.startswith(PREFIKS_KURSORA):
+        raise ValueError("Nieprawidłowy kursor")
+    return int(tekst[len(PREFIKS_KURSORA):])
+
+
+def kursor_aktualny(id_zmiany, ostatnia, najstarsza):
+    """Czy po zmianie `id_zmiany` dziennik zawiera wszystkie zmiany (wynik ZAKRES). Kursor jest nieaktualny,
+    gdy następne zmiany usunęła kompakcja albo pochodzi z poprzedniego dziennika (odbuduj_dziennik)."""
+    poczatek = najstarsza - 1 if najstarsza is not None else ostatnia
+    return poczatek <= id_zmiany <= ostatnia
+
+
+def dziennik_aktualny(polaczenie):
+    """Czy tabela dziennika i wszystkie wyzwalacze istnieją."""
+    obiekty = {nazwa for (nazwa,) in polaczenie.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE name = 'zmiany_lekcji' OR type = 'trigger'"
+    )}
+    return {'zmiany_lekcji', *WYZWALACZE} <= obiekty
+
+
+def odbuduj_dziennik(polaczenie):
+    """Tworzy od nowa pusty dziennik i wyzwalacze. Numeracja zaczyna się od bieżącego czasu w mikrosekundach,
+    więc kursory poprzedniego dziennika są od niej mniejsze i zostaną odrzucone jako nieaktualne.
+    Wpisy są identyfikowane przez id_lekcji - licznik id lekcji przesuwany jest za archiwum, a baza, w której
+    bieżąca lekcja ma id lekcji zarchiwizowanej, jest odrzucana (klient nadpisałby jedną lekcję drugą)."""
+    # Import w funkcji - modele importuje ten moduł
+    from modele import id_lekcji_w_archiwum, ustaw_sekwencje_lekcji
+
+    ustaw_sekwencje_lekcji(polaczenie)
+    zdublowane = id_lekcji_w_archiwum(polaczenie)
+    if zdublowane:
+        raise RuntimeError(f"Lekcje z id zarchiwizowanych lekcji, popraw dane przed odbudową dziennika: {zdublowane}")
+
+    for nazwa in WYZWALACZE:
+        polaczenie.exec_driver_sql(f"DROP TRIGGER IF EXISTS {nazwa}")
+    polaczenie.exec_driver_sql("DROP TABLE IF EXISTS zmiany_lekcji")
+    polaczenie.exec_driver_sql(TABELA)
+    for sql in INDEKSY:
+        polaczenie.exec_driver_sql(sql)
+    polaczenie.exec_driver_sql(
+        "INSERT INTO sqlite_sequence (name, seq) VALUES ('zmiany_lekcji', ?)", (time.time_ns() // 1000,)
+    )
+    for sql in WYZWALACZE.values():
+        polaczenie.exec_driver_sql(sql)
+
+
+def kompaktuj(polaczenie, zachowaj):
+    """Usuwa wpisy starsze niż `zachowaj` (timedelta) - zawsze początek dziennika, bez luk w numeracji
+    pozostałych wpisów. Zwraca liczbę usuniętych wpisów."""
+    granica = int(time.time() - zachowaj.total_seconds())
+    pierwsza = polaczenie.exec_driver_sql(
+        "SELECT id_zmiany FROM zmiany_lekcji WHERE czas_zmiany >= ? ORDER BY id_zmiany LIMIT 1", (granica,)
+    ).scalar()
+    if pierwsza is None:
+        return polaczenie.exec_driver_sql("DELETE FROM zmiany_lekcji").rowcount
+    return polaczenie.exec_driver_sql("DELETE FROM zmiany_lekcji WHERE id_zmiany < ?", (pierwsza,)).rowcount